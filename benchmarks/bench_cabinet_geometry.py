@@ -0,0 +1,105 @@
+"""
+Benchmark: geometrie korpusů pro všechny šířky katalogu
+=======================================================
+Porovná původní create_cabinet_box (Python seznamy, jedna síť na volání)
+s parametrickým cabinet_geometry.variant_meshes, které počítá všechny
+šířky se stejným typem a rozměry jedním NumPy výrazem. Klíče (typ, šířka,
+výška, hloubka) se berou z prototype2/src/data/catalog.json.
+
+Spuštění:
+    python benchmarks/bench_cabinet_geometry.py
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT / 'prototype2'))
+
+from cabinet_geometry import variant_meshes, clear_cache
+
+
+def loop_cabinet_box(width, height, depth, cabinet_type='base'):
+    """Původní create_cabinet_box z convert_kitchen_cabinets (reference)"""
+    w = width / 1000
+    h = height / 1000
+    d = depth / 1000
+    t = 0.018
+
+    vertices = []
+    indices = []
+
+    def add_panel(pos, size):
+        x, y, z = pos
+        pw, ph, pd = size
+        base_idx = len(vertices)
+        vertices.extend([
+            [x, y, z], [x + pw, y, z], [x + pw, y + ph, z], [x, y + ph, z],
+            [x, y, z + pd], [x + pw, y, z + pd], [x + pw, y + ph, z + pd], [x, y + ph, z + pd],
+        ])
+        panel_indices = [
+            0, 1, 2, 0, 2, 3, 5, 4, 7, 5, 7, 6,
+            4, 0, 3, 4, 3, 7, 1, 5, 6, 1, 6, 2,
+            4, 5, 1, 4, 1, 0, 3, 2, 6, 3, 6, 7,
+        ]
+        indices.extend([i + base_idx for i in panel_indices])
+
+    if cabinet_type == 'base':
+        add_panel([0, 0, 0], [t, h, d])
+        add_panel([w - t, 0, 0], [t, h, d])
+        add_panel([t, 0, 0], [w - 2*t, t, d])
+        add_panel([t, t, d - t], [w - 2*t, h - t, t])
+    elif cabinet_type in ('wall', 'tall'):
+        add_panel([0, 0, 0], [t, h, d])
+        add_panel([w - t, 0, 0], [t, h, d])
+        add_panel([t, 0, 0], [w - 2*t, t, d])
+        add_panel([t, h - t, 0], [w - 2*t, t, d])
+        add_panel([t, t, d - t], [w - 2*t, h - 2*t, t])
+
+    return {'vertices': vertices, 'indices': indices, 'type': 'parametric'}
+
+
+def catalog_keys():
+    with open(ROOT / 'prototype2' / 'src' / 'data' / 'catalog.json', 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    keys = set()
+    for cab in catalog['cabinets']:
+        for w in [cab['width']] + cab['widths']:
+            keys.add((cab['type'], w, cab['height'], cab['depth']))
+    return sorted(keys)
+
+
+def main():
+    keys = catalog_keys()
+    print(f"Variant (typ, šířka, výška, hloubka): {len(keys)}")
+
+    start = time.perf_counter()
+    loop = {key: loop_cabinet_box(key[1], key[2], key[3], key[0]) for key in keys}
+    loop_time = time.perf_counter() - start
+
+    clear_cache()
+    start = time.perf_counter()
+    meshes = variant_meshes(keys)
+    vector_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    variant_meshes(keys)
+    cached_time = time.perf_counter() - start
+
+    # Původní funkce pro neznámý typ (worktop) vracela prázdnou síť
+    error = max(np.abs(np.asarray(loop[k]['vertices']) - meshes[k]['vertices']).max()
+                for k in keys if loop[k]['vertices'])
+    print(f"Max. rozdíl vrcholů: {error:.2e} m")
+    print(f"{'varianta':<32}{'čas [s]':>10}{'zrychlení':>12}")
+    for name, seconds in (('create_cabinet_box (smyčka)', loop_time),
+                          ('variant_meshes (NumPy)', vector_time),
+                          ('variant_meshes (z cache)', cached_time)):
+        print(f"{name:<32}{seconds:>10.4f}{loop_time / seconds:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
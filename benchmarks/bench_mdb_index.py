@@ -0,0 +1,130 @@
+"""
+Benchmark: vnorené prechody tabuliek vs. hash indexy (mdb_index)
+================================================================
+Na syntetickom katalógu porovná pôvodný O(skrinky × šírky) join
+z export_3d.get_cabinets s verziou nad TableIndex.
+
+Spustenie:
+    python benchmarks/bench_mdb_index.py --cabinets 2000 --widths-per-cabinet 10
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import export_3d
+
+
+class SyntheticDatabase:
+    """Náhrada AccessParser s tabuľkami vygenerovanými v pamäti"""
+
+    def __init__(self, n_cabinets, widths_per_cabinet, n_groups, seed=0):
+        rnd = random.Random(seed)
+        group_ids = list(range(1, n_groups + 1))
+
+        self.tables = {
+            'Kusovnik': {
+                'KusovnikID': list(range(1, n_cabinets + 1)),
+                'Platnost': [rnd.random() > 0.05 for _ in range(n_cabinets)],
+                'Nazov': [f'K{i}' for i in range(n_cabinets)],
+                'Kod': [f'K{i}-#' for i in range(n_cabinets)],
+                'Popis': [''] * n_cabinets,
+                'VyskaMM': [rnd.choice([720, 360, 2100]) for _ in range(n_cabinets)],
+                'HlbkaMM': [rnd.choice([560, 320]) for _ in range(n_cabinets)],
+                'GeoID': [rnd.randint(0, 5000) for _ in range(n_cabinets)],
+                'SkupinaID': [rnd.choice(group_ids) for _ in range(n_cabinets)],
+                'PovolitAtyp': [False] * n_cabinets,
+                'ModifikaciaX': [0] * n_cabinets,
+                'ModifikaciaY': [0] * n_cabinets,
+                'ModifikaciaZ': [0] * n_cabinets,
+            },
+            'MatKusovnikSirka': {'KusovnikID': [], 'Platnost': [], 'SirkaMM': [], 'GeoID': []},
+            'SortSkupina': {
+                'SkupinaID': group_ids,
+                'Nazov': [f'Skupina {g}' for g in group_ids],
+            },
+            'SortDruh': {'DruhID': [], 'Nazov': []},
+        }
+
+        # Šírky v náhodnom poradí, ako v reálnej tabuľke
+        sirky = self.tables['MatKusovnikSirka']
+        rows = [(kid, w) for kid in range(1, n_cabinets + 1)
+                for w in range(widths_per_cabinet)]
+        rnd.shuffle(rows)
+        for kid, w in rows:
+            sirky['KusovnikID'].append(kid)
+            sirky['Platnost'].append(rnd.random() > 0.1)
+            sirky['SirkaMM'].append(300 + 50 * w)
+            sirky['GeoID'].append(rnd.randint(1, 5000))
+
+    def parse_table(self, name):
+        return self.tables[name]
+
+
+def get_cabinets_nested(db):
+    """Pôvodná implementácia get_cabinets s vnorenými prechodmi (referencia)"""
+    kusovnik = db.parse_table('Kusovnik')
+    sirky = db.parse_table('MatKusovnikSirka')
+    skupiny = db.parse_table('SortSkupina')
+
+    cabinets = []
+    for i in range(len(kusovnik['KusovnikID'])):
+        if not kusovnik['Platnost'][i]:
+            continue
+        kid = kusovnik['KusovnikID'][i]
+
+        widths = []
+        for j in range(len(sirky['KusovnikID'])):
+            if sirky['KusovnikID'][j] == kid and sirky['Platnost'][j]:
+                widths.append({
+                    'width_mm': sirky['SirkaMM'][j],
+                    'geo_id': sirky['GeoID'][j]
+                })
+
+        skupina_id = kusovnik['SkupinaID'][i]
+        skupina_nazov = None
+        for s in range(len(skupiny['SkupinaID'])):
+            if skupiny['SkupinaID'][s] == skupina_id:
+                skupina_nazov = skupiny['Nazov'][s]
+                break
+
+        cabinets.append({'id': kid, 'group': skupina_nazov, 'widths': widths})
+    return cabinets
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--cabinets', type=int, default=2000)
+    parser.add_argument('--widths-per-cabinet', type=int, default=10)
+    parser.add_argument('--groups', type=int, default=300)
+    args = parser.parse_args()
+
+    db = SyntheticDatabase(args.cabinets, args.widths_per_cabinet, args.groups)
+    n_rows = len(db.tables['MatKusovnikSirka']['KusovnikID'])
+    print(f"Skrinky: {args.cabinets}, riadky šírok: {n_rows}, skupiny: {args.groups}")
+
+    nested, t_nested = timed(get_cabinets_nested, db)
+    indexed, t_indexed = timed(export_3d.get_cabinets, db)
+
+    # Kontrola, že obe verzie dávajú rovnaký výsledok
+    for a, b in zip(nested, indexed):
+        assert a['id'] == b['id'] and a['group'] == b['group'] and a['widths'] == b['widths']
+    assert len(nested) == len(indexed)
+
+    print(f"  vnorené prechody: {t_nested:8.3f} s")
+    print(f"  hash indexy:      {t_indexed:8.3f} s")
+    print(f"  zrýchlenie:       {t_nested / t_indexed:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark: výpočet normál v create_gltf (Python smyčka vs. NumPy)
+=================================================================
+Měří trojúhelníky za sekundu pro původní smyčku po trojúhelnících,
+vektorové hladké normály (mesh_ops.vertex_normals) a normály s creaseAngle
+(mesh_ops.crease_normals) na syntetické válcové síti.
+
+Spuštění:
+    python benchmarks/bench_normals.py --triangles 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'prototype2'))
+
+from mesh_ops import vertex_normals, crease_normals, valid_faces_mask
+
+
+def loop_normals(vertices, faces):
+    """Původní výpočet z create_gltf (reference)"""
+    max_index = len(vertices) - 1
+    faces = np.array([f for f in faces if all(0 <= idx <= max_index for idx in f)], dtype=np.uint32)
+
+    normals = np.zeros_like(vertices)
+    for face in faces:
+        v0, v1, v2 = vertices[face[0]], vertices[face[1]], vertices[face[2]]
+        normal = np.cross(v1 - v0, v2 - v0)
+        norm_length = np.linalg.norm(normal)
+        if norm_length > 0:
+            normal = normal / norm_length
+        normals[face[0]] += normal
+        normals[face[1]] += normal
+        normals[face[2]] += normal
+    for i in range(len(normals)):
+        norm_length = np.linalg.norm(normals[i])
+        if norm_length > 0:
+            normals[i] = normals[i] / norm_length
+    return normals
+
+
+def cylinder_mesh(n_triangles):
+    """Válec (plášť) s přibližně n_triangles trojúhelníky"""
+    segments = max(8, int(np.sqrt(n_triangles / 2)))
+    rings = max(2, n_triangles // (2 * segments) + 1)
+    angle = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    height = np.linspace(0, 1, rings)
+    a, h = np.meshgrid(angle, height)
+    vertices = np.column_stack([np.cos(a).ravel(), h.ravel(), np.sin(a).ravel()]).astype(np.float32)
+
+    r, s = np.meshgrid(np.arange(rings - 1), np.arange(segments), indexing='ij')
+    v00 = r * segments + s
+    v01 = r * segments + (s + 1) % segments
+    v10 = v00 + segments
+    v11 = v01 + segments
+    faces = np.concatenate([
+        np.column_stack([v00.ravel(), v10.ravel(), v01.ravel()]),
+        np.column_stack([v01.ravel(), v10.ravel(), v11.ravel()]),
+    ]).astype(np.uint32)
+    return vertices, faces
+
+
+def rate(fn, n_triangles, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return n_triangles / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--triangles', type=int, default=100000)
+    parser.add_argument('--loop-triangles', type=int, default=20000,
+                        help='velikost sítě pro pomalou referenční smyčku')
+    parser.add_argument('--crease', type=float, default=0.5, help='creaseAngle v radiánech')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    vertices, faces = cylinder_mesh(args.triangles)
+    n = len(faces)
+    small_v, small_f = cylinder_mesh(args.loop_triangles)
+
+    # Kontrola shody s původní implementací
+    ref = loop_normals(small_v, small_f)
+    assert np.allclose(ref, vertex_normals(small_v, small_f), atol=1e-5)
+
+    print(f"Síť: {len(vertices)} vrcholů, {n} trojúhelníků")
+    results = [
+        ('smyčka (původní)', rate(lambda: loop_normals(small_v, small_f), len(small_f), 1)),
+        ('maska validity', rate(lambda: faces[valid_faces_mask(faces, len(vertices))], n, args.repeat)),
+        ('vertex_normals', rate(lambda: vertex_normals(vertices, faces), n, args.repeat)),
+        (f'crease_normals ({args.crease:g} rad)',
+         rate(lambda: crease_normals(vertices, faces, args.crease), n, args.repeat)),
+    ]
+    for name, tps in results:
+        print(f"  {name:28s} {tps:14,.0f} trojúhelníků/s")
+
+
+if __name__ == '__main__':
+    main()
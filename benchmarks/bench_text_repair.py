@@ -0,0 +1,135 @@
+"""
+Benchmark: oprava textů v convert_kitchen_cabinets (postupné replace vs. vrstvy)
+==============================================================================
+Porovná původní postupné str.replace přes všechna pravidla se zkompilovaným
+TextRepairEngine (bez a s pamětí na surový řetězec). Před měřením ověří, že
+engine dává pro celý regresní korpus (text_repair_corpus.json) stejný
+výsledek jako postupné nahrazování.
+
+Korpus se generuje deterministicky ze vzorů pravidel a jejich kombinací;
+po změně pravidel se přegeneruje přes --update-corpus.
+
+Spuštění:
+    python benchmarks/bench_text_repair.py --rows 100000
+    python benchmarks/bench_text_repair.py --update-corpus
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / 'prototype2'))
+
+from convert_kitchen_cabinets import (CONTROL_CHARS, RAW_REPLACEMENTS, LATIN1_MAP, POST_REPLACEMENTS,
+                                      clean_and_translate_text, _text_repair)
+
+CORPUS_PATH = Path(__file__).resolve().parent / 'text_repair_corpus.json'
+
+
+def sequential_clean(text):
+    """Původní clean_and_translate_text: postupné str.replace (reference)"""
+    if not text:
+        return text
+    result = text
+    for c in CONTROL_CHARS:
+        result = result.replace(c, '')
+    for old, new in RAW_REPLACEMENTS:
+        result = result.replace(old, new)
+    for old, new in LATIN1_MAP.items():
+        result = result.replace(old, new)
+    for old, new in POST_REPLACEMENTS:
+        result = result.replace(old, new)
+    if result.endswith('skřín'):
+        result = result[:-5] + 'skříň'
+    if result.endswith('Skřín'):
+        result = result[:-5] + 'Skříň'
+    return result
+
+
+def engine_clean(text):
+    """Engine bez paměti (stejné kroky jako clean_and_translate_text)"""
+    return clean_and_translate_text.__wrapped__(text)
+
+
+def generate_corpus(count=3000, seed=0):
+    """Vzory a výstupy pravidel samostatně, v kontextu a v náhodných kombinacích"""
+    rules = RAW_REPLACEMENTS + list(LATIN1_MAP.items()) + POST_REPLACEMENTS
+    pieces = ([old for old, _ in rules] + [new for _, new in rules] + CONTROL_CHARS +
+              list('aeYHkmnsí~` ') + ['ela', 'ely', 'skřín', 'Skřín', 'Skříňky spodní'])
+    texts = ['', 'Skříňky horní', 'Bok skříň']
+    for old, _ in rules:
+        texts += [old, f'x {old} y', f'{old}{old}', f'{old} skřín']
+    rng = random.Random(seed)
+    while len(texts) < count:
+        texts.append(''.join(rng.choice(pieces) for _ in range(rng.randint(1, 6))))
+    return [[t, sequential_clean(t)] for t in texts]
+
+
+def check_corpus(corpus):
+    """Vrátí seznam rozdílů (vstup, očekáváno, engine)"""
+    failures = []
+    for raw, expected in corpus:
+        got = engine_clean(raw)
+        if got != expected:
+            failures.append((raw, expected, got))
+    return failures
+
+
+def measure(func, rows, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in rows:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help="počet řádků (s opakováním jako v DB)")
+    parser.add_argument('--distinct', type=int, default=500, help="počet různých řetězců mezi řádky")
+    parser.add_argument('--update-corpus', action='store_true', help="přegenerovat regresní korpus")
+    args = parser.parse_args()
+
+    if args.update_corpus:
+        corpus = generate_corpus()
+        # Jedna dvojice na řádek - čitelné rozdíly v gitu
+        with open(CORPUS_PATH, 'w', encoding='utf-8') as f:
+            f.write('[\n' + ',\n'.join(json.dumps(pair) for pair in corpus) + '\n]\n')
+        print(f"Korpus: {len(corpus)} řetězců -> {CORPUS_PATH}")
+
+    with open(CORPUS_PATH, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    failures = check_corpus(corpus)
+    print(f"Regresní korpus: {len(corpus)} řetězců, {len(failures)} rozdílů")
+    for raw, expected, got in failures[:10]:
+        print(f"  {raw!r}: očekáváno {expected!r}, engine {got!r}")
+    if failures:
+        sys.exit(1)
+
+    print(f"Pravidel: {len(_text_repair)}, vrstev: {len(_text_repair.layers)}")
+
+    rng = random.Random(1)
+    distinct = [raw for raw, _ in rng.sample(corpus, min(args.distinct, len(corpus)))]
+    rows = [rng.choice(distinct) for _ in range(args.rows)]
+
+    sequential = measure(sequential_clean, rows)
+    engine = measure(engine_clean, rows)
+    clean_and_translate_text.cache_clear()
+    memo = measure(clean_and_translate_text, rows, repeat=1)
+
+    print(f"{'varianta':<28}{'čas [s]':>10}{'řádků/s':>14}{'zrychlení':>12}")
+    for name, seconds in (('postupné str.replace', sequential),
+                          ('TextRepairEngine', engine),
+                          ('TextRepairEngine + paměť', memo)):
+        print(f"{name:<28}{seconds:>10.3f}{args.rows / seconds:>14,.0f}{sequential / seconds:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
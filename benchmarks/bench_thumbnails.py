@@ -0,0 +1,51 @@
+"""
+Benchmark: náhledy katalogových skříněk
+=======================================
+Vykreslí náhledy všech variant (typ, šířka, výška, hloubka) z
+prototype2/src/data/catalog.json do dočasného adresáře: jedním procesem,
+zadaným počtem procesů a podruhé z cache (nic se nevykresluje). Vypisuje
+náhledy za sekundu a průměrný čas jednoho vykreslení.
+
+Spuštění:
+    python benchmarks/bench_thumbnails.py --workers 4 --size 128
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT / 'prototype2'))
+
+from thumbnails import DEFAULT_SIZE, catalog_meshes, render_mesh, render_thumbnails
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark náhledů (NumPy z-buffer)")
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help="počet procesů (výchozí: počet jader)")
+    args = parser.parse_args()
+
+    meshes = catalog_meshes(ROOT / 'prototype2' / 'src' / 'data' / 'catalog.json')
+    print(f"Modelů: {len(meshes)}, náhled {args.size} px")
+
+    vertices, faces = next(iter(meshes.values()))
+    start = time.perf_counter()
+    for _ in range(20):
+        render_mesh(vertices, faces, args.size)
+    print(f"Jedno vykreslení: {(time.perf_counter() - start) / 20 * 1000:.1f} ms ({len(faces) // 3} trojúhelníků)")
+
+    print(f"{'varianta':<24}{'vykresleno':>12}{'čas [s]':>10}{'náhledů/s':>12}")
+    for name, workers in (('1 proces', 1), (f"procesy ({args.workers or 'auto'})", args.workers)):
+        with tempfile.TemporaryDirectory() as tmp:
+            runs = [(name, render_thumbnails(meshes, tmp, args.size, workers=workers))]
+            runs.append(('  znovu (cache)', render_thumbnails(meshes, tmp, args.size, workers=workers)))
+            for label, stats in runs:
+                rate = stats['models'] / stats['seconds'] if stats['seconds'] else float('inf')
+                print(f"{label:<24}{stats['rendered']:>12}{stats['seconds']:>10.3f}{rate:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: regex extrakce VRML vs. inkrementální parser (vrml_parser)
+=====================================================================
+Měří propustnost v MB/s na souborech z export/vrml a na syntetickém
+velkém souboru s jedním IndexedFaceSet. Pro čtení ze souboru porovná
+původní cestu konvertoru (dekódování celého textu s pokusy o kódování)
+s parse_vrml(cesta), které soubor jednou namapuje (mmap).
+
+Spuštění:
+    python benchmarks/bench_vrml_parser.py --synthetic-mb 20 --repeat 3
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / 'prototype2'))
+
+from vrml_parser import parse_vrml, extract_geometry
+
+
+def parse_regex(vrml_content):
+    """Původní regex cesta z convert_vrml_to_gltf.parse_vrml_geometry (reference)"""
+    coord_matches = re.findall(r'Coordinate\s*\{\s*point\s*\[([\s\S]*?)\]', vrml_content)
+    index_matches = re.findall(r'coordIndex\s*\[([\s\S]*?)\]', vrml_content)
+    if not coord_matches or not index_matches:
+        return None, None
+
+    vertices = []
+    for coord_str in coord_matches:
+        coord_str = re.sub(r'#.*', '', coord_str)
+        numbers = re.findall(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?', coord_str)
+        for i in range(0, len(numbers) - 2, 3):
+            vertices.append([float(numbers[i]), float(numbers[i + 1]), float(numbers[i + 2])])
+
+    faces = []
+    for index_str in index_matches:
+        index_str = re.sub(r'#.*', '', index_str)
+        current_face = []
+        for num in re.findall(r'-?\d+', index_str):
+            idx = int(num)
+            if idx == -1:
+                if len(current_face) >= 3:
+                    for i in range(1, len(current_face) - 1):
+                        faces.append([current_face[0], current_face[i], current_face[i + 1]])
+                current_face = []
+            else:
+                current_face.append(idx)
+
+    return np.array(vertices, dtype=np.float32), np.array(faces, dtype=np.uint32)
+
+
+def read_decoded(path):
+    """Původní čtení v convert_file: celý soubor jako text, postupně utf-8/latin-1/cp1250"""
+    for encoding in ['utf-8', 'latin-1', 'cp1250']:
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                return f.read()
+        except UnicodeDecodeError:
+            continue
+
+
+def synthetic_vrml(target_mb, seed=0):
+    """Vygeneruje VRML s jednou velkou sítí přibližně zadané velikosti"""
+    rng = np.random.default_rng(seed)
+    n_vertices = int(target_mb * 1024 * 1024 / 60)
+    points = rng.uniform(-1, 1, size=(n_vertices, 3))
+    faces = rng.integers(0, n_vertices, size=(n_vertices * 2, 3))
+
+    point_text = ',\n'.join(' '.join(f'{x:.6f}' for x in p) for p in points)
+    index_text = ',\n'.join(f'{a}, {b}, {c}, -1' for a, b, c in faces)
+    return (
+        '#VRML V2.0 utf8\n'
+        'DEF Synth Transform { children [ Shape { geometry IndexedFaceSet {\n'
+        f'coord Coordinate {{ point [\n{point_text}]\n}}\n'
+        f'coordIndex [\n{index_text}]\n'
+        '} } ] }\n'
+    ).encode('ascii')
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(name, data, repeat, path):
+    mb = len(data) / (1024 * 1024)
+    text = data.decode('utf-8', errors='replace')
+
+    t_regex = best_time(lambda: parse_regex(text), repeat)
+    t_stream = best_time(lambda: extract_geometry(parse_vrml(data)), repeat)
+    t_text = best_time(lambda: extract_geometry(parse_vrml(read_decoded(path))), repeat)
+    t_mmap = best_time(lambda: extract_geometry(parse_vrml(path)), repeat)
+
+    print(f"{name[:36]:36s} {mb:8.2f} MB  regex {mb / t_regex:8.1f} MB/s"
+          f"  stream {mb / t_stream:8.1f} MB/s  ({t_regex / t_stream:5.1f}x)"
+          f"  soubor: text {mb / t_text:8.1f} MB/s  mmap {mb / t_mmap:8.1f} MB/s ({t_text / t_mmap:4.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('files', nargs='*', type=Path)
+    parser.add_argument('--synthetic-mb', type=float, default=10.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    files = args.files or sorted((BASE_DIR / 'export' / 'vrml').glob('*.wrl'))
+    for path in files:
+        bench(path.name, path.read_bytes(), args.repeat, path)
+
+    if args.synthetic_mb > 0:
+        data = synthetic_vrml(args.synthetic_mb)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'synteticky.wrl'
+            path.write_bytes(data)
+            bench(f'synteticky ({args.synthetic_mb:g} MB)', data, args.repeat, path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+Manifest inkrementálneho buildu
+===============================
+Mapuje každý zdroj (kľúč, typicky názov súboru) na hash jeho obsahu, verziu
+konvertora a výstupný súbor. Pri ďalšom behu sa zdroj spracuje iba vtedy,
+ak sa zmenil jeho obsah, verzia konvertora alebo chýba výstup.
+"""
+
+import hashlib
+import json
+import os
+
+
+def content_hash(data):
+    """SHA-256 bajtov alebo súboru (ak je zadaná cesta)"""
+    h = hashlib.sha256()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        h.update(data)
+    else:
+        with open(data, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+class BuildManifest:
+    """JSON manifest: kľúč -> {hash, verzia, výstup, štatistiky}"""
+
+    def __init__(self, path, version):
+        self.path = str(path)
+        self.version = version
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get('entries', {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def is_fresh(self, key, source_hash, output=None):
+        """
+        Platí, ak sa zdroj ani verzia nezmenili a výstup stále existuje.
+        Ak je zadaný očakávaný výstup, záznam musí ukazovať práve naň
+        (záznam duplicity odkazuje na výstup iného zdroja).
+        """
+        entry = self.entries.get(key)
+        if not entry:
+            return False
+        if entry.get('hash') != source_hash or entry.get('version') != self.version:
+            return False
+        recorded = entry.get('output')
+        if output is not None and recorded != self._relative(output):
+            return False
+        return recorded is None or os.path.exists(self._output_path(recorded))
+
+    def record(self, key, source_hash, output=None, stats=None):
+        entry = {'hash': source_hash, 'version': self.version}
+        if output is not None:
+            # Výstup sa ukladá relatívne k adresáru manifestu
+            entry['output'] = self._relative(output)
+        if stats:
+            entry['stats'] = stats
+        self.entries[key] = entry
+
+    def remove_orphans(self, live_keys):
+        """Odstráni záznamy (a ich výstupy) pre zdroje, ktoré už neexistujú"""
+        live_keys = set(live_keys)
+        live_outputs = {e.get('output') for k, e in self.entries.items() if k in live_keys}
+        removed = []
+        for key in [k for k in self.entries if k not in live_keys]:
+            entry = self.entries.pop(key)
+            output = entry.get('output')
+            if output and output not in live_outputs:
+                output_path = self._output_path(output)
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                removed.append(output_path)
+        return removed
+
+    def save(self):
+        """Zapíše manifest atomicky"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def _relative(self, output):
+        return os.path.relpath(output, os.path.dirname(self.path) or '.')
+
+    def _output_path(self, output):
+        return os.path.join(os.path.dirname(self.path) or '.', output)
@@ -0,0 +1,218 @@
+"""
+Prúdový zápis katalógu
+======================
+Záznamy (skrinky, modely) sa zapisujú hneď, ako vzniknú, takže pamäť
+drží naraz iba jeden záznam a nie celý katalóg. Výstup je buď JSON
+(objekt so sekciami, kompaktný alebo s odsadením), alebo NDJSON - jeden
+riadok na záznam v tvare {"<sekcia>": záznam}, pri sekcii s kľúčmi
+{"<sekcia>": {"<kľúč>": záznam}}. Voliteľne sa súbežne zapisuje aj
+predkomprimovaný súrodenec .gz (a .br, ak je nainštalovaný brotli).
+
+    with CatalogWriter('catalog.json', compress=('gzip',)) as writer:
+        writer.section('cabinets')
+        for cabinet in cabinets:
+            writer.add(cabinet)
+        writer.section('models', keyed=True)
+        writer.add(model, key=model_id)
+        writer.value('geometry', {...})
+
+Súbory sa píšu do .tmp a na miesto sa presunú až po úspešnom close().
+"""
+
+import gzip
+import json
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIONS = ('gzip', 'br')
+_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+class CatalogWriter:
+    """JSON/NDJSON katalóg zapisovaný po záznamoch (path, ndjson, indent, compress)"""
+
+    def __init__(self, path, ndjson=False, indent=None, compress=(), default=None):
+        unknown = set(compress) - set(COMPRESSIONS)
+        if unknown:
+            raise ValueError(f"Neznáma kompresia: {', '.join(sorted(unknown))}")
+        if 'br' in compress and brotli is None:
+            raise RuntimeError("Kompresia .br vyžaduje balík brotli (pip install brotli)")
+
+        self.path = path
+        self.ndjson = ndjson
+        self.indent = None if ndjson else indent
+        self.compress = tuple(compress)
+        self.default = default
+        self.sizes = {}
+        self.records = 0
+
+        self._targets = {None: path}
+        self._targets.update((c, path + _SUFFIXES[c]) for c in self.compress)
+        self._file = open(path + '.tmp', 'wb')
+        self._gzip_raw = self._gzip = self._brotli = self._brotli_file = None
+        if 'gzip' in self.compress:
+            # mtime=0 - rovnaký obsah dá rovnaké bajty (cache, hash)
+            self._gzip_raw = open(path + '.gz.tmp', 'wb')
+            self._gzip = gzip.GzipFile(fileobj=self._gzip_raw, mode='wb', compresslevel=9, mtime=0)
+        if 'br' in self.compress:
+            self._brotli_file = open(path + '.br.tmp', 'wb')
+            self._brotli = brotli.Compressor(mode=brotli.MODE_TEXT)
+
+        self._root = None       # '{' alebo '[' po prvom zápise (JSON)
+        self._section = None    # (názov, keyed) aktuálnej sekcie
+        self._first_field = True
+        self._first_item = True
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    # --- zápis ---
+
+    def _emit(self, text):
+        data = text.encode('utf-8')
+        self._file.write(data)
+        if self._gzip is not None:
+            self._gzip.write(data)
+        if self._brotli is not None:
+            self._brotli_file.write(self._brotli.process(data))
+
+    def _dumps(self, value, level=0):
+        if self.indent is None:
+            return json.dumps(value, separators=(',', ':'), ensure_ascii=False, default=self.default)
+        text = json.dumps(value, indent=self.indent, ensure_ascii=False, default=self.default)
+        return text.replace('\n', '\n' + ' ' * (self.indent * level))
+
+    def _newline(self, level):
+        return '' if self.indent is None else '\n' + ' ' * (self.indent * level)
+
+    def _open_root(self, bracket):
+        if self._root is None:
+            self._root = bracket
+            if not self.ndjson:
+                self._emit(bracket)
+        elif self._root != bracket:
+            raise ValueError("Katalóg je buď objekt so sekciami, alebo jedno pole")
+
+    def _close_section(self):
+        if self._section is not None and not self.ndjson:
+            name, keyed = self._section
+            if name is not None:
+                self._emit(self._newline(1) + ('}' if keyed else ']'))
+        self._section = None
+
+    def _field(self, name):
+        """Začne pole objektu na najvyššej úrovni ("name":)"""
+        self._open_root('{')
+        if not self.ndjson:
+            separator = '' if self._first_field else ','
+            colon = ':' if self.indent is None else ': '
+            self._emit(separator + self._newline(1) + json.dumps(name, ensure_ascii=False) + colon)
+        self._first_field = False
+
+    def value(self, name, value):
+        """Jedno pole na najvyššej úrovni (napr. odkaz na geometriu)"""
+        self._close_section()
+        if self.ndjson:
+            self._open_root('{')
+            self._emit(self._dumps({name: value}) + '\n')
+        else:
+            self._field(name)
+            self._emit(self._dumps(value, 1))
+
+    def section(self, name, keyed=False):
+        """
+        Začne sekciu záznamov: pole, alebo s keyed=True objekt kľúč -> záznam.
+        name=None znamená, že celý dokument je jedno pole záznamov.
+        """
+        self._close_section()
+        if name is None:
+            if self._root is not None:
+                raise ValueError("Pole ako dokument musí byť jediná sekcia")
+            self._open_root('[')
+        else:
+            self._field(name)
+            if not self.ndjson:
+                self._emit('{' if keyed else '[')
+        self._section = (name, keyed)
+        self._first_item = True
+
+    def add(self, record, key=None):
+        """Zapíše jeden záznam do aktuálnej sekcie"""
+        if self._section is None:
+            raise ValueError("Záznam mimo sekcie - najprv section()")
+        name, keyed = self._section
+        if keyed and key is None:
+            raise ValueError(f"Sekcia {name!r} vyžaduje kľúč záznamu")
+
+        if self.ndjson:
+            if name is None:
+                line = record
+            else:
+                line = {name: {str(key): record}} if keyed else {name: record}
+            self._emit(self._dumps(line) + '\n')
+        else:
+            level = 1 if name is None else 2
+            text = self._newline(level)
+            if keyed:
+                text += json.dumps(str(key), ensure_ascii=False) + ':' + ('' if self.indent is None else ' ')
+            self._emit(('' if self._first_item else ',') + text + self._dumps(record, level))
+        self._first_item = False
+        self.records += 1
+
+    # --- ukončenie ---
+
+    def close(self):
+        """Dokončí dokument a presunie súbory na miesto; vráti veľkosti v bajtoch"""
+        if self._closed:
+            return self.sizes
+        self._close_section()
+        if not self.ndjson:
+            if self._root is None:
+                self._emit('{}')
+            else:
+                self._emit(self._newline(0) + ('}' if self._root == '{' else ']'))
+            if self.indent is not None:
+                self._emit('\n')
+
+        self._file.close()
+        if self._gzip is not None:
+            self._gzip.close()
+            self._gzip_raw.close()
+        if self._brotli is not None:
+            self._brotli_file.write(self._brotli.finish())
+            self._brotli_file.close()
+        self._closed = True
+
+        for compression, target in self._targets.items():
+            os.replace(target + '.tmp', target)
+            self.sizes[compression or 'raw'] = os.path.getsize(target)
+        # Súrodenci z predchádzajúceho behu s inou kompresiou by boli zastarané
+        for compression, suffix in _SUFFIXES.items():
+            stale = self.path + suffix
+            if compression not in self.compress and os.path.exists(stale):
+                os.remove(stale)
+        return self.sizes
+
+    def abort(self):
+        """Zahodí rozpísané súbory (pôvodné výstupy ostanú nezmenené)"""
+        if self._closed:
+            return
+        self._closed = True
+        for handle in (self._gzip, self._gzip_raw, self._brotli_file, self._file):
+            if handle is not None:
+                handle.close()
+        for target in self._targets.values():
+            if os.path.exists(target + '.tmp'):
+                os.remove(target + '.tmp')
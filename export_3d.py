@@ -8,15 +8,21 @@ Databáza obsahuje:
 - GeoScriptSortTechn: parametrické skripty pre generovanie geometrie
 """
 
-from access_parser import AccessParser
+from table_cache import CachedAccessParser
+from mdb_index import width_index, group_index
+from geometry_store import GeometryStore
+from build_manifest import BuildManifest, content_hash
+from catalog_stream import CatalogWriter
 import zlib
 import os
-import json
+
+# Zvýš pri zmene formátu exportovaných .wrl - vynúti prepísanie všetkých súborov
+VRML_EXPORT_VERSION = 1
 
 
 def load_database(db_path):
-    """Načíta Access databázu a vráti parser"""
-    return AccessParser(db_path)
+    """Načíta Access databázu a vráti parser (tabuľky sa cachujú na disku)"""
+    return CachedAccessParser(db_path)
 
 
 def get_cabinets(db):
@@ -26,6 +32,10 @@ def get_cabinets(db):
     skupiny = db.parse_table('SortSkupina')
     druhy = db.parse_table('SortDruh')
 
+    # Indexy sa zostavia raz, nie pre každú skrinku
+    sirky_idx = width_index(sirky)
+    skupiny_idx = group_index(skupiny)
+
     cabinets = []
 
     for i in range(len(kusovnik['KusovnikID'])):
@@ -35,21 +45,14 @@ def get_cabinets(db):
         kid = kusovnik['KusovnikID'][i]
 
         # Získaj šírky pre túto skrinku
-        widths = []
-        for j in range(len(sirky['KusovnikID'])):
-            if sirky['KusovnikID'][j] == kid and sirky['Platnost'][j]:
-                widths.append({
-                    'width_mm': sirky['SirkaMM'][j],
-                    'geo_id': sirky['GeoID'][j]
-                })
+        widths = [{
+            'width_mm': sirky['SirkaMM'][j],
+            'geo_id': sirky['GeoID'][j]
+        } for j in sirky_idx.rows(kid)]
 
         # Nájdi skupinu
         skupina_id = kusovnik['SkupinaID'][i]
-        skupina_nazov = None
-        for s in range(len(skupiny['SkupinaID'])):
-            if skupiny['SkupinaID'][s] == skupina_id:
-                skupina_nazov = skupiny['Nazov'][s]
-                break
+        skupina_nazov = skupiny_idx.first(skupina_id, 'Nazov')
 
         cabinet = {
             'id': kid,
@@ -71,61 +74,71 @@ def get_cabinets(db):
     return cabinets
 
 
-def get_geometry(db, geo_id):
-    """Získa VRML geometriu pre dané GeoID"""
-    geo = db.parse_table('GeoObjekt')
-
-    for i in range(len(geo['GeoID'])):
-        if geo['GeoID'][i] == geo_id:
-            grafika = geo['Grafika'][i]
-            if grafika and isinstance(grafika, bytes):
-                try:
-                    # Dekomprimuj (prvé 4 bajty sú hlavička)
-                    decompressed = zlib.decompress(grafika[4:])
-                    return {
-                        'format': 'vrml',
-                        'description': geo['Popis'][i],
-                        'data': decompressed.decode('utf-8', errors='replace')
-                    }
-                except Exception as e:
-                    return {'error': str(e)}
-    return None
-
-
-def export_cabinet_vrml(db, cabinet, output_dir):
-    """Exportuje skrinku do VRML súborov"""
+def get_geometry(store, geo_id):
+    """Získa VRML geometriu pre dané GeoID zo zdieľaného GeometryStore"""
+    return store.get(geo_id)
+
+
+def write_geometry(store, geo_id, filepath, manifest=None):
+    """
+    Zapíše VRML pre GeoID do súboru. S manifestom sa súbor prepíše iba vtedy,
+    ak sa dekomprimované bajty Grafika zmenili.
+    Vráti True (zapísané), False (nezmenené) alebo None (geometria chýba).
+    """
+    try:
+        data = store.get_bytes(geo_id)
+    except zlib.error:
+        return None
+    if data is None:
+        return None
+
+    key = os.path.basename(filepath)
+    digest = content_hash(data)
+    if manifest is not None and manifest.is_fresh(key, digest):
+        return False
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write(data.decode('utf-8', errors='replace'))
+    if manifest is not None:
+        manifest.record(key, digest, filepath)
+    return True
+
+
+def export_cabinet_vrml(store, cabinet, output_dir, manifest=None):
+    """Exportuje skrinku do VRML súborov (store je GeometryStore, manifest BuildManifest)"""
     os.makedirs(output_dir, exist_ok=True)
 
+    def export(geo_id, filename):
+        written = write_geometry(store, geo_id, os.path.join(output_dir, filename), manifest)
+        if written:
+            print(f"  Exportované: {filename}")
+        elif written is False:
+            print(f"  Nezmenené: {filename}")
+        return written is not None
+
     # Exportuj hlavnú geometriu
     if cabinet['geo_id'] and cabinet['geo_id'] > 0:
-        geo = get_geometry(db, cabinet['geo_id'])
-        if geo and 'data' in geo:
-            filename = f"{cabinet['name']}_main.wrl"
-            filepath = os.path.join(output_dir, filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(geo['data'])
-            print(f"  Exportované: {filename}")
+        export(cabinet['geo_id'], f"{cabinet['name']}_main.wrl")
 
     # Exportuj geometriu pre každú šírku
     exported_geo_ids = set()
     for width_info in cabinet['widths']:
         geo_id = width_info['geo_id']
         if geo_id and geo_id > 0 and geo_id not in exported_geo_ids:
-            geo = get_geometry(db, geo_id)
-            if geo and 'data' in geo:
-                filename = f"{cabinet['name']}_geo{geo_id}.wrl"
-                filepath = os.path.join(output_dir, filename)
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(geo['data'])
-                print(f"  Exportované: {filename}")
+            if export(geo_id, f"{cabinet['name']}_geo{geo_id}.wrl"):
                 exported_geo_ids.add(geo_id)
 
 
-def export_all_cabinets_json(cabinets, output_file):
-    """Exportuje všetky skrinky do JSON súboru"""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(cabinets, f, indent=2, ensure_ascii=False, default=str)
-    print(f"Exportované: {output_file}")
+def export_all_cabinets_json(cabinets, output_file, indent=None, compress=()):
+    """
+    Exportuje skrinky do JSON poľa po záznamoch (cabinets môže byť aj generátor).
+    indent=None zapíše kompaktný JSON, compress pridá súrodencov .gz/.br.
+    """
+    with CatalogWriter(output_file, indent=indent, compress=compress, default=str) as writer:
+        writer.section(None)
+        for cabinet in cabinets:
+            writer.add(cabinet)
+    print(f"Exportované: {output_file} ({writer.records} skriniek, {writer.sizes['raw']} B)")
 
 
 def print_cabinet_summary(cabinets):
@@ -169,14 +182,18 @@ def main():
     # Export JSON
     json_file = os.path.join(output_dir, 'cabinets.json')
     os.makedirs(output_dir, exist_ok=True)
-    export_all_cabinets_json(cabinets, json_file)
+    export_all_cabinets_json(cabinets, json_file, compress=('gzip',))
 
     # Export VRML (len prvých 10 pre ukážku)
     print("\nExportujem VRML geometriu (ukážka prvých 10)...")
+    store = GeometryStore(db)
+    vrml_dir = os.path.join(output_dir, 'vrml')
+    manifest = BuildManifest(os.path.join(vrml_dir, '.manifest.json'), VRML_EXPORT_VERSION)
     for cab in cabinets[:10]:
         if cab['widths'] or (cab['geo_id'] and cab['geo_id'] > 0):
             print(f"\n{cab['name']} ({cab['code']}):")
-            export_cabinet_vrml(db, cab, os.path.join(output_dir, 'vrml'))
+            export_cabinet_vrml(store, cab, vrml_dir, manifest)
+    manifest.save()
 
 
 if __name__ == '__main__':
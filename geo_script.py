@@ -0,0 +1,326 @@
+"""
+Parametrické skripty geometrie z tabuľky GeoScriptSortTechn
+==========================================================
+Skript opisuje skrinku ako zoznam kvádrov, ktorých poloha a rozmer sú
+výrazy nad šírkou W, výškou H a hĺbkou D (v mm).
+
+Pozor: názvy stĺpcov (SCRIPT_COLUMNS) aj syntax skriptu nižšie sú odhad,
+nie sú prečítané zo skutočnej schémy ani obsahu tabuľky v sort.mdb. Pred
+použitím ich treba overiť na reálnych dátach; GeoScriptLibrary pri
+neznámej schéme vyhodí GeoScriptError so zoznamom nájdených stĺpcov.
+Dovtedy modul nie je zapojený do exportu (export_3d ho nepoužíva).
+Parser predpokladá jednoduchý riadkový zápis:
+
+    # komentár (aj ; alebo //)
+    T = 18
+    BOX 0, 0, 0, T, H, D
+    BOX W - T, 0, 0, T, H, D
+    BOX T, 0, 0, W - 2*T, T, D
+
+Príkazy sú priradenie premennej a BOX x, y, z, šírka, výška, hĺbka.
+Výrazy poznajú čísla, premenné, + - * /, zátvorky a funkcie min/max/abs.
+
+Skript sa raz rozparsuje na AST, overí (iba povolené uzly, limit počtu
+príkazov) a preloží na Python funkciu (W, H, D) -> kvádre. Nič iné ako
+aritmetika sa v nej vykonať nedá, takže skript z databázy nemôže volať
+ľubovoľný kód. Preložené skripty sa pamätajú podľa textu, hotové siete
+podľa (GeoID, W, H, D).
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+TABLE_NAME = 'GeoScriptSortTechn'
+# Odhadnuté názvy stĺpca so skriptom (skutočná schéma tabuľky nie je overená)
+SCRIPT_COLUMNS = ('Script', 'Skript', 'Text', 'Program')
+
+MAX_STATEMENTS = 1000
+MAX_BOXES = 500
+FUNCTIONS = {'min': min, 'max': max, 'abs': abs}
+PARAMETERS = ('W', 'H', 'D')
+
+# Rohy kvádra a jeho trojuholníky (rovnako ako cabinet_geometry)
+BOX_CORNERS = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=np.float64)
+BOX_INDICES = np.array([
+    0, 1, 2, 0, 2, 3, 5, 4, 7, 5, 7, 6,
+    4, 0, 3, 4, 3, 7, 1, 5, 6, 1, 6, 2,
+    4, 5, 1, 4, 1, 0, 3, 2, 6, 3, 6, 7,
+], dtype=np.uint32)
+
+_TOKEN = re.compile(r'\s*(?:(\d+(?:\.\d*)?|\.\d+)|([A-Za-z_]\w*)|(.))')
+_COMMENT = re.compile(r'(#|;|//).*$')
+
+
+class GeoScriptError(ValueError):
+    """Neplatný skript alebo chyba pri jeho vyhodnotení"""
+
+
+# AST: ('num', hodnota) | ('var', meno) | ('neg', uzol) | ('bin', op, ľavý, pravý)
+#      | ('call', meno, [argumenty]); príkazy ('set', meno, výraz) | ('box', [6 výrazov])
+
+def _tokenize(line):
+    tokens = []
+    pos = 0
+    line = line.rstrip()
+    while pos < len(line):
+        match = _TOKEN.match(line, pos)
+        number, name, symbol = match.groups()
+        if number:
+            tokens.append(('num', float(number)))
+        elif name:
+            tokens.append(('name', name))
+        elif symbol in '+-*/(),=':
+            tokens.append(('op', symbol))
+        else:
+            raise GeoScriptError(f"Neplatný znak {symbol!r}")
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """Rekurzívny zostup pre výrazy jedného riadku"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None or (value is not None and token[1] != value):
+            raise GeoScriptError(f"Očakávané {value or 'pokračovanie'}, nájdené {token[1]!r}")
+        self.pos += 1
+        return token
+
+    def done(self):
+        return self.pos == len(self.tokens)
+
+    def expression(self):
+        node = self.term()
+        while self.peek() in (('op', '+'), ('op', '-')):
+            op = self.take()[1]
+            node = ('bin', op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.factor()
+        while self.peek() in (('op', '*'), ('op', '/')):
+            op = self.take()[1]
+            node = ('bin', op, node, self.factor())
+        return node
+
+    def factor(self):
+        kind, value = self.take()
+        if kind == 'num':
+            return ('num', value)
+        if kind == 'op' and value == '-':
+            return ('neg', self.factor())
+        if kind == 'op' and value == '+':
+            return self.factor()
+        if kind == 'op' and value == '(':
+            node = self.expression()
+            self.take(')')
+            return node
+        if kind == 'name':
+            if self.peek() == ('op', '('):
+                name = value.lower()
+                if name not in FUNCTIONS:
+                    raise GeoScriptError(f"Neznáma funkcia {value!r}")
+                self.take('(')
+                args = [self.expression()]
+                while self.peek() == ('op', ','):
+                    self.take(',')
+                    args.append(self.expression())
+                self.take(')')
+                return ('call', name, args)
+            return ('var', value.upper())
+        raise GeoScriptError(f"Neočakávané {value!r}")
+
+
+def parse_script(text):
+    """Text skriptu -> zoznam príkazov (AST)"""
+    statements = []
+    for number, raw in enumerate(text.replace('\r', '').split('\n'), 1):
+        line = _COMMENT.sub('', raw).strip()
+        if not line:
+            continue
+        try:
+            tokens = _tokenize(line)
+            if tokens[0][0] == 'name' and tokens[0][1].upper() == 'BOX':
+                parser = _Parser(tokens[1:])
+                args = [parser.expression()]
+                while not parser.done():
+                    parser.take(',')
+                    args.append(parser.expression())
+                if len(args) != 6:
+                    raise GeoScriptError(f"BOX potrebuje 6 hodnôt, má {len(args)}")
+                statements.append(('box', args))
+            elif len(tokens) > 2 and tokens[0][0] == 'name' and tokens[1] == ('op', '='):
+                name = tokens[0][1].upper()
+                if name in PARAMETERS:
+                    raise GeoScriptError(f"Parameter {name} sa nedá prepísať")
+                parser = _Parser(tokens[2:])
+                value = parser.expression()
+                if not parser.done():
+                    raise GeoScriptError(f"Nadbytočné {parser.peek()[1]!r}")
+                statements.append(('set', name, value))
+            else:
+                raise GeoScriptError("Neznámy príkaz")
+        except GeoScriptError as e:
+            raise GeoScriptError(f"Riadok {number}: {e}") from None
+        if len(statements) > MAX_STATEMENTS:
+            raise GeoScriptError(f"Skript má viac ako {MAX_STATEMENTS} príkazov")
+    if sum(1 for s in statements if s[0] == 'box') > MAX_BOXES:
+        raise GeoScriptError(f"Skript má viac ako {MAX_BOXES} kvádrov")
+    return statements
+
+
+def _emit(node, defined, bare=False):
+    """
+    AST výrazu -> Python výraz (premenné skriptu majú predponu v_).
+    bare: binárna operácia bez vonkajších zátvoriek. Ľavý operand sa
+    nezátvorkuje, kde to priorita dovolí, inak by dlhý súčet a+b+c+...
+    prekročil limit vnorených zátvoriek Python parsera.
+    """
+    kind = node[0]
+    if kind == 'num':
+        return repr(node[1])
+    if kind == 'var':
+        if node[1] not in defined:
+            raise GeoScriptError(f"Nedefinovaná premenná {node[1]}")
+        return f"v_{node[1]}"
+    if kind == 'neg':
+        return f"(-{_emit(node[1], defined)})"
+    if kind == 'bin':
+        left = node[2]
+        left_bare = node[1] in '+-' or (left[0] == 'bin' and left[1] in '*/')
+        body = f"{_emit(left, defined, left_bare)} {node[1]} {_emit(node[3], defined)}"
+        return body if bare else f"({body})"
+    if kind == 'call':
+        return f"f_{node[1]}({', '.join(_emit(a, defined) for a in node[2])})"
+    raise GeoScriptError(f"Neznámy uzol {kind!r}")
+
+
+@lru_cache(maxsize=1024)
+def compile_script(text):
+    """
+    Preloží skript na funkciu (W, H, D) -> zoznam kvádrov (x, y, z, sx, sy, sz)
+    v mm. Zdrojový kód funkcie vzniká iba z overeného AST (čísla, premenné,
+    aritmetika, min/max/abs), preto ho možno bezpečne skompilovať.
+    Príliš hlboko vnorené výrazy vyhodia GeoScriptError.
+    """
+    try:
+        return _compile_program(text)
+    except (RecursionError, MemoryError) as e:
+        raise GeoScriptError(f"Skript je príliš hlboko vnorený ({type(e).__name__})") from None
+    except SyntaxError as e:
+        raise GeoScriptError(f"Skript sa nedá preložiť: {e.msg}") from None
+
+
+def _compile_program(text):
+    defined = set(PARAMETERS)
+    lines = []
+    boxes = []
+    for statement in parse_script(text):
+        if statement[0] == 'set':
+            lines.append(f"    v_{statement[1]} = {_emit(statement[2], defined)}")
+            defined.add(statement[1])
+        else:
+            name = f"b{len(boxes)}"
+            lines.append(f"    {name} = ({', '.join(_emit(a, defined) for a in statement[1])})")
+            boxes.append(name)
+    lines.append(f"    return ({''.join(b + ', ' for b in boxes)})")
+    source = "def program(v_W, v_H, v_D):\n" + '\n'.join(lines) + '\n'
+
+    namespace = {'__builtins__': {}}
+    namespace.update((f"f_{name}", func) for name, func in FUNCTIONS.items())
+    exec(compile(source, '<GeoScript>', 'exec'), namespace)
+    return namespace['program']
+
+
+def boxes_to_mesh(boxes):
+    """Kvádre v mm -> {'vertices' (N, 3) float32 v metroch, 'indices', 'type'}"""
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 6) / 1000.0
+    # Záporný rozmer = kváder na druhú stranu od počiatku, nulový sa vynechá
+    origin = np.minimum(boxes[:, :3], boxes[:, :3] + boxes[:, 3:])
+    extent = np.abs(boxes[:, 3:])
+    keep = (extent > 0).all(axis=1)
+    origin, extent = origin[keep], extent[keep]
+
+    vertices = origin[:, None, :] + BOX_CORNERS[None, :, :] * extent[:, None, :]
+    indices = (BOX_INDICES[None, :] + 8 * np.arange(len(origin), dtype=np.uint32)[:, None]).ravel()
+    return {'vertices': vertices.reshape(-1, 3).astype(np.float32), 'indices': indices, 'type': 'script'}
+
+
+def evaluate_script(text, width, height, depth):
+    """Vyhodnotí skript pre rozmery v mm a vráti sieť (boxes_to_mesh)"""
+    program = compile_script(text)
+    try:
+        boxes = program(float(width), float(height), float(depth))
+    except (ZeroDivisionError, OverflowError, TypeError, RecursionError) as e:
+        raise GeoScriptError(f"Chyba vyhodnotenia ({width}x{height}x{depth}): {e}") from None
+    return boxes_to_mesh(boxes)
+
+
+class GeoScriptLibrary:
+    """Skripty GeoScriptSortTechn podľa GeoID s pamäťou vygenerovaných sietí"""
+
+    def __init__(self, db, column=None):
+        """column: názov stĺpca so skriptom, ak nie je medzi SCRIPT_COLUMNS"""
+        table = db.parse_table(TABLE_NAME)
+        candidates = (column,) if column else SCRIPT_COLUMNS
+        column = next((c for c in candidates if c in table), None)
+        if column is None or 'GeoID' not in table:
+            raise GeoScriptError(
+                f"{TABLE_NAME}: neznáma schéma - očakávaný stĺpec GeoID a jeden z "
+                f"({', '.join(candidates)}), nájdené ({', '.join(table) or 'žiadne stĺpce'})")
+
+        # GeoID -> text skriptu; berie sa prvý neprázdny riadok
+        self._scripts = {}
+        for geo_id, script in zip(table['GeoID'], table[column]):
+            if isinstance(script, bytes):
+                script = script.decode('utf-8', errors='replace')
+            if geo_id not in self._scripts and script and script.strip():
+                self._scripts[geo_id] = script
+
+        self._meshes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, geo_id):
+        return geo_id in self._scripts
+
+    def __len__(self):
+        return len(self._scripts)
+
+    def script(self, geo_id):
+        """Text skriptu pre GeoID alebo None"""
+        return self._scripts.get(geo_id)
+
+    def mesh(self, geo_id, width, height, depth):
+        """
+        Sieť pre GeoID a rozmery v mm (polia len na čítanie) alebo None, ak
+        GeoID nemá skript. Neplatný skript vyhodí GeoScriptError.
+        """
+        key = (geo_id, width, height, depth)
+        mesh = self._meshes.get(key)
+        if mesh is not None:
+            self.hits += 1
+            return mesh
+        text = self._scripts.get(geo_id)
+        if text is None:
+            return None
+
+        self.misses += 1
+        mesh = evaluate_script(text, width, height, depth)
+        mesh['vertices'].flags.writeable = False
+        mesh['indices'].flags.writeable = False
+        self._meshes[key] = mesh
+        return mesh
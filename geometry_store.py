@@ -0,0 +1,118 @@
+"""
+Úložisko VRML geometrie z tabuľky GeoObjekt
+===========================================
+Tabuľka GeoObjekt sa načíta iba raz a zostaví sa index GeoID -> riadok.
+Stĺpec Grafika (zlib, prvé 4 bajty sú hlavička) sa dekomprimuje až pri prvom
+prístupe a výsledok sa drží v LRU cache obmedzenej celkovou veľkosťou.
+Hash obsahu (content_hash) umožňuje nájsť rôzne GeoID s rovnakým VRML.
+"""
+
+import zlib
+from collections import OrderedDict
+
+from build_manifest import content_hash
+
+
+class GeometryStore:
+    """Lenivo dekomprimovaná geometria GeoObjekt s LRU cache"""
+
+    def __init__(self, db, max_bytes=256 * 1024 * 1024):
+        geo = db.parse_table('GeoObjekt')
+        self._grafika = geo['Grafika']
+        self.max_bytes = max_bytes
+
+        # GeoID -> (index riadku, Popis); berie sa prvý riadok s dátami
+        self._index = {}
+        for i, geo_id in enumerate(geo['GeoID']):
+            grafika = self._grafika[i]
+            if geo_id in self._index or not (grafika and isinstance(grafika, bytes)):
+                continue
+            self._index[geo_id] = (i, geo['Popis'][i])
+
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._hashes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, geo_id):
+        return geo_id in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def geo_ids(self):
+        """Vráti všetky GeoID, ktoré majú geometriu"""
+        return list(self._index)
+
+    def description(self, geo_id):
+        """Vráti Popis geometrie alebo None"""
+        entry = self._index.get(geo_id)
+        return entry[1] if entry else None
+
+    def get_bytes(self, geo_id):
+        """
+        Vráti dekomprimované VRML bajty pre GeoID alebo None, ak neexistuje.
+        Chybu dekompresie (zlib.error) necháva prejsť volajúcemu.
+        """
+        data = self._cache.get(geo_id)
+        if data is not None:
+            self._cache.move_to_end(geo_id)
+            self.hits += 1
+            return data
+
+        entry = self._index.get(geo_id)
+        if entry is None:
+            return None
+
+        self.misses += 1
+        data = zlib.decompress(self._grafika[entry[0]][4:])
+        self._remember(geo_id, data)
+        return data
+
+    def content_hash(self, geo_id):
+        """
+        SHA-256 dekomprimovaného VRML (hex) alebo None, ak GeoID neexistuje.
+        Hash sa pamätá, blob sa nemusí držať v cache.
+        """
+        digest = self._hashes.get(geo_id)
+        if digest is None:
+            data = self.get_bytes(geo_id)
+            if data is None:
+                return None
+            digest = self._hashes[geo_id] = content_hash(data)
+        return digest
+
+    def get_text(self, geo_id):
+        """Vráti VRML ako text alebo None (aj pri chybe dekompresie)"""
+        try:
+            data = self.get_bytes(geo_id)
+        except zlib.error:
+            return None
+        if data is None:
+            return None
+        return data.decode('utf-8', errors='replace')
+
+    def get(self, geo_id):
+        """Vráti geometriu v tvare {'format', 'description', 'data'}"""
+        if geo_id not in self._index:
+            return None
+        try:
+            data = self.get_bytes(geo_id)
+        except Exception as e:
+            return {'error': str(e)}
+        return {
+            'format': 'vrml',
+            'description': self.description(geo_id),
+            'data': data.decode('utf-8', errors='replace')
+        }
+
+    def _remember(self, geo_id, data):
+        """Uloží blob do cache a vyhodí najstaršie položky nad limit"""
+        if len(data) > self.max_bytes:
+            return
+        self._cache[geo_id] = data
+        self._cache_bytes += len(data)
+        while self._cache_bytes > self.max_bytes:
+            _, old = self._cache.popitem(last=False)
+            self._cache_bytes -= len(old)
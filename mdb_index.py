@@ -0,0 +1,62 @@
+"""
+Hash indexy nad tabuľkami z Access databázy
+===========================================
+AccessParser.parse_table vracia tabuľku ako slovník stĺpcov (zoznamov).
+Namiesto vnorených prechodov cez celú tabuľku pre každý riadok inej tabuľky
+sa index zostaví raz a potom sa riadky hľadajú podľa kľúča v O(1).
+"""
+
+from collections import defaultdict
+
+
+class TableIndex:
+    """Index riadkov tabuľky podľa hodnoty jedného stĺpca"""
+
+    def __init__(self, table, key, where=None):
+        """
+        table: tabuľka z parse_table (stĺpec -> zoznam hodnôt)
+        key: stĺpec, podľa ktorého sa indexuje
+        where: voliteľný stĺpec, riadky s nepravdivou hodnotou sa vynechajú
+               (typicky 'Platnost')
+        """
+        self.table = table
+        self.key = key
+        self._rows = defaultdict(list)
+
+        keys = table[key]
+        flags = table[where] if where else None
+        for i, k in enumerate(keys):
+            if flags is None or flags[i]:
+                self._rows[k].append(i)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def rows(self, key):
+        """Vráti indexy riadkov s danou hodnotou kľúča (v poradí tabuľky)"""
+        return self._rows.get(key, [])
+
+    def values(self, key, column):
+        """Vráti hodnoty stĺpca pre všetky riadky s danou hodnotou kľúča"""
+        col = self.table[column]
+        return [col[i] for i in self._rows.get(key, [])]
+
+    def first(self, key, column, default=None):
+        """Vráti hodnotu stĺpca z prvého riadku s danou hodnotou kľúča"""
+        rows = self._rows.get(key)
+        if not rows:
+            return default
+        return self.table[column][rows[0]]
+
+
+def width_index(sirky):
+    """Index platných šírok MatKusovnikSirka podľa KusovnikID"""
+    return TableIndex(sirky, 'KusovnikID', where='Platnost')
+
+
+def group_index(skupiny):
+    """Index skupín SortSkupina podľa SkupinaID"""
+    return TableIndex(skupiny, 'SkupinaID')
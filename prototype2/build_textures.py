@@ -0,0 +1,233 @@
+"""
+Příprava textur dekorů pro Kitchen Designer
+===========================================
+Zdrojové PNG v public/textures/decors jsou plné rozlišení (několik MB).
+Pro každý lokální dekor z decors.json se:
+- volitelně ořízne okraj (procenta jako scripts/crop-textures.cjs),
+- změní velikost na mocniny dvou (delší strana nejvýše --max-size,
+  poměr stran zachován na nejbližší mocninu dvou),
+- vygeneruje řetězec mip úrovní až po --min-size,
+- každá úroveň uloží jako WebP a JPEG (záloha),
+- vytvoří malý čtvercový náhled pro katalog.
+
+Výstupy mají v názvu hash obsahu (dlouhodobá cache) a leží v
+public/textures/decors/<id>/. decors.json dostane imageUrl (největší WebP),
+thumbUrl (náhled WebP), sourceUrl (původní PNG) a textures s URL všech
+úrovní. Kontejnery KTX2/Basis se negenerují - pro Python není k dispozici
+enkodér; WebP/JPEG úrovně fungují ve všech prohlížečích.
+
+Vyžaduje Pillow (pip install pillow). Nezměněné zdroje se podle manifestu
+přeskočí.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from build_manifest import BuildManifest, content_hash
+from catalog_shards import hashed_name
+
+# Zvyš při změně výstupu - vynutí přestavbu všech textur
+TEXTURE_BUILD_VERSION = 2
+MANIFEST_NAME = ".textures-manifest.json"
+LOCAL_PREFIX = "/textures/decors/"
+
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_MIN_SIZE = 64
+THUMB_SIZE = 128
+WEBP_QUALITY = 82
+JPEG_QUALITY = 85
+
+
+def power_of_two(value, max_size):
+    """Nejbližší mocnina dvou k value (nejvýše max_size)"""
+    size = 1
+    while size * 2 <= max_size and abs(size * 2 - value) <= abs(size - value):
+        size *= 2
+    return size
+
+
+def crop_box(width, height, crop):
+    """(left, top, right, bottom) pro ořez v procentech (top, right, bottom, left)"""
+    top, right, bottom, left = crop
+    return (round(width * left / 100), round(height * top / 100),
+            width - round(width * right / 100), height - round(height * bottom / 100))
+
+
+def level_size(width, height, max_size):
+    """
+    Rozměry největší úrovně: delší strana na nejbližší mocninu dvou (nejvýše
+    max_size), kratší strana ve stejném měřítku zaokrouhlená na mocninu dvou.
+    Samostatné zaokrouhlení obou stran by z 953x1347 udělalo 1024x1024.
+    """
+    longer, shorter = max(width, height), min(width, height)
+    long_side = power_of_two(longer, max_size)
+    short_side = power_of_two(shorter * long_side / longer, long_side)
+    return (long_side, short_side) if width >= height else (short_side, long_side)
+
+
+def mip_chain(image, max_size, min_size):
+    """Úrovně od největší (mocniny dvou) po min_size na kratší straně"""
+    width, height = level_size(image.width, image.height, max_size)
+    levels = [image.resize((width, height), Image.LANCZOS)]
+    while min(width, height) > min_size:
+        width, height = max(1, width // 2), max(1, height // 2)
+        # Každá úroveň z předchozí - krabicový filtr 2x2 jako u GPU mipmap
+        levels.append(levels[-1].resize((width, height), Image.BOX))
+    return levels
+
+
+def thumbnail(image, size=THUMB_SIZE):
+    """Čtvercový výřez ze středu zmenšený na size x size"""
+    side = min(image.width, image.height)
+    left = (image.width - side) // 2
+    top = (image.height - side) // 2
+    return image.crop((left, top, left + side, top + side)).resize((size, size), Image.LANCZOS)
+
+
+def encode(image, fmt):
+    buffer = io.BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=6)
+    else:
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def build_decor(source, output_dir, url_prefix, crop=(0, 0, 0, 0), max_size=DEFAULT_MAX_SIZE,
+                min_size=DEFAULT_MIN_SIZE):
+    """
+    Vytvoří úrovně a náhled jednoho dekoru do output_dir.
+    Vrací záznam {'size', 'webp', 'jpeg', 'thumb', 'thumbJpeg', 'bytes'} s URL.
+    """
+    with Image.open(source) as img:
+        image = img.convert('RGB')
+    if any(crop):
+        image = image.crop(crop_box(image.width, image.height, crop))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    written = set()
+
+    def save(stem, data, ext):
+        name = hashed_name(stem, data, ext)
+        path = output_dir / name
+        if not path.exists():
+            path.write_bytes(data)
+        written.add(name)
+        return url_prefix + name
+
+    entry = {'webp': [], 'jpeg': [], 'bytes': {'source': source.stat().st_size, 'webp': 0, 'jpeg': 0}}
+    for level in mip_chain(image, max_size, min_size):
+        stem = f"{level.width}x{level.height}"
+        for fmt, ext in (('webp', 'webp'), ('jpeg', 'jpg')):
+            data = encode(level, fmt)
+            entry[fmt].append(save(stem, data, ext))
+            entry['bytes'][fmt] += len(data)
+        if 'size' not in entry:
+            entry['size'] = [level.width, level.height]
+
+    thumb = thumbnail(image)
+    entry['thumb'] = save('thumb', encode(thumb, 'webp'), 'webp')
+    entry['thumbJpeg'] = save('thumb', encode(thumb, 'jpeg'), 'jpg')
+
+    # Soubory z předchozích sestavení tohoto dekoru
+    for path in output_dir.iterdir():
+        if path.is_file() and path.name not in written:
+            path.unlink()
+    return entry
+
+
+def iter_local_decors(decors):
+    """Dekory, jejichž zdroj je lokální soubor v /textures/decors/"""
+    for collection in decors.get('collections', []):
+        for decor in collection.get('decors', []):
+            source_url = decor.get('sourceUrl') or decor.get('imageUrl') or ''
+            if source_url.startswith(LOCAL_PREFIX):
+                yield decor, source_url
+
+
+def build_textures(decors_path, textures_dir, crop=(0, 0, 0, 0), max_size=DEFAULT_MAX_SIZE,
+                   min_size=DEFAULT_MIN_SIZE, incremental=True):
+    """Zpracuje všechny lokální dekory a přepíše decors.json; vrací počet (nových, přeskočených)"""
+    with open(decors_path, 'r', encoding='utf-8') as f:
+        decors = json.load(f)
+
+    options = {'crop': list(crop), 'max': max_size, 'min': min_size}
+    manifest = BuildManifest(textures_dir / MANIFEST_NAME,
+                             f"{TEXTURE_BUILD_VERSION}:{json.dumps(options, sort_keys=True)}")
+    built = skipped = 0
+    live = []
+    for decor, source_url in iter_local_decors(decors):
+        source = textures_dir / source_url[len(LOCAL_PREFIX):]
+        if not source.exists():
+            print(f"  Chybí zdroj: {source.name}")
+            continue
+        live.append(source.name)
+        digest = content_hash(source)
+        cached = manifest.get(source.name)
+        if incremental and manifest.is_fresh(source.name, digest) and cached.get('stats'):
+            entry = cached['stats']
+            skipped += 1
+        else:
+            entry = build_decor(source, textures_dir / decor['id'], f"{LOCAL_PREFIX}{decor['id']}/",
+                                crop, max_size, min_size)
+            # Výstupem v manifestu je úroveň 0 - když zmizí, dekor se přestaví
+            manifest.record(source.name, digest, textures_dir / decor['id'] / Path(entry['webp'][0]).name, entry)
+            built += 1
+            b = entry['bytes']
+            print(f"  {decor['id']}: {b['source']} B PNG -> {entry['size'][0]}x{entry['size'][1]},"
+                  f" {len(entry['webp'])} úrovní, {b['webp']} B WebP / {b['jpeg']} B JPEG")
+
+        decor['sourceUrl'] = source_url
+        decor['imageUrl'] = entry['webp'][0]
+        decor['thumbUrl'] = entry['thumb']
+        decor['textures'] = {k: entry[k] for k in ('size', 'webp', 'jpeg', 'thumbJpeg')}
+
+    manifest.remove_orphans(live)
+    manifest.save()
+
+    tmp_path = str(decors_path) + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(decors, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    os.replace(tmp_path, decors_path)
+    return built, skipped
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent
+
+    parser = argparse.ArgumentParser(description="Příprava textur dekorů (mocniny dvou, mip úrovně, WebP/JPEG)")
+    parser.add_argument('--decors', type=Path, default=base_dir / "src" / "data" / "decors.json",
+                        help="cesta k decors.json (přepíše se)")
+    parser.add_argument('--textures', type=Path, default=base_dir / "public" / "textures" / "decors",
+                        help="adresář se zdrojovými PNG")
+    parser.add_argument('--crop', type=float, nargs=4, default=[0, 0, 0, 0],
+                        metavar=('TOP', 'RIGHT', 'BOTTOM', 'LEFT'),
+                        help="ořez okrajů v procentech (zdroje z crop-textures.cjs už jsou oříznuté)")
+    parser.add_argument('--max-size', type=int, default=DEFAULT_MAX_SIZE, help="největší strana úrovně 0")
+    parser.add_argument('--min-size', type=int, default=DEFAULT_MIN_SIZE, help="nejmenší mip úroveň")
+    parser.add_argument('--force', action='store_true', help="přestavět vše bez ohledu na manifest")
+    args = parser.parse_args()
+
+    if Image is None:
+        print("Chybí Pillow: pip install pillow")
+        sys.exit(1)
+
+    built, skipped = build_textures(args.decors, args.textures, tuple(args.crop), args.max_size,
+                                    args.min_size, incremental=not args.force)
+    print(f"Zpracováno: {built}, beze změny: {skipped} -> {args.decors}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+"""
+Export celé kuchyně do jednoho GLB
+==================================
+Vstupem je uložený návrh z plánovače (exportDesign / saveDesign: room,
+cabinets s id, šířkou, position a rotation, globalDecors) a catalog.json.
+Každá skříňka se podle katalogu převede na síť (width_models, model_key,
+jinak parametrický korpus z cabinet_geometry) a materiál podle dekoru
+(korpus = bodyDecor, pracovní deska = countertopDecor).
+
+Stejná síť se v GLB uloží jen jednou. Skříňky se stejnou sítí a dekorem
+se vykreslí jedním uzlem s EXT_mesh_gpu_instancing (TRANSLATION a ROTATION
+pro každou kopii), takže počet draw callů odpovídá počtu dvojic (model,
+dekor), ne počtu skříněk. Sítě s jiným dekorem sdílí tytéž accessory a
+liší se jen materiálem. Materiál je jeden na dekor a použití.
+
+Spuštění:
+    python bundle_scene.py navrh.json -o kuchyne.glb
+    python bundle_scene.py navrh.json --catalog ../export/catalog.json --no-instancing
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from cabinet_geometry import PANEL_TEMPLATES, cabinet_mesh
+from convert_vrml_to_gltf import add_mesh_primitives, save_glb
+from gltf_builder import GltfBuilder
+
+INSTANCING = "EXT_mesh_gpu_instancing"
+# Hrany ostřejší než ~30° mají vlastní normály (korpusy jsou kvádry)
+CREASE_ANGLE = math.radians(30)
+
+# Barva materiálu podle typu dekoru; textura je v extras (imageUrl)
+DECOR_COLORS = {
+    'wood': [0.62, 0.47, 0.33, 1.0],
+    'solid': [0.85, 0.85, 0.83, 1.0],
+    'stone': [0.55, 0.55, 0.53, 1.0],
+    'metal': [0.75, 0.76, 0.78, 1.0],
+}
+DEFAULT_DECOR_COLOR = [0.8, 0.8, 0.8, 1.0]
+
+
+def load_catalog(catalog_path):
+    """catalog.json a jeho binární geometrie (catalog.bin), pokud ji katalog odkazuje"""
+    catalog_path = Path(catalog_path)
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    geometry = catalog.get('geometry')
+    buffer = None
+    if geometry and geometry.get('url'):
+        buffer = (catalog_path.parent / geometry['url']).read_bytes()
+    return catalog, buffer
+
+
+def model_arrays(model, buffer):
+    """(vertices, faces) záznamu modelu - vložená pole nebo offsety do catalog.bin"""
+    if 'vertices' in model:
+        vertices = np.asarray(model['vertices'], dtype=np.float32).reshape(-1, 3)
+        faces = np.asarray(model['indices'], dtype=np.uint32).reshape(-1, 3)
+        return vertices, faces
+    if buffer is None or 'vertexOffset' not in model:
+        return None, None
+    vertices = np.frombuffer(buffer, '<f4', model['vertexCount'] * 3, model['vertexOffset']).reshape(-1, 3)
+    dtype = '<u2' if model['indexType'] == 'uint16' else '<u4'
+    faces = np.frombuffer(buffer, dtype, model['indexCount'], model['indexOffset']).reshape(-1, 3)
+    return vertices, faces
+
+
+def resolve_model(cabinet, models):
+    """
+    Klíč a zdroj geometrie skříňky v dané šířce: ('model', klíč) pro záznam
+    v catalog.models, ('parametric', (typ, š, v, h)) pro korpus, jinak None.
+    Parametrický záznam model_key bez šířky (starší katalog) by měl šířku
+    jiné varianty, proto má přednost přesný korpus z cabinet_geometry.
+    """
+    width = cabinet.get('width')
+    key = (cabinet.get('width_models') or {}).get(str(width))
+    if key in models:
+        return 'model', key
+    key = cabinet.get('model_key')
+    if key in models and models[key].get('type') != 'parametric':
+        return 'model', key
+    if cabinet.get('type') in PANEL_TEMPLATES and width and cabinet.get('height') and cabinet.get('depth'):
+        return 'parametric', (cabinet['type'], width, cabinet['height'], cabinet['depth'])
+    if key in models:
+        return 'model', key
+    return None
+
+
+def decor_index(decors):
+    """id dekoru -> záznam z decors.json"""
+    return {decor['id']: decor
+            for collection in decors.get('collections', [])
+            for decor in collection.get('decors', [])}
+
+
+def decor_material(decor_id, decor, usage):
+    """glTF materiál dekoru (parametry jako TextureManager.getDecorMaterial)"""
+    decor = decor or {}
+    material = {
+        "name": f"{decor.get('name', decor_id)} ({usage})",
+        "pbrMetallicRoughness": {
+            "baseColorFactor": DECOR_COLORS.get(decor.get('type'), DEFAULT_DECOR_COLOR),
+            "metallicFactor": 0.8 if decor.get('type') == 'metal' else 0.02,
+            "roughnessFactor": 0.2 if usage == 'front' else 0.6,
+        },
+        "extras": {"decorId": decor_id, "usage": usage},
+    }
+    if decor.get('imageUrl'):
+        material["extras"]["imageUrl"] = decor['imageUrl']
+    return material
+
+
+def instance_rotation(angle):
+    """Kvaternion (x, y, z, w) otočení kolem osy Y (rotation.y z plánovače)"""
+    return [0.0, math.sin(angle / 2), 0.0, math.cos(angle / 2)]
+
+
+def bundle_scene(design, catalog, buffer=None, decors=None, instancing=True, name="kitchen"):
+    """
+    Sestaví GLB návrhu. Vrací (gltf JSON, binární buffer, statistika) nebo
+    (None, None, statistika), pokud žádná skříňka nemá geometrii.
+    """
+    models = catalog.get('models', {})
+    cabinets_by_id = {cab['id']: cab for cab in catalog.get('cabinets', [])}
+    decors = decors or {}
+    decor_by_id = decor_index(decors)
+    global_decors = dict(decors.get('defaults', {}), **(design.get('globalDecors') or {}))
+
+    # (zdroj geometrie, (dekor, použití)) -> skříňky v pořadí návrhu
+    groups = {}
+    skipped = []
+    for placed in design.get('cabinets', []):
+        # Návrh nese kopii záznamu katalogu; chybějící pole doplní katalog
+        cabinet = dict(cabinets_by_id.get(placed.get('id'), {}), **placed)
+        source = resolve_model(cabinet, models)
+        if source is None:
+            skipped.append(cabinet.get('code') or cabinet.get('id'))
+            continue
+        usage = 'countertop' if cabinet.get('type') == 'worktop' else 'body'
+        own = cabinet.get('decors') or {}
+        decor_id = own.get(f'{usage}Decor') or global_decors.get(f'{usage}Decor')
+        groups.setdefault((source, (decor_id, usage)), []).append(cabinet)
+
+    builder = GltfBuilder(generator="Kitchen scene bundler")
+    primitives = {}
+    materials = {}
+    meshes = {}
+    children = []
+    for (source, material_key), cabinets in groups.items():
+        if source not in primitives:
+            kind, key = source
+            if kind == 'model':
+                vertices, faces = model_arrays(models[key], buffer)
+            else:
+                mesh = cabinet_mesh(*key)
+                vertices, faces = mesh['vertices'], mesh['indices'].reshape(-1, 3)
+            # Materiál se doplní při vytvoření sítě; accessory jsou pro všechny dekory společné
+            primitives[source] = add_mesh_primitives(builder, vertices, faces, None, CREASE_ANGLE)
+        if not primitives[source]:
+            skipped.extend(cab.get('code') or cab.get('id') for cab in cabinets)
+            continue
+
+        if material_key not in materials:
+            decor_id, usage = material_key
+            materials[material_key] = builder.add_material(
+                decor_material(decor_id, decor_by_id.get(decor_id), usage))
+        mesh_key = (source, material_key)
+        mesh_name = source[1] if source[0] == 'model' else '_'.join(map(str, source[1]))
+        meshes[mesh_key] = builder.add_mesh(
+            [dict(p, material=materials[material_key]) for p in primitives[source]], mesh_name)
+
+        translations = np.array([cab.get('position') or [0, 0, 0] for cab in cabinets], dtype=np.float64)
+        angles = [float(cab.get('rotation') or 0) for cab in cabinets]
+        extras = {"cabinets": [{"id": cab.get('id'), "code": cab.get('code'), "width": cab.get('width')}
+                               for cab in cabinets]}
+
+        if instancing and len(cabinets) > 1:
+            attributes = {"TRANSLATION": builder.add_accessor(translations.astype(np.float32))}
+            if any(angles):
+                rotations = np.array([instance_rotation(a) for a in angles], dtype=np.float32)
+                attributes["ROTATION"] = builder.add_accessor(rotations)
+            builder.use_extension(INSTANCING, required=True)
+            children.append(builder.add_node({
+                "name": mesh_name,
+                "mesh": meshes[mesh_key],
+                "extensions": {INSTANCING: {"attributes": attributes}},
+                "extras": extras,
+            }))
+            continue
+
+        for cab, translation, angle, info in zip(cabinets, translations, angles, extras["cabinets"]):
+            node = {"name": str(cab.get('code') or mesh_name), "mesh": meshes[mesh_key], "extras": info}
+            if translation.any():
+                node["translation"] = translation.tolist()
+            if angle:
+                node["rotation"] = instance_rotation(angle)
+            children.append(builder.add_node(node))
+
+    placed = sum(len(cabs) for (source, _), cabs in groups.items() if primitives.get(source))
+    stats = {
+        'cabinets': placed,
+        'skipped': skipped,
+        'models': sum(1 for p in primitives.values() if p),
+        'materials': len(materials),
+        'nodes': len(children),
+        'draw_calls': sum(len(builder.gltf['meshes'][m]['primitives']) for m in meshes.values()),
+    }
+    if not children:
+        return None, None, stats
+
+    root = {"name": name, "children": children}
+    if design.get('room'):
+        root["extras"] = {"room": design['room']}
+    builder.add_node(root, root=True)
+    gltf, buffer_data = builder.build()
+    return gltf, buffer_data, stats
+
+
+def load_design(path, name=None):
+    """
+    Návrh z JSON: výstup exportDesign, nebo slovník uložených návrhů
+    (kitchenDesigns z localStorage), ze kterého se vybere name.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'cabinets' in data:
+        return data
+    if name is None:
+        if len(data) != 1:
+            raise ValueError(f"Soubor obsahuje {len(data)} návrhů, vyber jeden přes --name")
+        name = next(iter(data))
+    if name not in data:
+        raise KeyError(f"Návrh {name!r} v souboru není")
+    return data[name]
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent
+
+    parser = argparse.ArgumentParser(description="Export návrhu kuchyně do jednoho GLB (GPU instancing)")
+    parser.add_argument('design', type=Path, help="návrh z plánovače (exportDesign nebo kitchenDesigns)")
+    parser.add_argument('--name', default=None, help="název návrhu, pokud soubor obsahuje více návrhů")
+    parser.add_argument('--catalog', type=Path, default=base_dir / "src" / "data" / "catalog.json")
+    parser.add_argument('--decors', type=Path, default=base_dir / "src" / "data" / "decors.json")
+    parser.add_argument('-o', '--output', type=Path, default=None, help="výstupní GLB (výchozí: <návrh>.glb)")
+    parser.add_argument('--no-instancing', action='store_true',
+                        help="uzel na každou skříňku místo EXT_mesh_gpu_instancing (sítě zůstanou sdílené)")
+    args = parser.parse_args()
+
+    design = load_design(args.design, args.name)
+    catalog, buffer = load_catalog(args.catalog)
+    decors = {}
+    if args.decors.exists():
+        with open(args.decors, 'r', encoding='utf-8') as f:
+            decors = json.load(f)
+
+    gltf, buffer_data, stats = bundle_scene(design, catalog, buffer, decors,
+                                            instancing=not args.no_instancing,
+                                            name=design.get('name') or args.design.stem)
+    if stats['skipped']:
+        print(f"  Bez geometrie: {len(stats['skipped'])} ({', '.join(map(str, stats['skipped'][:10]))})")
+    if gltf is None:
+        print("Návrh neobsahuje žádnou skříňku s geometrií")
+        sys.exit(1)
+
+    output = args.output or args.design.with_suffix('.glb')
+    save_glb(gltf, buffer_data, output)
+    print(f"Skříněk: {stats['cabinets']}, modelů: {stats['models']}, materiálů: {stats['materials']}, "
+          f"uzlů: {stats['nodes']}, draw callů: {stats['draw_calls']}")
+    print(f"Uloženo: {output} ({output.stat().st_size} B)")
+
+
+if __name__ == '__main__':
+    main()
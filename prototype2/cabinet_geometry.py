@@ -0,0 +1,152 @@
+"""
+Parametrická geometrie korpusů skříněk.
+
+Každý typ skříňky je šablona desek; poloha a rozměr desky jsou lineární
+výrazy v šířce w, výšce h, hloubce d a tloušťce desky t (např. 'w-2t').
+Šablona se jednou přeloží na matice koeficientů a vrcholy všech desek -
+i pro mnoho šířek najednou - se počítají jedním NumPy výrazem. Deska má
+vždy skutečnou tloušťku 18 mm bez ohledu na šířku, takže frontend nemusí
+model škálovat. Hotové sítě se pamatují podle (typ, w, h, d).
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+PANEL_THICKNESS_MM = 18
+
+# Deska = ((x, y, z), (šířka, výška, hloubka)) ve výrazech nad w, h, d, t
+_SIDES = [
+    (('0', '0', '0'), ('t', 'h', 'd')),          # levý bok
+    (('w-t', '0', '0'), ('t', 'h', 'd')),        # pravý bok
+    (('t', '0', '0'), ('w-2t', 't', 'd')),       # dno
+]
+PANEL_TEMPLATES = {
+    'base': _SIDES + [
+        (('t', 't', 'd-t'), ('w-2t', 'h-t', 't')),       # záda
+    ],
+    'wall': _SIDES + [
+        (('t', 'h-t', '0'), ('w-2t', 't', 'd')),         # strop
+        (('t', 't', 'd-t'), ('w-2t', 'h-2t', 't')),      # záda
+    ],
+    'tall': _SIDES + [
+        (('t', 'h-t', '0'), ('w-2t', 't', 'd')),         # strop
+        (('t', 't', 'd-t'), ('w-2t', 'h-2t', 't')),      # záda
+    ],
+}
+
+# Rohy kvádru (jednotková krychle) a jeho trojúhelníky
+BOX_CORNERS = np.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+], dtype=np.float64)
+BOX_INDICES = np.array([
+    0, 1, 2, 0, 2, 3, 5, 4, 7, 5, 7, 6,
+    4, 0, 3, 4, 3, 7, 1, 5, 6, 1, 6, 2,
+    4, 5, 1, 4, 1, 0, 3, 2, 6, 3, 6, 7,
+], dtype=np.uint32)
+
+_VARIABLES = 'whdt'
+_TERM = re.compile(r'([+-]?)(\d*)([whdt]?)')
+
+
+def linear_coefficients(expression):
+    """'w-2t' -> [1, 0, 0, -2, 0] (koeficienty u w, h, d, t a konstanta)"""
+    coef = np.zeros(len(_VARIABLES) + 1)
+    expression = expression.replace(' ', '')
+    pos = 0
+    while pos < len(expression):
+        match = _TERM.match(expression, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"Neplatný výraz desky: {expression!r}")
+        sign, number, variable = match.groups()
+        value = (-1 if sign == '-' else 1) * (float(number) if number else 1.0)
+        if variable:
+            coef[_VARIABLES.index(variable)] += value
+        elif number:
+            coef[-1] += value
+        else:
+            raise ValueError(f"Neplatný výraz desky: {expression!r}")
+        pos = match.end()
+    return coef
+
+
+@lru_cache(maxsize=None)
+def compiled_template(cabinet_type):
+    """(pozice (P, 3, 5), rozměry (P, 3, 5), indexy (P * 36,)) pro typ skříňky"""
+    panels = PANEL_TEMPLATES.get(cabinet_type, PANEL_TEMPLATES['base'])
+    position = np.array([[linear_coefficients(e) for e in pos] for pos, _ in panels])
+    size = np.array([[linear_coefficients(e) for e in dims] for _, dims in panels])
+    indices = (BOX_INDICES[None, :] + 8 * np.arange(len(panels), dtype=np.uint32)[:, None]).ravel()
+    return position, size, indices
+
+
+def cabinet_variants(cabinet_type, widths, height, depth):
+    """
+    Sítě pro více šířek najednou (rozměry v mm, výstup v metrech).
+    Vrací (vertices (K, P * 8, 3) float32, indices (P * 36,) uint32) -
+    indexy jsou pro všechny šířky stejné.
+    """
+    position, size, indices = compiled_template(cabinet_type)
+    widths = np.atleast_1d(np.asarray(widths, dtype=np.float64))
+    params = np.empty((len(widths), 5))
+    params[:, 0] = widths
+    params[:, 1] = height
+    params[:, 2] = depth
+    params[:, 3] = PANEL_THICKNESS_MM
+    params[:, 4] = 1.0
+    params[:, :4] /= 1000.0
+
+    origin = np.einsum('pcj,kj->kpc', position, params)
+    extent = np.einsum('pcj,kj->kpc', size, params)
+    vertices = origin[:, :, None, :] + BOX_CORNERS[None, None, :, :] * extent[:, :, None, :]
+    return vertices.reshape(len(widths), -1, 3).astype(np.float32), indices
+
+
+# (typ, šířka, výška, hloubka) -> síť; sdílí ji cabinet_mesh i variant_meshes
+_mesh_cache = {}
+
+
+def _frozen_mesh(vertices, indices):
+    vertices.flags.writeable = False
+    indices.flags.writeable = False
+    return {'vertices': vertices, 'indices': indices, 'type': 'parametric'}
+
+
+def cabinet_mesh(cabinet_type, width, height, depth):
+    """
+    Síť jedné varianty {'vertices', 'indices', 'type'} (pole jen pro čtení).
+    Výsledek se pamatuje podle (typ, šířka, výška, hloubka).
+    """
+    key = (cabinet_type, width, height, depth)
+    mesh = _mesh_cache.get(key)
+    if mesh is None:
+        vertices, indices = cabinet_variants(cabinet_type, [width], height, depth)
+        mesh = _mesh_cache[key] = _frozen_mesh(vertices[0], indices)
+    return mesh
+
+
+def variant_meshes(keys):
+    """
+    Sítě pro seznam klíčů (typ, šířka, výška, hloubka). Chybějící šířky se
+    stejným typem a rozměry se spočítají jedním voláním cabinet_variants.
+    Vrací slovník klíč -> síť.
+    """
+    groups = {}
+    for key in keys:
+        if key not in _mesh_cache:
+            cabinet_type, width, height, depth = key
+            groups.setdefault((cabinet_type, height, depth), set()).add(width)
+
+    for (cabinet_type, height, depth), widths in groups.items():
+        widths = sorted(widths)
+        vertices, indices = cabinet_variants(cabinet_type, widths, height, depth)
+        for width, v in zip(widths, vertices):
+            _mesh_cache[(cabinet_type, width, height, depth)] = _frozen_mesh(v, indices)
+
+    return {key: _mesh_cache[key] for key in keys}
+
+
+def clear_cache():
+    _mesh_cache.clear()
@@ -0,0 +1,126 @@
+"""
+Rozdělený katalog pro postupné načítání.
+
+Místo jednoho catalog.json se zapíše malý kořenový index.json (značky,
+skupiny, počty a URL shardů) a jeden shard na každou dvojici značka/skupina.
+Geometrie každé značky je v jednom binárním souboru (geometry_pack).
+Názvy shardů i binárních souborů obsahují hash obsahu, takže se mohou
+cachovat natrvalo; index.json se nehashuje a musí se revalidovat.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+from geometry_pack import GeometryPacker
+
+INDEX_NAME = 'index.json'
+INDEX_VERSION = 1
+
+# Soubory s hashem v názvu, které tento modul zapisuje (a smí mazat)
+_HASHED_FILE = re.compile(r'^[a-z0-9-]+\.[0-9a-f]{12}\.(json|bin)$')
+
+
+def slugify(text):
+    """ASCII název pro soubor: 'Šatní skříně' -> 'satni-skrine'"""
+    text = unicodedata.normalize('NFKD', str(text or '')).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'ostatni'
+
+
+def hashed_name(stem, data, extension):
+    """Název souboru s prvními 12 znaky SHA-256 obsahu"""
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{extension}"
+
+
+def _write(output_dir, name, data):
+    path = os.path.join(output_dir, name)
+    # Stejný hash = stejný obsah, soubor se nepřepisuje
+    if not os.path.exists(path):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return name
+
+
+def _dumps(data):
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _model_keys(cabinet):
+    """Klíče modelů skříňky: hlavní model a modely všech šířek"""
+    keys = set(cabinet.get('width_models', {}).values())
+    if cabinet.get('model_key'):
+        keys.add(cabinet['model_key'])
+    return keys
+
+
+def write_sharded_catalog(brands, cabinets, geometries, output_dir, base_url=''):
+    """
+    Zapíše index.json, shardy <značka>-<skupina>.<hash>.json a geometrii
+    <značka>.<hash>.bin do output_dir. Shardy z předchozích běhů, na které
+    nový index neodkazuje, se smažou.
+
+    geometries: model_key -> {'vertices', 'indices', 'type'[, 'placement']} (cabinet_mesh)
+    base_url: předpona URL v indexu (např. '/catalog/')
+    Vrací slovník indexu.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = set()
+    index = {'version': INDEX_VERSION, 'brands': []}
+
+    by_brand = {}
+    for cab in cabinets:
+        by_brand.setdefault(cab['brandId'], []).append(cab)
+
+    for brand in brands:
+        brand_cabinets = by_brand.get(brand['id'], [])
+        if not brand_cabinets:
+            continue
+        brand_slug = slugify(brand['name'])
+
+        # Geometrie značky v jednom binárním souboru
+        packer = GeometryPacker()
+        models = {}
+        for key in sorted(set().union(*map(_model_keys, brand_cabinets)) & geometries.keys()):
+            g = geometries[key]
+            extra = {'placement': g['placement']} if g.get('placement') else {}
+            models[key] = packer.add(g['vertices'], g['indices'], type=g.get('type', 'vrml'), **extra)
+        bin_name = _write(output_dir, hashed_name(brand_slug, packer.tobytes(), 'bin'), packer.tobytes())
+        written.add(bin_name)
+        geometry = {'url': base_url + bin_name, 'byteLength': len(packer)}
+
+        by_group = {}
+        for cab in brand_cabinets:
+            by_group.setdefault(cab['group'], []).append(cab)
+
+        groups = []
+        for group, group_cabinets in sorted(by_group.items(), key=lambda item: str(item[0] or '')):
+            used = set().union(*map(_model_keys, group_cabinets))
+            shard = {
+                'brand': brand['id'],
+                'group': group,
+                'geometry': geometry,
+                'cabinets': group_cabinets,
+                'models': {k: v for k, v in models.items() if k in used},
+            }
+            data = _dumps(shard)
+            name = _write(output_dir, hashed_name(f"{brand_slug}-{slugify(group)}", data, 'json'), data)
+            written.add(name)
+            groups.append({'name': group, 'count': len(group_cabinets), 'url': base_url + name,
+                           'bytes': len(data)})
+
+        index['brands'].append(dict(brand, count=len(brand_cabinets), geometry=geometry, groups=groups))
+
+    index_path = os.path.join(output_dir, INDEX_NAME)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(_dumps(index))
+    os.replace(tmp_path, index_path)
+
+    # Staré shardy až po zápisu nového indexu
+    for name in os.listdir(output_dir):
+        if _HASHED_FILE.match(name) and name not in written:
+            os.remove(os.path.join(output_dir, name))
+
+    return index
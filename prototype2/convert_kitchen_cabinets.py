@@ -4,262 +4,271 @@ Rozděleno podle značek: Oresi (Dolti), Livanza, Bauformat
 """
 
 import sys
+from functools import lru_cache
 sys.path.append('..')
 
-from access_parser import AccessParser
-import json
-import os
-
-
+from table_cache import CachedAccessParser
+from mdb_index import width_index
+
+from geometry_pack import GeometryPacker, save_catalog
+from catalog_shards import write_sharded_catalog
+from text_repair import TextRepairEngine
+from cabinet_geometry import cabinet_mesh, variant_meshes
+from placement import placement_metadata
+
+
+# Kontrolní znaky, které se z textů odstraní
+CONTROL_CHARS = ['\x01', '\r', '\x1b', '\x0c', '\x13']
+
+# PRVNÍ KROK: Nahraď vzory se surovými Latin-1 znaky (\xed = í, atd.)
+# Tyto vzory musí být nahrazeny PŘED převodem jednotlivých znaků
+RAW_REPLACEMENTS = [
+    # Skříňky - s \xed (í) a bez \x01
+    ('SkY\xedHky', 'Skříňky'),
+    ('skY\xedHky', 'skříňky'),
+    ('SkY\xedHku', 'Skříňku'),
+    ('skY\xedHku', 'skříňku'),
+    ('SkY\xedHek', 'Skříněk'),
+    ('skY\xedHek', 'skříněk'),
+    ('skY\xedH', 'skříň'),
+    ('SkY\xedH', 'Skříň'),
+    ('skY\xedn', 'skřín'),
+    ('SkY\xedn', 'Skřín'),
+    # Dřez
+    ('D\xedYez', 'Dříz'),
+    ('d\xedYez', 'dříz'),
+    ('DYez', 'Dřez'),
+    ('dYez', 'dřez'),
+    # Přístroj
+    ('P\xed\xedstroj', 'Přístroj'),
+    ('p\xed\xedstroj', 'přístroj'),
+    ('P\xedístroj', 'Přístroj'),
+    ('p\xedístroj', 'přístroj'),
+    # Boční
+    ('Bo\xe8n\xed', 'Boční'),
+    ('bo\xe8n\xed', 'boční'),
+    ('Bon\xed', 'Boční'),
+    ('bon\xed', 'boční'),
+    # Horní
+    ('horn\xed', 'horní'),
+    ('Horn\xed', 'Horní'),
+    # Spodní
+    ('spodn\xed', 'spodní'),
+    ('Spodn\xed', 'Spodní'),
+    # Výklopné
+    ('v\xfdklopn\xe9', 'výklopné'),
+    ('V\xfdklopn\xe9', 'Výklopné'),
+    ('v\xfdklopn\xed', 'výklopní'),
+    # Rohové
+    ('rohov\xe9', 'rohové'),
+    ('Rohov\xe9', 'Rohové'),
+    # Vysoké/Vysoká
+    ('Vysok\xe1', 'Vysoká'),
+    ('vysok\xe1', 'vysoká'),
+    ('Vysok\xe9', 'Vysoké'),
+    ('vysok\xe9', 'vysoké'),
+    ('Vysok\xfd', 'Vysoký'),
+    ('vysok\xfd', 'vysoký'),
+    # Výšky
+    ('v\xfd\xb9ky', 'výšky'),
+    ('V\xfd\xb9ky', 'Výšky'),
+    # Šatní
+    ('\xb9atn\xed', 'šatní'),
+    ('\xb9ATN\xed', 'ŠATNÍ'),
+    ('`atn\xed', 'šatní'),
+    ('aatn\xed', 'šatní'),
+    ('aATN\xed', 'ŠATNÍ'),
+    # Žaluzie
+    ('~aluz', 'žaluz'),
+    # Myčky
+    ('my\xe8k', 'myčk'),
+    ('My\xe8k', 'Myčk'),
+    # Podnož
+    ('podno~', 'podnož'),
+    ('Podno~', 'Podnož'),
+    # Digestoř
+    ('digesto\xf8', 'digestoř'),
+    ('Digesto\xf8', 'Digestoř'),
+    ('digestoY', 'digestoř'),
+    # Vestavěné
+    ('Vestav\xecn', 'Vestavěn'),
+    ('vestav\xecn', 'vestavěn'),
+    # Dvířka
+    ('Dv\xed\xf8k', 'Dvířk'),
+    ('dv\xed\xf8k', 'dvířk'),
+    ('Dv\xedYk', 'Dvířk'),
+    ('dv\xedYk', 'dvířk'),
+    # Příslušenství, přístrojové
+    ('P\xed\xedstrojov', 'Přístrojov'),
+    ('p\xed\xedstrojov', 'přístrojov'),
+    ('p\xed\xedslu\xb9', 'přísluš'),
+    ('P\xed\xedslu\xb9', 'Přísluš'),
+    # Spotřebiče
+    ('spot\xf8eb', 'spotřeb'),
+    ('Spot\xf8eb', 'Spotřeb'),
+    ('spotYeb', 'spotřeb'),
+    # Komín
+    ('kom\xedn', 'komín'),
+    # Závěsné
+    ('z\xe1v\xecsn', 'závěsn'),
+    ('Z\xe1v\xecsn', 'Závěsn'),
+    # Prodloužení
+    ('prodlou~en', 'prodloužen'),
+    ('Prodlou~en', 'Prodloužen'),
+    # Čela
+    ('\xe8ela', 'čela'),
+    ('\xe8el', 'čel'),
+    # Drážkou
+    ('dr\xe1~k', 'drážk'),
+    # Ukončením
+    ('ukon\xe8en', 'ukončen'),
+    ('ukonení', 'ukončení'),
+    ('ukonenm', 'ukončením'),
+    # Nástavce
+    ('N\xe1stav', 'Nástav'),
+    ('n\xe1stav', 'nástav'),
+    # Odtahové
+    ('Odtahov\xe9', 'Odtahové'),
+    # Procházím
+    ('proch\xe1z', 'procház'),
+    # Zmenšenou
+    ('zmen\xb9en', 'zmenšen'),
+    ('zmenaen', 'zmenšen'),
+    ('zmenšen', 'zmenšen'),
+    # Další časté vzory
+    ('spoY\xe1k', 'sporák'),
+    ('SpoY\xe1k', 'Sporák'),
+]
+
+# DRUHÝ KROK: Převeď zbývající Latin-1 znaky
+LATIN1_MAP = {
+    '\xed': 'í',  # 0xED
+    '\xe1': 'á',  # 0xE1
+    '\xe9': 'é',  # 0xE9
+    '\xfd': 'ý',  # 0xFD
+    '\xfa': 'ú',  # 0xFA
+    '\xf9': 'ů',  # 0xF9
+    '\xf8': 'ř',  # 0xF8
+    '\xe8': 'č',  # 0xE8
+    '\xec': 'ě',  # 0xEC
+    '\xef': 'ď',  # 0xEF
+    '\xf2': 'ň',  # 0xF2
+    '\xf5': 'ť',  # 0xF5
+    '\xf3': 'ó',  # 0xF3
+    '\xda': 'Ú',  # 0xDA
+    '\xb9': 'š',  # 0xB9 (může být použito pro š v některých kódováních)
+}
+
+# TŘETÍ KROK: Oprav vzory po převodu Latin-1
+POST_REPLACEMENTS = [
+    # Y -> ř v kontextech
+    ('skříňky', 'skříňky'),
+    ('Skříňky', 'Skříňky'),
+    ('SkYíň', 'Skříň'),
+    ('skYíň', 'skříň'),
+    ('skYín', 'skřín'),
+    ('SkYín', 'Skřín'),
+    ('DYez', 'Dřez'),
+    ('dYez', 'dřez'),
+    ('pYí', 'pří'),
+    ('PYí', 'Pří'),
+    ('pYe', 'pře'),
+    ('PYe', 'Pře'),
+    ('stYí', 'stří'),
+    ('StYí', 'Stří'),
+    ('spotYeb', 'spotřeb'),
+    ('digestoY', 'digestoř'),
+    # ~ -> ž
+    ('~', 'ž'),
+    # Backtick -> š
+    ('`', 'š'),
+    # Opravy koncovek - skřín -> skříň
+    ('skřín ', 'skříň '),
+    ('Skřín ', 'Skříň '),
+    ('skříně', 'skříně'),
+    ('Skříně', 'Skříně'),
+    # Opravy "aa" -> "ša"
+    ('aatní', 'šatní'),
+    ('AATNÍ', 'ŠATNÍ'),
+    # Opravy "ae" -> "še"
+    ('aeno', 'šeno'),
+    # Opravy dalších chyb
+    ('míste', 'místě'),
+    ('Míste', 'Místě'),
+    ('prochozí', 'průchozí'),
+    ('Prochozí', 'Průchozí'),
+    # Závěsné
+    ('závsné', 'závěsné'),
+    ('Závsné', 'Závěsné'),
+    # Myčka/pračka
+    ('myku', 'myčku'),
+    ('Myku', 'Myčku'),
+    ('praku', 'pračku'),
+    ('Praku', 'Pračku'),
+    # Pecící
+    ('peicí', 'pečicí'),
+    ('Peicí', 'Pečicí'),
+    # Spotřebiče
+    ('spotY', 'spotř'),
+    ('SpotY', 'Spotř'),
+    # Lišty
+    ('liaty', 'lišty'),
+    ('Liaty', 'Lišty'),
+    # Nástavbové
+    ('nástavcove', 'nástavbové'),
+    ('Nástavcove', 'Nástavbové'),
+    # Chladničky/mrazničky
+    ('chladniky', 'chladničky'),
+    ('Chladniky', 'Chladničky'),
+    ('mrazniky', 'mrazničky'),
+    ('Mrazniky', 'Mrazničky'),
+    ('mrazniku', 'mrazničku'),
+    # Spotřebiče (koncovky)
+    ('spotřebie', 'spotřebiče'),
+    # Čela (bez háčku)
+    (' ela ', ' čela '),
+    (' elem', ' čelem'),
+    # Kolíky
+    ('kolíky', 'kolíky'),
+    # Nadměrná
+    ('nadmrná', 'nadměrná'),
+    ('Nadmrná', 'Nadměrná'),
+    ('nadmrn', 'nadměrn'),
+    # Výška
+    ('výakou', 'výškou'),
+    ('Výakou', 'Výškou'),
+    ('výaky', 'výšky'),
+    ('Výaky', 'Výšky'),
+    # Vnitřní
+    ('vnitYní', 'vnitřní'),
+    ('VnitYní', 'Vnitřní'),
+    # Dveřmi
+    ('dveYmi', 'dveřmi'),
+    ('DveYmi', 'Dveřmi'),
+    # Závěsná
+    ('Závsná', 'Závěsná'),
+    ('závsná', 'závěsná'),
+    # Ely -> čely
+    (' ely ', ' čely '),
+    ('s ely', 's čely'),
+]
+
+# Všechna pravidla v pořadí, v jakém se mají uplatnit, zkompilovaná do vrstev
+_text_repair = TextRepairEngine(
+    [(c, '') for c in CONTROL_CHARS] + RAW_REPLACEMENTS + list(LATIN1_MAP.items()) + POST_REPLACEMENTS
+)
+
+
+@lru_cache(maxsize=None)
 def clean_and_translate_text(text):
-    """Vyčistí a přeloží text z databáze do správné češtiny"""
+    """
+    Vyčistí a přeloží text z databáze do správné češtiny.
+    Výsledek se pamatuje pro každý surový řetězec.
+    """
     if not text:
         return text
 
-    # Odstraň kontrolní znaky
-    result = text.replace('\x01', '').replace('\r', '').replace('\x1b', '').replace('\x0c', '').replace('\x13', '')
-
-    # PRVNÍ KROK: Nahraď vzory se surovými Latin-1 znaky (\xed = í, atd.)
-    # Tyto vzory musí být nahrazeny PŘED převodem jednotlivých znaků
-    raw_replacements = [
-        # Skříňky - s \xed (í) a bez \x01
-        ('SkY\xedHky', 'Skříňky'),
-        ('skY\xedHky', 'skříňky'),
-        ('SkY\xedHku', 'Skříňku'),
-        ('skY\xedHku', 'skříňku'),
-        ('SkY\xedHek', 'Skříněk'),
-        ('skY\xedHek', 'skříněk'),
-        ('skY\xedH', 'skříň'),
-        ('SkY\xedH', 'Skříň'),
-        ('skY\xedn', 'skřín'),
-        ('SkY\xedn', 'Skřín'),
-        # Dřez
-        ('D\xedYez', 'Dříz'),
-        ('d\xedYez', 'dříz'),
-        ('DYez', 'Dřez'),
-        ('dYez', 'dřez'),
-        # Přístroj
-        ('P\xed\xedstroj', 'Přístroj'),
-        ('p\xed\xedstroj', 'přístroj'),
-        ('P\xedístroj', 'Přístroj'),
-        ('p\xedístroj', 'přístroj'),
-        # Boční
-        ('Bo\xe8n\xed', 'Boční'),
-        ('bo\xe8n\xed', 'boční'),
-        ('Bon\xed', 'Boční'),
-        ('bon\xed', 'boční'),
-        # Horní
-        ('horn\xed', 'horní'),
-        ('Horn\xed', 'Horní'),
-        # Spodní
-        ('spodn\xed', 'spodní'),
-        ('Spodn\xed', 'Spodní'),
-        # Výklopné
-        ('v\xfdklopn\xe9', 'výklopné'),
-        ('V\xfdklopn\xe9', 'Výklopné'),
-        ('v\xfdklopn\xed', 'výklopní'),
-        # Rohové
-        ('rohov\xe9', 'rohové'),
-        ('Rohov\xe9', 'Rohové'),
-        # Vysoké/Vysoká
-        ('Vysok\xe1', 'Vysoká'),
-        ('vysok\xe1', 'vysoká'),
-        ('Vysok\xe9', 'Vysoké'),
-        ('vysok\xe9', 'vysoké'),
-        ('Vysok\xfd', 'Vysoký'),
-        ('vysok\xfd', 'vysoký'),
-        # Výšky
-        ('v\xfd\xb9ky', 'výšky'),
-        ('V\xfd\xb9ky', 'Výšky'),
-        # Šatní
-        ('\xb9atn\xed', 'šatní'),
-        ('\xb9ATN\xed', 'ŠATNÍ'),
-        ('`atn\xed', 'šatní'),
-        ('aatn\xed', 'šatní'),
-        ('aATN\xed', 'ŠATNÍ'),
-        # Žaluzie
-        ('~aluz', 'žaluz'),
-        # Myčky
-        ('my\xe8k', 'myčk'),
-        ('My\xe8k', 'Myčk'),
-        # Podnož
-        ('podno~', 'podnož'),
-        ('Podno~', 'Podnož'),
-        # Digestoř
-        ('digesto\xf8', 'digestoř'),
-        ('Digesto\xf8', 'Digestoř'),
-        ('digestoY', 'digestoř'),
-        # Vestavěné
-        ('Vestav\xecn', 'Vestavěn'),
-        ('vestav\xecn', 'vestavěn'),
-        # Dvířka
-        ('Dv\xed\xf8k', 'Dvířk'),
-        ('dv\xed\xf8k', 'dvířk'),
-        ('Dv\xedYk', 'Dvířk'),
-        ('dv\xedYk', 'dvířk'),
-        # Příslušenství, přístrojové
-        ('P\xed\xedstrojov', 'Přístrojov'),
-        ('p\xed\xedstrojov', 'přístrojov'),
-        ('p\xed\xedslu\xb9', 'přísluš'),
-        ('P\xed\xedslu\xb9', 'Přísluš'),
-        # Spotřebiče
-        ('spot\xf8eb', 'spotřeb'),
-        ('Spot\xf8eb', 'Spotřeb'),
-        ('spotYeb', 'spotřeb'),
-        # Komín
-        ('kom\xedn', 'komín'),
-        # Závěsné
-        ('z\xe1v\xecsn', 'závěsn'),
-        ('Z\xe1v\xecsn', 'Závěsn'),
-        # Prodloužení
-        ('prodlou~en', 'prodloužen'),
-        ('Prodlou~en', 'Prodloužen'),
-        # Čela
-        ('\xe8ela', 'čela'),
-        ('\xe8el', 'čel'),
-        # Drážkou
-        ('dr\xe1~k', 'drážk'),
-        # Ukončením
-        ('ukon\xe8en', 'ukončen'),
-        ('ukonení', 'ukončení'),
-        ('ukonenm', 'ukončením'),
-        # Nástavce
-        ('N\xe1stav', 'Nástav'),
-        ('n\xe1stav', 'nástav'),
-        # Odtahové
-        ('Odtahov\xe9', 'Odtahové'),
-        # Procházím
-        ('proch\xe1z', 'procház'),
-        # Zmenšenou
-        ('zmen\xb9en', 'zmenšen'),
-        ('zmenaen', 'zmenšen'),
-        ('zmenšen', 'zmenšen'),
-        # Další časté vzory
-        ('spoY\xe1k', 'sporák'),
-        ('SpoY\xe1k', 'Sporák'),
-    ]
-
-    for old, new in raw_replacements:
-        result = result.replace(old, new)
-
-    # DRUHÝ KROK: Převeď zbývající Latin-1 znaky
-    latin1_map = {
-        '\xed': 'í',  # 0xED
-        '\xe1': 'á',  # 0xE1
-        '\xe9': 'é',  # 0xE9
-        '\xfd': 'ý',  # 0xFD
-        '\xfa': 'ú',  # 0xFA
-        '\xf9': 'ů',  # 0xF9
-        '\xf8': 'ř',  # 0xF8
-        '\xe8': 'č',  # 0xE8
-        '\xec': 'ě',  # 0xEC
-        '\xef': 'ď',  # 0xEF
-        '\xf2': 'ň',  # 0xF2
-        '\xf5': 'ť',  # 0xF5
-        '\xf3': 'ó',  # 0xF3
-        '\xda': 'Ú',  # 0xDA
-        '\xb9': 'š',  # 0xB9 (může být použito pro š v některých kódováních)
-    }
-
-    for old, new in latin1_map.items():
-        result = result.replace(old, new)
-
-    # TŘETÍ KROK: Oprav vzory po převodu Latin-1
-    post_replacements = [
-        # Y -> ř v kontextech
-        ('skříňky', 'skříňky'),
-        ('Skříňky', 'Skříňky'),
-        ('SkYíň', 'Skříň'),
-        ('skYíň', 'skříň'),
-        ('skYín', 'skřín'),
-        ('SkYín', 'Skřín'),
-        ('DYez', 'Dřez'),
-        ('dYez', 'dřez'),
-        ('pYí', 'pří'),
-        ('PYí', 'Pří'),
-        ('pYe', 'pře'),
-        ('PYe', 'Pře'),
-        ('stYí', 'stří'),
-        ('StYí', 'Stří'),
-        ('spotYeb', 'spotřeb'),
-        ('digestoY', 'digestoř'),
-        # ~ -> ž
-        ('~', 'ž'),
-        # Backtick -> š
-        ('`', 'š'),
-        # Opravy koncovek - skřín -> skříň
-        ('skřín ', 'skříň '),
-        ('Skřín ', 'Skříň '),
-        ('skříně', 'skříně'),
-        ('Skříně', 'Skříně'),
-        # Opravy "aa" -> "ša"
-        ('aatní', 'šatní'),
-        ('AATNÍ', 'ŠATNÍ'),
-        # Opravy "ae" -> "še"
-        ('aeno', 'šeno'),
-        # Opravy dalších chyb
-        ('míste', 'místě'),
-        ('Míste', 'Místě'),
-        ('prochozí', 'průchozí'),
-        ('Prochozí', 'Průchozí'),
-        # Závěsné
-        ('závsné', 'závěsné'),
-        ('Závsné', 'Závěsné'),
-        # Myčka/pračka
-        ('myku', 'myčku'),
-        ('Myku', 'Myčku'),
-        ('praku', 'pračku'),
-        ('Praku', 'Pračku'),
-        # Pecící
-        ('peicí', 'pečicí'),
-        ('Peicí', 'Pečicí'),
-        # Spotřebiče
-        ('spotY', 'spotř'),
-        ('SpotY', 'Spotř'),
-        # Lišty
-        ('liaty', 'lišty'),
-        ('Liaty', 'Lišty'),
-        # Nástavbové
-        ('nástavcove', 'nástavbové'),
-        ('Nástavcove', 'Nástavbové'),
-        # Chladničky/mrazničky
-        ('chladniky', 'chladničky'),
-        ('Chladniky', 'Chladničky'),
-        ('mrazniky', 'mrazničky'),
-        ('Mrazniky', 'Mrazničky'),
-        ('mrazniku', 'mrazničku'),
-        # Spotřebiče (koncovky)
-        ('spotřebie', 'spotřebiče'),
-        # Čela (bez háčku)
-        (' ela ', ' čela '),
-        (' elem', ' čelem'),
-        # Kolíky
-        ('kolíky', 'kolíky'),
-        # Nadměrná
-        ('nadmrná', 'nadměrná'),
-        ('Nadmrná', 'Nadměrná'),
-        ('nadmrn', 'nadměrn'),
-        # Výška
-        ('výakou', 'výškou'),
-        ('Výakou', 'Výškou'),
-        ('výaky', 'výšky'),
-        ('Výaky', 'Výšky'),
-        # Vnitřní
-        ('vnitYní', 'vnitřní'),
-        ('VnitYní', 'Vnitřní'),
-        # Dveřmi
-        ('dveYmi', 'dveřmi'),
-        ('DveYmi', 'Dveřmi'),
-        # Závěsná
-        ('Závsná', 'Závěsná'),
-        ('závsná', 'závěsná'),
-        # Ely -> čely
-        (' ely ', ' čely '),
-        ('s ely', 's čely'),
-    ]
-
-    for old, new in post_replacements:
-        result = result.replace(old, new)
+    result = _text_repair(text)
 
     # Oprav skřín na konci řetězce
     if result.endswith('skřín'):
@@ -270,6 +279,7 @@ def clean_and_translate_text(text):
     return result
 
 
+@lru_cache(maxsize=None)
 def translate_group_name(raw_text):
     """Přeloží název skupiny do správné češtiny"""
     if not raw_text:
@@ -294,52 +304,8 @@ def translate_group_name(raw_text):
 
 
 def create_cabinet_box(width, height, depth, cabinet_type='base'):
-    """Vytvoří parametrickou geometrii skříňky"""
-    w = width / 1000
-    h = height / 1000
-    d = depth / 1000
-    t = 0.018
-
-    vertices = []
-    indices = []
-
-    def add_panel(pos, size):
-        x, y, z = pos
-        pw, ph, pd = size
-        base_idx = len(vertices)
-
-        panel_verts = [
-            [x, y, z], [x + pw, y, z], [x + pw, y + ph, z], [x, y + ph, z],
-            [x, y, z + pd], [x + pw, y, z + pd], [x + pw, y + ph, z + pd], [x, y + ph, z + pd],
-        ]
-        vertices.extend(panel_verts)
-
-        panel_indices = [
-            0, 1, 2, 0, 2, 3, 5, 4, 7, 5, 7, 6,
-            4, 0, 3, 4, 3, 7, 1, 5, 6, 1, 6, 2,
-            4, 5, 1, 4, 1, 0, 3, 2, 6, 3, 6, 7,
-        ]
-        indices.extend([i + base_idx for i in panel_indices])
-
-    if cabinet_type == 'base':
-        add_panel([0, 0, 0], [t, h, d])
-        add_panel([w - t, 0, 0], [t, h, d])
-        add_panel([t, 0, 0], [w - 2*t, t, d])
-        add_panel([t, t, d - t], [w - 2*t, h - t, t])
-    elif cabinet_type == 'wall':
-        add_panel([0, 0, 0], [t, h, d])
-        add_panel([w - t, 0, 0], [t, h, d])
-        add_panel([t, 0, 0], [w - 2*t, t, d])
-        add_panel([t, h - t, 0], [w - 2*t, t, d])
-        add_panel([t, t, d - t], [w - 2*t, h - 2*t, t])
-    elif cabinet_type == 'tall':
-        add_panel([0, 0, 0], [t, h, d])
-        add_panel([w - t, 0, 0], [t, h, d])
-        add_panel([t, 0, 0], [w - 2*t, t, d])
-        add_panel([t, h - t, 0], [w - 2*t, t, d])
-        add_panel([t, t, d - t], [w - 2*t, h - 2*t, t])
-
-    return {'vertices': vertices, 'indices': indices, 'type': 'parametric'}
+    """Vytvoří parametrickou geometrii skříňky (viz cabinet_geometry, výsledek se pamatuje)"""
+    return cabinet_mesh(cabinet_type, width, height, depth)
 
 
 def determine_cabinet_type(skupina_name, height):
@@ -361,9 +327,11 @@ def determine_cabinet_type(skupina_name, height):
 def main():
     db_path = r'c:\Users\tomas\OneDrive\Apps\3D skrinky\sort.mdb'
     output_dir = r'c:\Users\tomas\OneDrive\Apps\3D skrinky\prototype\src\data'
+    # Rozdělený katalog se načítá za běhu, proto jde do public
+    shards_dir = r'c:\Users\tomas\OneDrive\Apps\3D skrinky\prototype\public\catalog'
 
     print("Načítám Oresi databázi...")
-    db = AccessParser(db_path)
+    db = CachedAccessParser(db_path)
 
     kusovnik = db.parse_table('Kusovnik')
     sirky = db.parse_table('MatKusovnikSirka')
@@ -387,7 +355,7 @@ def main():
     druh_map = {}
     for i in range(len(druhy['DruhID'])):
         druh_map[druhy['DruhID'][i]] = {
-            'name': druhy['Nazov'][i],
+            'name': clean_and_translate_text(druhy['Nazov'][i]),
             'typ_id': druhy['TypID'][i]
         }
 
@@ -400,22 +368,30 @@ def main():
             'typ_id': skupiny['TypID'][i]
         }
 
+    # Index KusovnikID -> platné šířky
+    sirky_idx = width_index(sirky)
+
     # Skupiny které chceme (hlavní kuchyňské skříňky)
     target_keywords = [
         'skříňk', 'skrink', 'spodn', 'horn', 'vysok', 'rohov',
         'dřez', 'drez', 'přístroj', 'pristroj', ' u ', ' h ', ' s '
     ]
 
+    # Popis nemusí být ve všech verzích databáze
+    popisy = kusovnik.get('Popis')
+
     # Filtruj skříňky
     cabinets = []
-    models = {}
+    # model_key -> (typ, šířka, výška, hloubka); sítě se generují najednou po filtrování
+    variant_keys = {}
 
     for i in range(len(kusovnik['KusovnikID'])):
         if not kusovnik['Platnost'][i]:
             continue
 
         kid = kusovnik['KusovnikID'][i]
-        nazov = kusovnik['Nazov'][i]
+        # Texty se opravují přes clean_and_translate_text (výsledek se pamatuje)
+        nazov = clean_and_translate_text(kusovnik['Nazov'][i])
         kod = kusovnik['Kod'][i]
         vyska = kusovnik['VyskaMM'][i] or 720
         hlbka = kusovnik['HlbkaMM'][i] or 560
@@ -451,12 +427,7 @@ def main():
             continue
 
         # Najdi šířky
-        widths = []
-        for j in range(len(sirky['KusovnikID'])):
-            if sirky['KusovnikID'][j] == kid and sirky['Platnost'][j]:
-                w = sirky['SirkaMM'][j]
-                if w and w > 0:
-                    widths.append(w)
+        widths = [w for w in sirky_idx.values(kid, 'SirkaMM') if w and w > 0]
 
         if not widths:
             widths = [600]
@@ -480,17 +451,32 @@ def main():
             'widths': sorted(set(widths))[:10],
         }
 
+        popis = clean_and_translate_text(popisy[i]) if popisy else None
+        if popis:
+            cabinet['description'] = popis
+
         cabinets.append(cabinet)
 
-        # Vytvoř geometrii
-        model_key = f"{cab_type}_{vyska}_{hlbka}"
-        if model_key not in models:
-            models[model_key] = create_cabinet_box(widths[0], vyska, hlbka, cab_type)
+        # Geometrie pro každou šířku zvlášť - desky mají skutečnou tloušťku
+        width_models = {}
+        for w in [widths[0]] + cabinet['widths']:
+            model_key = f"{cab_type}_{w}_{vyska}_{hlbka}"
+            variant_keys[model_key] = (cab_type, w, vyska, hlbka)
+            width_models[str(w)] = model_key
 
-        cabinet['model_key'] = model_key
+        cabinet['model_key'] = width_models[str(widths[0])]
+        cabinet['width_models'] = width_models
 
     print(f"Nalezeno {len(cabinets)} kuchyňských skříněk")
 
+    # Všechny šířkové varianty; stejné typ/výška/hloubka se počítají jedním voláním
+    meshes = variant_meshes(list(variant_keys.values()))
+    # Kopie záznamu z cache s předpočítanými daty pro umísťování (AABB, půdorys, zeď, kotvy)
+    geometries = {key: dict(meshes[params], placement=placement_metadata(meshes[params]['vertices'],
+                                                                        meshes[params]['indices']))
+                  for key, params in variant_keys.items()}
+    print(f"Vygenerováno {len(geometries)} šířkových variant")
+
     # Statistiky podle značky
     brand_counts = {}
     for cab in cabinets:
@@ -520,20 +506,27 @@ def main():
     ]
 
     # Export
+    packer = GeometryPacker()
+    models = {key: packer.add(g['vertices'], g['indices'], type=g['type'], placement=g['placement'])
+              for key, g in geometries.items()}
     catalog = {
         'brands': brands,
         'cabinets': cabinets,
         'models': models
     }
 
-    output_file = os.path.join(output_dir, 'catalog.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(catalog, f, indent=2, ensure_ascii=False)
+    output_file, bin_file = save_catalog(catalog, output_dir, packer)
 
-    print(f"\nUloženo do {output_file}")
+    print(f"\nUloženo do {output_file} a {bin_file} ({len(packer)} B geometrie)")
     print(f"Celkem skříněk: {len(cabinets)}")
     print(f"Celkem modelů: {len(models)}")
 
+    # Rozdělený katalog: index.json + shard na značku/skupinu
+    index = write_sharded_catalog(brands, cabinets, geometries, shards_dir, base_url='/catalog/')
+    print(f"\nRozdělený katalog v {shards_dir}:")
+    for brand in index['brands']:
+        print(f"  {brand['name']}: {brand['count']} skříněk v {len(brand['groups'])} shardech")
+
 
 if __name__ == '__main__':
     main()
@@ -5,115 +5,43 @@ Konverze VRML modelů z Oresi databáze do JSON formátu pro Three.js
 import sys
 sys.path.append('..')
 
-from access_parser import AccessParser
-import zlib
-import json
-import re
 import os
 
+import numpy as np
 
-def parse_vrml_to_threejs(vrml_content):
-    """Parsuje VRML a extrahuje geometrii pro Three.js"""
+from table_cache import CachedAccessParser
+from mdb_index import width_index, group_index
+from geometry_store import GeometryStore
 
-    geometry = {
-        'vertices': [],
-        'indices': [],
-        'normals': []
-    }
-
-    # Najdi všechny Coordinate body
-    coord_pattern = r'Coordinate\s*\{\s*point\s*\[([\s\S]*?)\]'
-    coord_matches = re.findall(coord_pattern, vrml_content)
-
-    # Najdi všechny coordIndex
-    index_pattern = r'coordIndex\s*\[([\s\S]*?)\]'
-    index_matches = re.findall(index_pattern, vrml_content)
-
-    all_vertices = []
-    all_indices = []
-    vertex_offset = 0
-
-    for i, coord_match in enumerate(coord_matches):
-        # Parsuj vrcholy
-        vertices_raw = coord_match.replace('\n', ' ').replace(',', ' ')
-        numbers = re.findall(r'-?\d+\.?\d*e?-?\d*', vertices_raw)
-
-        vertices = []
-        for j in range(0, len(numbers), 3):
-            if j + 2 < len(numbers):
-                try:
-                    x = float(numbers[j])
-                    y = float(numbers[j + 1])
-                    z = float(numbers[j + 2])
-                    vertices.append([x, y, z])
-                except ValueError:
-                    continue
-
-        all_vertices.extend(vertices)
-
-        # Parsuj indexy pokud existují
-        if i < len(index_matches):
-            indices_raw = index_matches[i].replace('\n', ' ').replace(',', ' ')
-            index_numbers = re.findall(r'-?\d+', indices_raw)
-
-            face = []
-            for idx in index_numbers:
-                idx_int = int(idx)
-                if idx_int == -1:
-                    # Konec face - vytvoř trojúhelníky
-                    if len(face) >= 3:
-                        # Fan triangulation
-                        for k in range(1, len(face) - 1):
-                            all_indices.append(face[0] + vertex_offset)
-                            all_indices.append(face[k] + vertex_offset)
-                            all_indices.append(face[k + 1] + vertex_offset)
-                    face = []
-                else:
-                    face.append(idx_int)
-
-        vertex_offset = len(all_vertices)
+from geometry_pack import GeometryPacker
+from catalog_stream import CatalogWriter
+from geometry_dedup import GeometryDeduplicator
+from simplify import simplify_mesh
+from placement import placement_metadata
 
-    geometry['vertices'] = all_vertices
-    geometry['indices'] = all_indices
-
-    return geometry
+# Rozpočet trojúhelníků na model v katalogu (dříve ořez na 1000 vrcholů / 3000 indexů)
+MODEL_TRIANGLE_BUDGET = 1000
 
 
 def get_cabinet_models(db_path, limit=50):
     """Získá modely skříněk z databáze"""
 
-    db = AccessParser(db_path)
+    db = CachedAccessParser(db_path)
     kusovnik = db.parse_table('Kusovnik')
     sirky = db.parse_table('MatKusovnikSirka')
-    geo = db.parse_table('GeoObjekt')
     skupiny = db.parse_table('SortSkupina')
 
-    # Vytvoř mapu GeoID -> geometrie
-    geo_map = {}
-    for i in range(len(geo['GeoID'])):
-        geo_id = geo['GeoID'][i]
-        grafika = geo['Grafika'][i]
-        popis = geo['Popis'][i]
-
-        if grafika and isinstance(grafika, bytes):
-            try:
-                decompressed = zlib.decompress(grafika[4:])
-                vrml_content = decompressed.decode('utf-8', errors='replace')
-                geo_map[geo_id] = {
-                    'vrml': vrml_content,
-                    'description': popis
-                }
-            except:
-                pass
-
-    # Vytvoř mapu SkupinaID -> název
-    skupina_map = {}
-    for i in range(len(skupiny['SkupinaID'])):
-        skupina_map[skupiny['SkupinaID'][i]] = skupiny['Nazov'][i]
+    # GeoID -> geometrie, dekomprimuje se až při použití
+    geo_store = GeometryStore(db)
+    # GeoID -> sdílený model podle obsahu (stejné bajty nebo stejná síť)
+    dedup = GeometryDeduplicator(geo_store)
+
+    # Indexy SkupinaID -> skupina a KusovnikID -> platné šířky
+    skupiny_idx = group_index(skupiny)
+    sirky_idx = width_index(sirky)
 
     # Sbírej skříňky
     cabinets = []
-    processed_geo_ids = set()
 
     for i in range(len(kusovnik['KusovnikID'])):
         if not kusovnik['Platnost'][i]:
@@ -132,16 +60,15 @@ def get_cabinet_models(db_path, limit=50):
 
         # Najdi šířky a GeoID pro tuto skříňku
         widths_data = []
-        for j in range(len(sirky['KusovnikID'])):
-            if sirky['KusovnikID'][j] == kid and sirky['Platnost'][j]:
-                geo_id = sirky['GeoID'][j]
-                sirka_mm = sirky['SirkaMM'][j]
+        for j in sirky_idx.rows(kid):
+            geo_id = sirky['GeoID'][j]
+            sirka_mm = sirky['SirkaMM'][j]
 
-                if geo_id and geo_id > 0 and geo_id in geo_map:
-                    widths_data.append({
-                        'width': sirka_mm,
-                        'geo_id': geo_id
-                    })
+            if geo_id and geo_id > 0 and geo_id in geo_store:
+                widths_data.append({
+                    'width': sirka_mm,
+                    'geo_id': geo_id
+                })
 
         if not widths_data:
             continue
@@ -150,12 +77,12 @@ def get_cabinet_models(db_path, limit=50):
         first_width = widths_data[0]
         geo_id = first_width['geo_id']
 
-        # Přeskoč duplicitní geometrie
-        if geo_id in processed_geo_ids:
+        # Skříňky se stejnou geometrií sdílejí jeden model
+        model_id = dedup.model_id(geo_id)
+        if model_id is None:
             continue
-        processed_geo_ids.add(geo_id)
 
-        skupina_nazov = skupina_map.get(skupina_id, 'Ostatní')
+        skupina_nazov = skupiny_idx.first(skupina_id, 'Nazov', 'Ostatní')
 
         cabinet = {
             'id': kid,
@@ -166,6 +93,7 @@ def get_cabinet_models(db_path, limit=50):
             'depth': hlbka,
             'width': first_width['width'],
             'geo_id': geo_id,
+            'model_id': model_id,
             'widths': [w['width'] for w in widths_data]
         }
 
@@ -174,7 +102,30 @@ def get_cabinet_models(db_path, limit=50):
         if len(cabinets) >= limit:
             break
 
-    return cabinets, geo_map
+    return cabinets, dedup
+
+
+def budget_geometry(vertices, faces, budget=MODEL_TRIANGLE_BUDGET):
+    """
+    Zjednoduší síť (svaření vrcholů + kvadriková decimace) na nejvýše budget
+    trojúhelníků se zachováním obrysu a obalového kvádru.
+    Vrací (vertices, faces, report) s počty trojúhelníků, chybou a posunem obalu.
+    """
+    vertices = np.asarray(vertices, dtype=np.float32)
+    faces = np.asarray(faces).reshape(-1, 3)
+    simplified, simplified_faces, error = simplify_mesh(vertices, faces, budget, keep_bounds=True)
+    if len(simplified_faces):
+        drift = max(np.abs(simplified.min(axis=0) - vertices.min(axis=0)).max(),
+                    np.abs(simplified.max(axis=0) - vertices.max(axis=0)).max())
+    else:
+        drift = 0.0
+    report = {
+        'triangles': len(faces),
+        'simplified': len(simplified_faces),
+        'error': error,
+        'bounds': float(drift),
+    }
+    return simplified, simplified_faces, report
 
 
 def create_box_geometry(width, height, depth):
@@ -198,49 +149,73 @@ def create_box_geometry(width, height, depth):
     return {'vertices': vertices, 'indices': indices}
 
 
-def main():
+def main(triangle_budget=MODEL_TRIANGLE_BUDGET, ndjson=False, compress=('gzip',)):
     db_path = r'c:\Users\tomas\OneDrive\Apps\3D skrinky\sort.mdb'
     output_dir = r'c:\Users\tomas\OneDrive\Apps\3D skrinky\prototype\src\data'
 
     print("Načítám databázi Oresi...")
-    cabinets, geo_map = get_cabinet_models(db_path, limit=100)
+    cabinets, dedup = get_cabinet_models(db_path, limit=100)
 
     print(f"Nalezeno {len(cabinets)} skříněk s geometrií")
-
-    # Konvertuj geometrie
-    models = {}
-    for cab in cabinets:
-        geo_id = cab['geo_id']
-
-        if geo_id in geo_map:
-            vrml = geo_map[geo_id]['vrml']
-            geometry = parse_vrml_to_threejs(vrml)
-
-            # Pokud se nepodařilo parsovat VRML, použij box
-            if not geometry['vertices']:
-                geometry = create_box_geometry(cab['width'], cab['height'], cab['depth'])
-                geometry['type'] = 'box'
-            else:
-                geometry['type'] = 'vrml'
-
-            models[geo_id] = geometry
-
-    # Ulož data
-    catalog_data = {
-        'cabinets': cabinets,
-        'models': {str(k): {
-            'vertices': v['vertices'][:1000] if len(v['vertices']) > 1000 else v['vertices'],  # Omez velikost
-            'indices': v['indices'][:3000] if len(v['indices']) > 3000 else v['indices'],
-            'type': v.get('type', 'vrml')
-        } for k, v in models.items()}
-    }
-
-    output_file = os.path.join(output_dir, 'catalog.json')
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(catalog_data, f, indent=2, ensure_ascii=False)
-
-    print(f"Uloženo do {output_file}")
+    print(f"Unikátních modelů: {len(dedup)} (shodné bajty: {dedup.byte_duplicates},"
+          f" shodná síť: {dedup.mesh_duplicates})")
+
+    # Prúdový zápis: každý sdílený model se rozparsuje až tady, převede jen
+    # jednou a hned zapíše do catalog.bin i catalog.json
+    json_path = os.path.join(output_dir, 'catalog.ndjson' if ndjson else 'catalog.json')
+    bin_path = os.path.join(output_dir, 'catalog.bin')
+    # catalog.bin se nahradí až po zapsání JSON; přerušený běh nechá starý pár
+    bin_tmp = bin_path + '.tmp'
+    models = set()
+    reports = []
+    try:
+        with open(bin_tmp, 'wb') as bin_file, \
+                CatalogWriter(json_path, ndjson=ndjson, compress=compress) as writer:
+            packer = GeometryPacker(bin_file)
+
+            writer.section('cabinets')
+            for cab in cabinets:
+                writer.add(cab)
+
+            writer.section('models', keyed=True)
+            for cab in cabinets:
+                model_id = cab['model_id']
+                if model_id in models:
+                    continue
+                models.add(model_id)
+
+                vertices, faces = dedup.geometry(model_id)
+                if vertices is not None:
+                    # Data pro umísťování z plné sítě, ne ze zjednodušené
+                    placement = placement_metadata(vertices, faces)
+                    vertices, faces, report = budget_geometry(vertices, faces, triangle_budget)
+                    entry = packer.add(vertices, faces, type='vrml', placement=placement)
+                    if report['simplified'] < report['triangles']:
+                        # Odchylka zjednodušení (m, viz simplify_mesh) pro klienta
+                        entry['error'] = round(report['error'], 6)
+                        reports.append(report)
+                else:
+                    # Pokud se nepodařilo parsovat VRML, použij box
+                    box = create_box_geometry(cab['width'], cab['height'], cab['depth'])
+                    entry = packer.add(box['vertices'], box['indices'], type='box',
+                                       placement=placement_metadata(box['vertices'], box['indices']))
+                writer.add(entry, key=model_id)
+
+            writer.value('geometry', {'url': 'catalog.bin', 'byteLength': len(packer)})
+    except BaseException:
+        if os.path.exists(bin_tmp):
+            os.remove(bin_tmp)
+        raise
+    os.replace(bin_tmp, bin_path)
+
+    sizes = ', '.join(f"{k} {v} B" for k, v in writer.sizes.items())
+    print(f"Uloženo do {json_path} ({sizes}) a {bin_path} ({len(packer)} B geometrie)")
     print(f"Počet modelů: {len(models)}")
+    if reports:
+        print(f"Zjednodušeno na {triangle_budget} trojúhelníků: {len(reports)} modelů,"
+              f" {sum(r['triangles'] for r in reports)} -> {sum(r['simplified'] for r in reports)} trojúhelníků,"
+              f" max. chyba {max(r['error'] for r in reports) * 1000:.2f} mm,"
+              f" max. posun obalu {max(r['bounds'] for r in reports) * 1000:.2f} mm")
 
     # Statistiky skupin
     groups = {}
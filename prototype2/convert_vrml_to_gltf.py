@@ -5,207 +5,329 @@ Používá trimesh pro načtení a export 3D modelů.
 """
 
 import os
-import re
+import sys
+import gzip
 import json
+import time
 import struct
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-def parse_vrml_geometry(vrml_content):
-    """Parsuje VRML soubor a extrahuje geometrii"""
+from build_manifest import BuildManifest, content_hash
 
-    # Najdi všechny Coordinate point bloky
-    coord_pattern = r'Coordinate\s*\{\s*point\s*\[([\s\S]*?)\]'
-    coord_matches = re.findall(coord_pattern, vrml_content)
+from vrml_parser import parse_vrml
+from vrml_scene import build_scene, material_key
+from mesh_ops import (valid_faces_mask, vertex_normals, crease_normals, weld_vertices,
+                      drop_degenerate, compact_vertices, index_dtype, split_by_vertex_limit,
+                      quantization_grid, quantize_positions, dequantize_matrix, quantize_normals,
+                      optimize_vertex_cache, reorder_vertices, cache_miss_ratio)
+from gltf_builder import GltfBuilder, DEFAULT_MATERIAL, ARRAY_BUFFER, ELEMENT_ARRAY_BUFFER
+from simplify import simplify_mesh, triangle_budget
+from placement import placement_metadata
 
-    # Najdi všechny coordIndex bloky
-    index_pattern = r'coordIndex\s*\[([\s\S]*?)\]'
-    index_matches = re.findall(index_pattern, vrml_content)
+# Zvyš při každé změně výstupu konvertoru - vynutí přestavbu všech GLB
+CONVERTER_VERSION = 6
+MANIFEST_NAME = ".manifest.json"
+# Mapa duplicitní model -> model se stejným obsahem, jehož GLB se má použít
+ALIASES_NAME = "aliases.json"
+# Model -> předpočítaná data pro umísťování (viz placement.py)
+PLACEMENT_NAME = "placement.json"
 
-    if not coord_matches or not index_matches:
-        return None, None
+# Formáty textur, které glTF umí vložit
+IMAGE_TYPES = {'.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.png': 'image/png'}
 
-    # Parsuj vertices
-    vertices = []
-    for coord_str in coord_matches:
-        # Odstraň komentáře a čáry
-        coord_str = re.sub(r'#.*', '', coord_str)
-        # Parsuj čísla
-        numbers = re.findall(r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?', coord_str)
-        for i in range(0, len(numbers) - 2, 3):
-            vertices.append([
-                float(numbers[i]),
-                float(numbers[i + 1]),
-                float(numbers[i + 2])
-            ])
-
-    # Parsuj faces (trojúhelníky)
-    faces = []
-    for index_str in index_matches:
-        index_str = re.sub(r'#.*', '', index_str)
-        numbers = re.findall(r'-?\d+', index_str)
-
-        current_face = []
-        for num in numbers:
-            idx = int(num)
-            if idx == -1:
-                # Konec face - triangulace pokud má víc než 3 vrcholy
-                if len(current_face) >= 3:
-                    # Fan triangulace
-                    for i in range(1, len(current_face) - 1):
-                        faces.append([current_face[0], current_face[i], current_face[i + 1]])
-                current_face = []
-            else:
-                current_face.append(idx)
-
-    return np.array(vertices, dtype=np.float32), np.array(faces, dtype=np.uint32)
+# Úrovně LOD: rozpočet < 1 je poměr k původnímu počtu trojúhelníků, jinak absolutní počet
+DEFAULT_LOD_BUDGETS = (0.5, 0.2)
+# Sítě s menším počtem trojúhelníků se nezjednodušují (krabice, desky)
+LOD_MIN_TRIANGLES = 64
+# Úroveň, která nesníží počet trojúhelníků alespoň o 10 %, se vynechá
+LOD_MIN_REDUCTION = 0.9
 
 
-def create_gltf(vertices, faces, name="model"):
-    """Vytvoří GLTF 2.0 JSON strukturu s embedded binary daty"""
+def parse_vrml_geometry(vrml_content):
+    """Parsuje VRML (text, bajty nebo soubor) a vrátí geometrii ve světových souřadnicích"""
+    vertices, faces = build_scene(parse_vrml(vrml_content)).flatten()
+    if vertices is None or len(faces) == 0:
+        return None, None
+    return vertices, faces
+
+
+def add_mesh_primitives(builder, vertices, faces, material=0, crease_angle=None,
+                        weld=True, split_uint16=False, quantize=None, report=None, uvs=None):
+    """
+    Přidá síť jako glTF primitivy a vrátí jejich seznam (prázdný, pokud síť nic neobsahuje).
+    Atributy POSITION, NORMAL a TEXCOORD_0 jsou prokládané v jednom bufferView.
+    crease_angle: None = hladké normály, jinak úhel (rad) podle VRML creaseAngle
+    weld: sloučí duplicitní vrcholy (stejná pozice i normála)
+    split_uint16: místo uint32 indexů rozdělí síť na primitivy do 65 535 vrcholů
+    quantize: mřížka z quantization_grid - pozice int16, normály int8
+    (KHR_mesh_quantization), trojúhelníky a vrcholy přeřazené pro cache;
+    dekvantizační matici musí nést uzel
+    report: slovník, do kterého se přičtou výpadky cache před a po přeřazení
+    uvs: texturové souřadnice VRML (N, 2) - v glTF se obrátí osa V
+    """
 
     if vertices is None or faces is None or len(vertices) == 0 or len(faces) == 0:
-        return None
+        return []
+
+    # Zahoď trojúhelníky s indexy mimo rozsah a degenerované trojúhelníky
+    vertices = np.asarray(vertices, dtype=np.float32)
+    faces = np.asarray(faces)
+    faces = faces[valid_faces_mask(faces, len(vertices))]
+    faces = drop_degenerate(faces, vertices)
+
+    if len(faces) == 0:
+        return []
+
+    # Atributy vrcholů kromě pozice (normály a volitelně UV) se přeindexovávají společně
+    extra = ()
+    if uvs is not None:
+        uvs = np.asarray(uvs, dtype=np.float32)
+        # VRML má počátek textury vlevo dole, glTF vlevo nahoře
+        extra = (np.column_stack([uvs[:, 0], 1.0 - uvs[:, 1]]),)
+
+    if crease_angle is None:
+        normals = vertex_normals(vertices, faces)
+    else:
+        vertices, faces, normals, source = crease_normals(vertices, faces, crease_angle)
+        extra = tuple(a[source] for a in extra)
+
+    if weld:
+        vertices, faces, (normals, *extra) = weld_vertices(vertices, faces, (normals,) + extra)
+        faces = drop_degenerate(faces)
+    vertices, faces, normals, *extra = compact_vertices(vertices, faces, normals, *extra)
+
+    if split_uint16 and len(vertices) > 0xFFFF:
+        parts = split_by_vertex_limit(faces, 0xFFFF)
+    else:
+        parts = [(faces, None)]
+
+    primitives = []
+    for part_faces, source in parts:
+        part_vertices = vertices if source is None else vertices[source]
+        part_normals = normals if source is None else normals[source]
+        part_uvs = [a if source is None else a[source] for a in extra]
+
+        if quantize is not None:
+            if report is not None:
+                report['triangles'] = report.get('triangles', 0) + len(part_faces)
+                report['cache_misses_before'] = (report.get('cache_misses_before', 0) +
+                                                 cache_miss_ratio(part_faces) * len(part_faces))
+            part_faces = optimize_vertex_cache(part_faces, len(part_vertices))
+            part_faces, order = reorder_vertices(part_faces, len(part_vertices))
+            if report is not None:
+                report['cache_misses_after'] = (report.get('cache_misses_after', 0) +
+                                                cache_miss_ratio(part_faces) * len(part_faces))
+            arrays = {
+                "POSITION": quantize_positions(part_vertices[order], quantize),
+                "NORMAL": quantize_normals(part_normals[order]),
+            }
+            for a in part_uvs:
+                # UV zůstávají float32 (KHR_mesh_quantization je povoluje)
+                arrays["TEXCOORD_0"] = a[order]
+            builder.use_extension("KHR_mesh_quantization", required=True)
+            part_vertices = order
+        else:
+            arrays = {"POSITION": part_vertices, "NORMAL": part_normals}
+            for a in part_uvs:
+                arrays["TEXCOORD_0"] = a
+        attributes = builder.add_interleaved(arrays, ARRAY_BUFFER, with_bounds=("POSITION",),
+                                             normalized=("NORMAL",) if quantize is not None else ())
+
+        # Nejmenší typ indexů, který pokryje počet vrcholů primitivy
+        indices_flat = part_faces.ravel().astype(index_dtype(len(part_vertices)))
+        primitives.append({
+            "attributes": attributes,
+            "indices": builder.add_accessor(indices_flat, ELEMENT_ARRAY_BUFFER),
+            "material": material
+        })
+    return primitives
+
 
-    # Normalizuj indices - ujisti se, že všechny indexy jsou v rozsahu
-    max_index = len(vertices) - 1
-    valid_faces = []
-    for face in faces:
-        if all(0 <= idx <= max_index for idx in face):
-            valid_faces.append(face)
+def create_gltf(vertices, faces, name="model"):
+    """Vytvoří GLTF 2.0 JSON strukturu s embedded binary daty"""
 
-    if not valid_faces:
+    builder = GltfBuilder()
+    primitives = add_mesh_primitives(builder, vertices, faces, builder.add_material(DEFAULT_MATERIAL))
+    if not primitives:
         return None
 
-    faces = np.array(valid_faces, dtype=np.uint32)
-
-    # Vypočítej normály pro každý vertex
-    normals = np.zeros_like(vertices)
-    for face in faces:
-        v0, v1, v2 = vertices[face[0]], vertices[face[1]], vertices[face[2]]
-        edge1 = v1 - v0
-        edge2 = v2 - v0
-        normal = np.cross(edge1, edge2)
-        norm_length = np.linalg.norm(normal)
-        if norm_length > 0:
-            normal = normal / norm_length
-        normals[face[0]] += normal
-        normals[face[1]] += normal
-        normals[face[2]] += normal
-
-    # Normalizuj normály
-    for i in range(len(normals)):
-        norm_length = np.linalg.norm(normals[i])
-        if norm_length > 0:
-            normals[i] = normals[i] / norm_length
-
-    normals = normals.astype(np.float32)
-
-    # Vytvoř binary buffer
-    indices_flat = faces.flatten().astype(np.uint16)
-
-    # Padding pro zarovnání
-    vertex_data = vertices.tobytes()
-    normal_data = normals.tobytes()
-    index_data = indices_flat.tobytes()
-
-    # Zarovnání na 4 bajty
-    def pad_to_4(data):
-        padding = (4 - len(data) % 4) % 4
-        return data + b'\x00' * padding
-
-    vertex_data = pad_to_4(vertex_data)
-    normal_data = pad_to_4(normal_data)
-    index_data = pad_to_4(index_data)
-
-    buffer_data = vertex_data + normal_data + index_data
-
-    # Bounding box
-    min_pos = vertices.min(axis=0).tolist()
-    max_pos = vertices.max(axis=0).tolist()
-
-    gltf = {
-        "asset": {
-            "version": "2.0",
-            "generator": "VRML to GLTF Converter"
-        },
-        "scene": 0,
-        "scenes": [{"nodes": [0]}],
-        "nodes": [{
-            "mesh": 0,
-            "name": name
-        }],
-        "meshes": [{
-            "primitives": [{
-                "attributes": {
-                    "POSITION": 0,
-                    "NORMAL": 1
-                },
-                "indices": 2,
-                "material": 0
-            }],
-            "name": name
-        }],
-        "materials": [{
-            "name": "default",
-            "pbrMetallicRoughness": {
-                "baseColorFactor": [0.9, 0.85, 0.75, 1.0],  # Světlé dřevo
-                "metallicFactor": 0.0,
-                "roughnessFactor": 0.7
-            }
-        }],
-        "accessors": [
-            {
-                "bufferView": 0,
-                "byteOffset": 0,
-                "componentType": 5126,  # FLOAT
-                "count": len(vertices),
-                "type": "VEC3",
-                "min": min_pos,
-                "max": max_pos
-            },
-            {
-                "bufferView": 1,
-                "byteOffset": 0,
-                "componentType": 5126,  # FLOAT
-                "count": len(normals),
-                "type": "VEC3"
-            },
-            {
-                "bufferView": 2,
-                "byteOffset": 0,
-                "componentType": 5123,  # UNSIGNED_SHORT
-                "count": len(indices_flat),
-                "type": "SCALAR"
-            }
-        ],
-        "bufferViews": [
-            {
-                "buffer": 0,
-                "byteOffset": 0,
-                "byteLength": len(vertex_data),
-                "target": 34962  # ARRAY_BUFFER
-            },
-            {
-                "buffer": 0,
-                "byteOffset": len(vertex_data),
-                "byteLength": len(normal_data),
-                "target": 34962  # ARRAY_BUFFER
-            },
-            {
-                "buffer": 0,
-                "byteOffset": len(vertex_data) + len(normal_data),
-                "byteLength": len(index_data),
-                "target": 34963  # ELEMENT_ARRAY_BUFFER
-            }
-        ],
-        "buffers": [{
-            "byteLength": len(buffer_data)
-        }]
+    mesh = builder.add_mesh(primitives, name)
+    builder.add_node({"mesh": mesh, "name": name}, root=True)
+    return builder.build()
+
+
+def scene_material(builder, material, texture_dir=None):
+    """
+    Materiál VRML (vrml_scene.shape_material) jako glTF PBR materiál; vrací
+    jeho index. Textura se vloží do GLB, pokud soubor existuje (cesta vůči
+    texture_dir) a je JPEG/PNG, jinak zůstane jen v extras.
+    """
+    if material is None:
+        return builder.add_material(DEFAULT_MATERIAL)
+
+    alpha = 1.0 - material['transparency']
+    # Phongův exponent shininess * 128 -> drsnost sqrt(2 / (n + 2))
+    roughness = float(np.sqrt(2.0 / (material['shininess'] * 128 + 2)))
+    pbr = {
+        "baseColorFactor": list(material['diffuseColor']) + [round(alpha, 4)],
+        "metallicFactor": 0.0,
+        "roughnessFactor": round(roughness, 4),
     }
+    gltf_material = {"pbrMetallicRoughness": pbr}
+    if alpha < 1.0:
+        gltf_material["alphaMode"] = "BLEND"
+
+    url = material['texture']
+    if url:
+        path = Path(texture_dir or '.') / url
+        mime_type = IMAGE_TYPES.get(path.suffix.lower())
+        if mime_type and path.is_file():
+            pbr["baseColorTexture"] = {"index": builder.add_image(path.read_bytes(), mime_type)}
+            # RGB textura ve VRML nahrazuje difuzní barvu
+            pbr["baseColorFactor"] = [1.0, 1.0, 1.0, round(alpha, 4)]
+        else:
+            gltf_material["extras"] = {"texture": url}
+    return builder.add_material(gltf_material)
+
+
+def lod_screen_coverage(levels):
+    """Prahy MSFT_screencoverage pro plnou síť a levels zjednodušených úrovní"""
+    return [round(0.25 * 0.4 ** k, 4) for k in range(levels + 1)]
+
+
+def build_mesh_lods(mesh, budgets):
+    """
+    Zjednoduší SceneMesh na úrovně podle budgets.
+    Vrací seznam (vertices, faces, report), kde report je slovník se
+    statistikou úrovně (rozpočet, trojúhelníky, vrcholy, max. chyba).
+    """
+    lods = []
+    triangles = len(mesh.faces)
+    # Zjednodušení nepřenáší UV - texturované sítě zůstanou jen v plné úrovni
+    if triangles < LOD_MIN_TRIANGLES or mesh.uvs is not None:
+        return lods
+
+    previous = triangles
+    for level, budget in enumerate(budgets, start=1):
+        target = triangle_budget(budget, triangles)
+        if target >= previous:
+            continue
+        vertices, faces, error = simplify_mesh(mesh.vertices, mesh.faces, target)
+        if len(faces) == 0 or len(faces) > previous * LOD_MIN_REDUCTION:
+            continue
+        lods.append((vertices, faces, {
+            'level': level,
+            'budget': budget,
+            'triangles': int(len(faces)),
+            'vertices': int(len(vertices)),
+            'max_error': error,
+        }))
+        previous = len(faces)
+    return lods
+
+
+def set_node_matrix(node, matrix, dequantize=None):
+    """Matice uzlu (po sloupcích, jak ji ukládá glTF), s dekvantizací sítě; jednotková se vynechá"""
+    if dequantize is not None:
+        matrix = matrix @ dequantize
+    if not np.allclose(matrix, np.eye(4)):
+        node["matrix"] = matrix.T.ravel().tolist()
+
+
+def create_scene_gltf(scene, name="model", use_crease_angle=False, split_uint16=False,
+                      lod_budgets=(), lod_report=None, quantize=False, compression_report=None,
+                      batch_materials=True, texture_dir=None):
+    """
+    Vytvoří GLTF ze scény VRML: jedna síť na IndexedFaceSet a jeden uzel
+    na každý Shape. Geometrie sdílená přes USE se uloží jen jednou.
+    batch_materials: Shape se stejným materiálem se spojí do jedné sítě
+    (VrmlScene.batch_by_material) - jeden draw call na materiál; geometrie
+    sdílená přes USE zůstane sdílenou sítí s uzlem na každé použití
+    texture_dir: adresář, vůči kterému se hledají textury z ImageTexture
+    use_crease_angle: normály podle creaseAngle z VRML místo plně hladkých
+    split_uint16: velké sítě rozdělit na primitivy s 16bitovými indexy
+    lod_budgets: rozpočty trojúhelníků zjednodušených úrovní (MSFT_lod);
+    statistika úrovní se připojí do seznamu lod_report, je-li zadán
+    quantize: kvantizované atributy (viz add_mesh_primitives) s vlastní mřížkou
+    pro každou síť i každou její LOD úroveň (vrcholy zjednodušení mohou ležet
+    mimo obal originálu); do compression_report se přičte statistika cache
+    """
+
+    if batch_materials:
+        scene = scene.batch_by_material()
+
+    builder = GltfBuilder()
+    materials = {}
+
+    mesh_indices = {}
+    lod_meshes = {}
+    dequantize = {}
+    for i, mesh in enumerate(scene.meshes):
+        key = material_key(mesh.material)
+        if key not in materials:
+            materials[key] = scene_material(builder, mesh.material, texture_dir)
+        material = materials[key]
+        crease = mesh.crease_angle if use_crease_angle else None
+        grid = quantization_grid(mesh.vertices) if quantize else None
+        primitives = add_mesh_primitives(builder, mesh.vertices, mesh.faces, material, crease,
+                                         split_uint16=split_uint16, quantize=grid,
+                                         report=compression_report, uvs=mesh.uvs)
+        if not primitives:
+            continue
+        mesh_indices[i] = builder.add_mesh(primitives, mesh.name)
+        if grid is not None:
+            dequantize[i] = dequantize_matrix(grid)
+
+        levels = []
+        for vertices, faces, report in build_mesh_lods(mesh, lod_budgets):
+            lod_grid = quantization_grid(vertices) if quantize else None
+            primitives = add_mesh_primitives(builder, vertices, faces, material, crease,
+                                             split_uint16=split_uint16, quantize=lod_grid,
+                                             report=compression_report)
+            if not primitives:
+                continue
+            lod_name = f"{mesh.name}_LOD{report['level']}" if mesh.name else None
+            levels.append((builder.add_mesh(primitives, lod_name),
+                           dequantize_matrix(lod_grid) if lod_grid is not None else None))
+            if lod_report is not None:
+                lod_report.append(dict(report, mesh=mesh.name, source_triangles=int(len(mesh.faces))))
+        if levels:
+            lod_meshes[i] = levels
+
+    children = []
+    for inst in scene.instances:
+        if inst.mesh_index not in mesh_indices:
+            continue
+        node = {"mesh": mesh_indices[inst.mesh_index]}
+        if inst.name:
+            node["name"] = inst.name
+        set_node_matrix(node, inst.matrix, dequantize.get(inst.mesh_index))
+
+        levels = lod_meshes.get(inst.mesh_index)
+        if levels:
+            # Zjednodušené úrovně jsou samostatné uzly mimo scénu se stejnou maticí
+            # instance (a vlastní dekvantizací)
+            ids = []
+            for level_mesh, level_dequantize in levels:
+                level_node = dict(node, mesh=level_mesh)
+                level_node.pop("matrix", None)
+                set_node_matrix(level_node, inst.matrix, level_dequantize)
+                ids.append(builder.add_node(level_node))
+            node["extensions"] = {"MSFT_lod": {"ids": ids}}
+            node["extras"] = {"MSFT_screencoverage": lod_screen_coverage(len(ids))}
+            builder.use_extension("MSFT_lod")
+        children.append(builder.add_node(node))
+
+    if not children:
+        return None
 
-    return gltf, buffer_data
+    builder.add_node({"name": name, "children": children}, root=True)
+    return builder.build()
 
 
 def save_glb(gltf_json, buffer_data, output_path):
@@ -242,64 +364,347 @@ def save_glb(gltf_json, buffer_data, output_path):
         f.write(buffer_data)
 
 
-def convert_vrml_to_gltf(vrml_path, output_dir):
-    """Konvertuje VRML soubor na GLTF/GLB"""
-
-    vrml_path = Path(vrml_path)
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    print(f"Zpracovávám: {vrml_path.name}")
-
-    try:
-        # Zkus různá kódování
-        content = None
-        for encoding in ['utf-8', 'latin-1', 'cp1250']:
-            try:
-                with open(vrml_path, 'r', encoding=encoding) as f:
-                    content = f.read()
-                break
-            except UnicodeDecodeError:
-                continue
+def compression_stats(gltf, glb_bytes, gz_bytes, cache_report):
+    """
+    Porovnání velikosti a ceny dekódování kvantizovaného GLB: odhad velikosti
+    s float32 atributy, velikost po deflate, čas rozbalení a ACMR před/po.
+    """
+    views = set()
+    float_bytes = 0
+    for mesh in gltf.get("meshes", []):
+        for primitive in mesh["primitives"]:
+            for accessor_index in primitive["attributes"].values():
+                accessor = gltf["accessors"][accessor_index]
+                # Prokládané atributy sdílí jeden bufferView
+                views.add(accessor["bufferView"])
+                float_bytes += accessor["count"] * 4 * int(accessor["type"][-1])
+    quantized = sum(gltf["bufferViews"][view]["byteLength"] for view in views)
+
+    # Cena dekódování na klientu: jen inflate (dekvantizaci dělá matice uzlu na GPU)
+    timings = []
+    for _ in range(5):
+        start = time.perf_counter()
+        gzip.decompress(gz_bytes)
+        timings.append(time.perf_counter() - start)
+
+    triangles = cache_report.get('triangles', 0) or 1
+    return {
+        'float_glb_bytes': glb_bytes - quantized + float_bytes,
+        'glb_bytes': glb_bytes,
+        'gzip_bytes': len(gz_bytes),
+        'inflate_ms': round(sorted(timings)[len(timings) // 2] * 1000, 3),
+        'acmr_before': round(cache_report.get('cache_misses_before', 0) / triangles, 3),
+        'acmr_after': round(cache_report.get('cache_misses_after', 0) / triangles, 3),
+    }
 
-        if content is None:
-            print(f"  Chyba: Nelze přečíst soubor")
-            return False
 
-        vertices, faces = parse_vrml_geometry(content)
+def model_name(vrml_path):
+    """Název modelu (a GLB) ze jména VRML souboru"""
+    return Path(vrml_path).stem.replace('_geo', '').replace('_main', '')
 
-        if vertices is None or len(vertices) == 0:
-            print(f"  Chyba: Žádná geometrie nalezena")
-            return False
 
-        print(f"  Nalezeno {len(vertices)} vertices, {len(faces)} faces")
+def convert_file(vrml_path, output_dir, use_crease_angle=False, split_uint16=False, lod_budgets=(),
+                 compress=False, batch_materials=True):
+    """
+    Konvertuje VRML soubor na GLB bez výpisů (vhodné pro pracovní procesy).
+    Vrací slovník se statistikou; při chybě obsahuje klíč 'error'.
+    Statistika LOD úrovní (chyba a počty pro každou síť) je pod klíčem 'lods'.
+    Data pro umísťování (AABB, půdorys, zeď, kotvy) jsou pod klíčem 'placement'
+    a v extras scény GLB.
+    compress: kvantizace + přeřazení indexů a vedle GLB i .glb.gz (deflate);
+    porovnání velikostí a ceny dekódování je pod klíčem 'compression'.
+    batch_materials: jedna síť na materiál místo uzlu na každý Shape
+    (kromě geometrie sdílené přes USE); počet materiálů je pod klíčem
+    'materials'.
+    """
 
-        # Vytvoř GLTF
-        name = vrml_path.stem.replace('_geo', '').replace('_main', '')
-        gltf, buffer_data = create_gltf(vertices, faces, name)
+    vrml_path = Path(vrml_path)
+    output_dir = Path(output_dir)
+    name = model_name(vrml_path)
+    stats = {
+        'source': str(vrml_path),
+        'name': name,
+        'bytes': vrml_path.stat().st_size,
+    }
+    start = time.perf_counter()
 
-        if gltf is None:
-            print(f"  Chyba: Nelze vytvořit GLTF")
-            return False
+    try:
+        # Jedno namapování souboru; kódování jmen se zjistí z ne-ASCII bajtů
+        scene = build_scene(parse_vrml(vrml_path))
+        if not scene:
+            raise ValueError("Žádná geometrie nalezena")
+
+        stats.update({
+            'vertices': scene.vertex_count,
+            'faces': scene.face_count,
+            'meshes': len(scene.meshes),
+            'instances': len(scene.instances),
+        })
+
+        lods = []
+        cache_report = {}
+        result = create_scene_gltf(scene, name, use_crease_angle, split_uint16, lod_budgets, lods,
+                                   compress, cache_report, batch_materials, vrml_path.parent)
+        if result is None:
+            raise ValueError("Nelze vytvořit GLTF")
+        gltf, buffer_data = result
+        stats['materials'] = len(gltf.get('materials', []))
+        if lods:
+            stats['lods'] = lods
+
+        placement = placement_metadata(*scene.flatten())
+        if placement is not None:
+            stats['placement'] = placement
+            gltf['scenes'][0]['extras'] = {'placement': placement}
 
         # Ulož jako GLB
+        output_dir.mkdir(parents=True, exist_ok=True)
         output_path = output_dir / f"{name}.glb"
         save_glb(gltf, buffer_data, output_path)
+        stats['output'] = str(output_path)
 
-        print(f"  Uloženo: {output_path.name}")
-        return True
+        if compress:
+            glb = output_path.read_bytes()
+            # mtime=0 - stejný vstup dá bajtově stejný soubor
+            gz = gzip.compress(glb, compresslevel=9, mtime=0)
+            output_path.with_name(output_path.name + '.gz').write_bytes(gz)
+            stats['compression'] = compression_stats(gltf, len(glb), gz, cache_report)
 
     except Exception as e:
-        print(f"  Chyba: {e}")
+        stats['error'] = str(e)
+
+    stats['seconds'] = round(time.perf_counter() - start, 4)
+    return stats
+
+
+def convert_vrml_to_gltf(vrml_path, output_dir, use_crease_angle=False, split_uint16=False, lod_budgets=(),
+                         compress=False, batch_materials=True):
+    """Konvertuje VRML soubor na GLTF/GLB"""
+
+    print(f"Zpracovávám: {Path(vrml_path).name}")
+    stats = convert_file(vrml_path, output_dir, use_crease_angle, split_uint16, lod_budgets, compress,
+                         batch_materials)
+
+    if 'error' in stats:
+        print(f"  Chyba: {stats['error']}")
         return False
 
+    print(f"  Nalezeno {stats['vertices']} vertices, {stats['faces']} faces"
+          f" ({stats['meshes']} sítí, {stats['instances']} instancí, {stats['materials']} materiálů)")
+    for lod in stats.get('lods', []):
+        print(f"  LOD{lod['level']} {lod['mesh']}: {lod['source_triangles']} -> {lod['triangles']} faces,"
+              f" chyba {lod['max_error']:.5f}")
+    if 'compression' in stats:
+        c = stats['compression']
+        print(f"  Velikost: {c['float_glb_bytes']} B float32 -> {c['glb_bytes']} B kvantizováno"
+              f" -> {c['gzip_bytes']} B gzip (inflate {c['inflate_ms']} ms, ACMR {c['acmr_before']}"
+              f" -> {c['acmr_after']})")
+    print(f"  Uloženo: {Path(stats['output']).name}")
+    return True
+
+
+def convert_batch(vrml_files, output_dir, workers=None, report_path=None, incremental=True, **options):
+    """
+    Konvertuje soubory paralelně v procesech. Největší soubory se zadávají
+    první, aby se práce mezi procesy rozložila rovnoměrně.
+
+    incremental: podle output_dir/.manifest.json přeskočí soubory, jejichž
+    obsah i verze konvertoru se nezměnily, a smaže GLB zdrojů, které zmizely.
+    Vždy se smaže vlastní GLB souboru, který se stal aliasem, a bez
+    komprese i .glb.gz z dřívějších běhů.
+
+    Soubory se stejným obsahem se konvertují jen jednou; ostatní dostanou
+    v output_dir/aliases.json odkaz na GLB prvního z nich.
+
+    Vrací seznam statistik (viz convert_file) a volitelně zapíše JSON report.
+    """
+
+    vrml_files = sorted((Path(f) for f in vrml_files), key=lambda f: f.stat().st_size, reverse=True)
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = []
+
+    manifest = BuildManifest(Path(output_dir) / MANIFEST_NAME,
+                             f"{CONVERTER_VERSION}:{json.dumps(options, sort_keys=True)}")
+    hashes = {f: content_hash(f) for f in vrml_files}
+
+    # Shodný obsah: konvertuje se první soubor podle jména, ostatní jsou aliasy
+    canonical = {}
+    duplicates = {}
+    for f in sorted(vrml_files, key=lambda f: f.name):
+        first = canonical.setdefault(hashes[f], f)
+        if first is not f:
+            duplicates[f] = first
+
+    todo = []
+    skipped = []
+    for f in vrml_files:
+        if f in duplicates:
+            continue
+        # Bývalá duplicita má v manifestu výstup svého vzoru, ne vlastní GLB
+        if incremental and manifest.is_fresh(f.name, hashes[f], Path(output_dir) / f"{model_name(f)}.glb"):
+            skipped.append(f)
+        else:
+            todo.append(f)
+
+    def report_progress(stats):
+        results.append(stats)
+        source = Path(stats['source'])
+        if 'error' in stats:
+            status = f"CHYBA: {stats['error']}"
+        else:
+            status = f"{stats['vertices']} v, {stats['faces']} f, {stats['seconds']:.2f} s"
+            if stats.get('lods'):
+                status += f", {len(stats['lods'])} LOD sítí"
+            if 'compression' in stats:
+                status += f", {stats['compression']['glb_bytes']} B / {stats['compression']['gzip_bytes']} B gz"
+            manifest.record(source.name, hashes[source], stats['output'],
+                            {k: stats[k] for k in ('vertices', 'faces', 'meshes', 'instances', 'materials', 'lods',
+                                                   'compression', 'placement') if k in stats})
+        print(f"  [{len(results)}/{len(todo)}] {source.name}: {status}")
+
+    if skipped:
+        print(f"Beze změny (přeskočeno): {len(skipped)}")
+
+    if workers == 1 or len(todo) <= 1:
+        for vrml_file in todo:
+            report_progress(convert_file(vrml_file, output_dir, **options))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(convert_file, f, output_dir, **options): f for f in todo}
+            for future in as_completed(futures):
+                try:
+                    stats = future.result()
+                except Exception as e:
+                    # Pád pracovního procesu
+                    stats = {'source': str(futures[future]), 'error': str(e)}
+                report_progress(stats)
+
+    # Aliasy sdílejí výstup svého vzoru, pokud se vzor podařilo převést
+    failed_sources = {r['source'] for r in results if 'error' in r}
+    aliases = {}
+    for f, first in sorted(duplicates.items(), key=lambda item: item[0].name):
+        if str(first) in failed_sources:
+            continue
+        output = Path(output_dir) / f"{model_name(first)}.glb"
+        aliases[model_name(f)] = model_name(first)
+        manifest.record(f.name, hashes[f], output, {'duplicate_of': first.name})
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    with open(Path(output_dir) / ALIASES_NAME, 'w', encoding='utf-8') as f:
+        json.dump(aliases, f, indent=2, ensure_ascii=False, sort_keys=True)
+
+    # Data pro umísťování všech modelů včetně přeskočených (z manifestu) a aliasů
+    placements = {}
+    for f in vrml_files:
+        entry = manifest.get(f.name)
+        if entry and entry.get('hash') == hashes[f]:
+            placement = entry.get('stats', {}).get('placement')
+            if placement:
+                placements[model_name(f)] = placement
+    for alias, first in aliases.items():
+        if first in placements:
+            placements[alias] = placements[first]
+    with open(Path(output_dir) / PLACEMENT_NAME, 'w', encoding='utf-8') as f:
+        json.dump(placements, f, separators=(',', ':'), ensure_ascii=False, sort_keys=True)
+
+    removed = manifest.remove_orphans(f.name for f in vrml_files) if incremental else []
+    for path in removed:
+        # Komprimovaná kopie osiřelého GLB
+        if os.path.exists(path + '.gz'):
+            os.remove(path + '.gz')
+
+    # Zastaralé výstupy existujících zdrojů: vlastní GLB bývalého vzoru, který
+    # je teď jen aliasem, a .glb.gz po vypnutí komprese
+    stale = []
+    for f, first in duplicates.items():
+        if model_name(f) in aliases and model_name(f) != model_name(first):
+            own = Path(output_dir) / f"{model_name(f)}.glb"
+            stale += [own, own.with_name(own.name + '.gz')]
+    if not options.get('compress'):
+        stale += [Path(output_dir) / f"{model_name(f)}.glb.gz" for f in vrml_files if f not in duplicates]
+    for path in stale:
+        if path.exists():
+            path.unlink()
+            removed.append(str(path))
+    manifest.save()
+
+    wall = time.perf_counter() - start
+    ok = [r for r in results if 'error' not in r]
+    failed = [r for r in results if 'error' in r]
+    summary = {
+        'files': len(vrml_files),
+        'converted': len(ok),
+        'skipped': len(skipped),
+        'duplicates': len(aliases),
+        'failed': len(failed),
+        'removed': len(removed),
+        'workers': workers,
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(sum(r.get('seconds', 0) for r in results), 3),
+        'vertices': sum(r['vertices'] for r in ok),
+        'faces': sum(r['faces'] for r in ok),
+    }
+    compressed = [r['compression'] for r in ok if 'compression' in r]
+    if compressed:
+        for key in ('float_glb_bytes', 'glb_bytes', 'gzip_bytes'):
+            summary[key] = sum(c[key] for c in compressed)
+
+    print("-" * 50)
+    print(f"Úspěšně konvertováno: {summary['converted']}/{len(todo)}"
+          f" za {summary['wall_seconds']:.2f} s ({workers} procesů,"
+          f" součet časů {summary['cpu_seconds']:.2f} s)")
+    print(f"Přeskočeno beze změny: {summary['skipped']}, smazáno osiřelých a zastaralých výstupů: {summary['removed']}")
+    if aliases:
+        print(f"Duplicitní obsah (jen alias v {ALIASES_NAME}): {len(aliases)}")
+    print(f"Celkem {summary['vertices']} vertices, {summary['faces']} faces")
+    if compressed:
+        print(f"Velikost: {summary['float_glb_bytes']} B float32 -> {summary['glb_bytes']} B"
+              f" kvantizováno -> {summary['gzip_bytes']} B gzip")
+    for r in failed:
+        print(f"  Chyba: {Path(r['source']).name}: {r['error']}")
+
+    if report_path:
+        report = {'summary': summary, 'files': sorted(results, key=lambda r: r['source']), 'aliases': aliases}
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Report: {report_path}")
+
+    return results
+
 
 def main():
     """Hlavní funkce - konvertuje všechny VRML soubory"""
 
     base_dir = Path(__file__).parent.parent
-    vrml_dir = base_dir / "export" / "vrml"
-    output_dir = base_dir / "prototype" / "public" / "models"
+
+    parser = argparse.ArgumentParser(description="Konverze VRML souborů na GLB")
+    parser.add_argument('--input', type=Path, default=base_dir / "export" / "vrml",
+                        help="adresář s .wrl soubory")
+    parser.add_argument('--output', type=Path, default=base_dir / "prototype" / "public" / "models",
+                        help="výstupní adresář pro .glb")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="počet procesů (výchozí: počet jader)")
+    parser.add_argument('--report', type=Path, default=None,
+                        help="cesta k JSON reportu s časy a statistikami")
+    parser.add_argument('--force', action='store_true',
+                        help="přestavět všechny GLB bez ohledu na manifest")
+    parser.add_argument('--crease', action='store_true',
+                        help="normály podle creaseAngle z VRML")
+    parser.add_argument('--split-uint16', action='store_true',
+                        help="velké sítě rozdělit na primitivy s 16bitovými indexy")
+    parser.add_argument('--lod', type=float, nargs='*', default=list(DEFAULT_LOD_BUDGETS),
+                        help="rozpočty LOD úrovní: poměr (< 1) nebo počet trojúhelníků;"
+                             " bez hodnot = bez LOD")
+    parser.add_argument('--compress', action='store_true',
+                        help="kvantizace (KHR_mesh_quantization), přeřazení indexů pro cache"
+                             " a .glb.gz vedle každého GLB")
+    parser.add_argument('--per-shape', action='store_true',
+                        help="uzel a síť na každý Shape místo jedné sítě na materiál"
+                             " (geometrie sdílená přes USE zůstává sdílená v obou režimech)")
+    args = parser.parse_args()
+
+    vrml_dir = args.input
+    output_dir = args.output
 
     if not vrml_dir.exists():
         print(f"VRML adresář neexistuje: {vrml_dir}")
@@ -315,13 +720,9 @@ def main():
     print(f"Výstupní adresář: {output_dir}")
     print("-" * 50)
 
-    success_count = 0
-    for vrml_file in vrml_files:
-        if convert_vrml_to_gltf(vrml_file, output_dir):
-            success_count += 1
-
-    print("-" * 50)
-    print(f"Úspěšně konvertováno: {success_count}/{len(vrml_files)}")
+    convert_batch(vrml_files, output_dir, workers=args.workers, report_path=args.report,
+                  incremental=not args.force, use_crease_angle=args.crease, split_uint16=args.split_uint16,
+                  lod_budgets=args.lod, compress=args.compress, batch_materials=not args.per_shape)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,97 @@
+"""
+Deduplikace geometrie přes obsah místo GeoID.
+
+Různá GeoID v databázi často obsahují stejný model (stejný korpus pod
+jiným ID). Nejdřív se porovná hash dekomprimovaných bajtů Grafika, u nových
+bajtů pak kanonický hash sítě (viz mesh_ops.canonical_mesh_hash), který
+zachytí i jinak zapsané VRML se stejnou geometrií ve světových souřadnicích.
+Každé GeoID se tak namapuje na sdílené ID modelu - první GeoID s daným obsahem.
+
+Při deduplikaci se drží jen hashe. Pole sítě vrací geometry() nově
+rozparsovaná z GeometryStore, takže v paměti je vždy jen model, který se
+právě zapisuje, ne všechny unikátní modely.
+"""
+
+import zlib
+
+from vrml_parser import parse_vrml, VrmlSyntaxError
+from vrml_scene import build_scene
+from mesh_ops import canonical_mesh_hash
+
+
+class GeometryDeduplicator:
+    """Mapuje GeoID na sdílené ID modelu podle obsahu (store je GeometryStore)"""
+
+    def __init__(self, store):
+        self.store = store
+        self._model_by_geo = {}
+        self._model_by_bytes = {}
+        self._model_by_mesh = {}
+        self._models = set()
+        self.byte_duplicates = 0
+        self.mesh_duplicates = 0
+
+    def model_id(self, geo_id):
+        """Sdílené ID modelu pro GeoID, nebo None, pokud GeoID nemá geometrii"""
+        if geo_id in self._model_by_geo:
+            return self._model_by_geo[geo_id]
+
+        try:
+            digest = self.store.content_hash(geo_id)
+        except zlib.error:
+            digest = None
+        if digest is None:
+            self._model_by_geo[geo_id] = None
+            return None
+
+        model = self._model_by_bytes.get(digest)
+        if model is not None:
+            self.byte_duplicates += 1
+        else:
+            vertices, faces = self._parse(geo_id)
+            mesh_hash = canonical_mesh_hash(vertices, faces) if vertices is not None else None
+            model = self._model_by_mesh.get(mesh_hash) if mesh_hash else None
+            if model is not None:
+                self.mesh_duplicates += 1
+            else:
+                model = geo_id
+                self._models.add(model)
+                if mesh_hash:
+                    self._model_by_mesh[mesh_hash] = model
+            self._model_by_bytes[digest] = model
+
+        self._model_by_geo[geo_id] = model
+        return model
+
+    def geometry(self, model_id):
+        """
+        (vertices, faces) ve světových souřadnicích modelu, nebo (None, None).
+        Model se parsuje znovu při každém volání, nic se neuchovává.
+        """
+        if model_id not in self._models:
+            return None, None
+        return self._parse(model_id)
+
+    def members(self):
+        """ID modelu -> seznam GeoID, která ho sdílejí"""
+        groups = {}
+        for geo_id, model in self._model_by_geo.items():
+            if model is not None:
+                groups.setdefault(model, []).append(geo_id)
+        return groups
+
+    def __len__(self):
+        return len(self._models)
+
+    def _parse(self, geo_id):
+        text = self.store.get_text(geo_id)
+        if text is None:
+            return None, None
+        try:
+            return build_scene(parse_vrml(text)).flatten()
+        except VrmlSyntaxError:
+            return None, None
+        except Exception as e:
+            # Neobvyklá struktura scény nesmí zastavit celý katalog
+            print(f"  GeoID {geo_id}: VRML nelze zpracovat ({type(e).__name__}: {e})")
+            return None, None
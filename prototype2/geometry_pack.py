@@ -0,0 +1,115 @@
+"""
+Binární sidecar pro geometrii katalogu.
+
+Všechny modely se zapíší do jednoho little-endian souboru (catalog.bin):
+vrcholy jako float32 XYZ, indexy jako uint16 nebo uint32, každý blok
+zarovnaný na 4 bajty. Záznam v catalog.json obsahuje jen offsety, počty
+a bounding box, takže frontend nad souborem vytvoří typed-array pohledy
+bez kopírování.
+
+S otevřeným souborem GeometryPacker zapisuje bloky rovnou na disk a v paměti
+nedrží nic; save_catalog i katalog zapisuje prúdově (catalog_stream).
+"""
+
+import os
+
+import numpy as np
+
+from catalog_stream import CatalogWriter
+
+INDEX_TYPES = {np.dtype(np.uint16): 'uint16', np.dtype(np.uint32): 'uint32'}
+
+
+class GeometryPacker:
+    """Skládá geometrie modelů do jednoho binárního bufferu"""
+
+    def __init__(self, file=None):
+        # file: binární soubor, do kterého se bloky zapisují průběžně
+        self._file = file
+        self._chunks = []
+        self._length = 0
+
+    def _append(self, array):
+        offset = self._length
+        data = np.ascontiguousarray(array).tobytes()
+        data += b'\x00' * ((4 - len(data) % 4) % 4)
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._chunks.append(data)
+        self._length += len(data)
+        return offset
+
+    def add(self, vertices, indices, **extra):
+        """
+        Přidá model a vrátí jeho záznam pro catalog.json:
+        vertexOffset/vertexCount, indexOffset/indexCount/indexType, min/max
+        a případné další klíče (např. type).
+        """
+        vertices = np.asarray(vertices, dtype='<f4').reshape(-1, 3)
+        # Jen uint16/uint32 - pohledy Uint16Array/Uint32Array
+        dtype = np.dtype(np.uint32 if len(vertices) > 0xFFFF else np.uint16)
+        indices = np.asarray(indices).ravel().astype(dtype.newbyteorder('<'))
+
+        entry = {
+            'vertexOffset': self._append(vertices),
+            'vertexCount': len(vertices),
+            'indexOffset': self._append(indices),
+            'indexCount': len(indices),
+            'indexType': INDEX_TYPES[dtype],
+        }
+        if len(vertices):
+            entry['min'] = vertices.min(axis=0).tolist()
+            entry['max'] = vertices.max(axis=0).tolist()
+        entry.update(extra)
+        return entry
+
+    def __len__(self):
+        return self._length
+
+    def tobytes(self):
+        if self._file is not None:
+            raise ValueError("Geometrie se zapisuje do souboru, v paměti není")
+        return b''.join(self._chunks)
+
+
+def write_catalog(writer, catalog):
+    """Zapíše slovník katalogu do CatalogWriter (seznamy a slovníky po záznamech)"""
+    for key, value in catalog.items():
+        if isinstance(value, list):
+            writer.section(key)
+            for record in value:
+                writer.add(record)
+        elif isinstance(value, dict) and key != 'geometry':
+            writer.section(key, keyed=True)
+            for k, record in value.items():
+                writer.add(record, key=k)
+        else:
+            writer.value(key, value)
+
+
+def save_catalog(catalog, output_dir, packer, name='catalog', compress=()):
+    """
+    Zapíše output_dir/<name>.json (kompaktní JSON) a output_dir/<name>.bin.
+    Do katalogu doplní odkaz na binární soubor pod klíčem 'geometry'.
+    compress: předkomprimované kopie JSON ('gzip', 'br').
+    Vrací (cesta k JSON, cesta k BIN).
+    """
+    json_path = os.path.join(output_dir, f'{name}.json')
+    bin_path = os.path.join(output_dir, f'{name}.bin')
+
+    # BIN se nahradí až po zapsání JSON, aby offsety vždy odpovídaly
+    bin_tmp = bin_path + '.tmp'
+    with open(bin_tmp, 'wb') as f:
+        f.write(packer.tobytes())
+
+    try:
+        with CatalogWriter(json_path, compress=compress) as writer:
+            write_catalog(writer, catalog)
+            writer.value('geometry', {'url': f'{name}.bin', 'byteLength': len(packer)})
+    except BaseException:
+        os.remove(bin_tmp)
+        raise
+    os.replace(bin_tmp, bin_path)
+
+    return json_path, bin_path
@@ -0,0 +1,193 @@
+"""
+Skladání glTF 2.0 JSON a binárního bufferu.
+
+GltfBuilder přidává buffer views (i prokládané atributy vrcholů),
+accessory, materiály, vložené obrázky, sítě a uzly a hlídá zarovnání dat
+na 4 bajty. Výsledek se ukládá přes save_glb.
+"""
+
+import numpy as np
+
+# glTF componentType
+BYTE = 5120
+UNSIGNED_BYTE = 5121
+SHORT = 5122
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+
+COMPONENT_TYPES = {
+    np.dtype(np.int8): BYTE,
+    np.dtype(np.uint8): UNSIGNED_BYTE,
+    np.dtype(np.int16): SHORT,
+    np.dtype(np.uint16): UNSIGNED_SHORT,
+    np.dtype(np.uint32): UNSIGNED_INT,
+    np.dtype(np.float32): FLOAT,
+}
+
+ACCESSOR_TYPES = {1: 'SCALAR', 2: 'VEC2', 3: 'VEC3', 4: 'VEC4'}
+
+# bufferView target
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+
+DEFAULT_MATERIAL = {
+    "name": "default",
+    "pbrMetallicRoughness": {
+        "baseColorFactor": [0.9, 0.85, 0.75, 1.0],  # Světlé dřevo
+        "metallicFactor": 0.0,
+        "roughnessFactor": 0.7
+    }
+}
+
+
+def pad_to_4(data):
+    """Zarovnání na 4 bajty"""
+    padding = (4 - len(data) % 4) % 4
+    return data + b'\x00' * padding
+
+
+class GltfBuilder:
+    """Postupně skládá glTF dokument s jedním binárním bufferem"""
+
+    def __init__(self, generator="VRML to GLTF Converter"):
+        self.gltf = {
+            "asset": {
+                "version": "2.0",
+                "generator": generator
+            },
+            "scene": 0,
+            "scenes": [{"nodes": []}],
+            "nodes": [],
+            "meshes": [],
+            "materials": [],
+            "accessors": [],
+            "bufferViews": [],
+            "buffers": [],
+        }
+        self._chunks = []
+        self._length = 0
+
+    def add_buffer_view(self, data, target=None, byte_stride=None):
+        """Přidá surová data jako bufferView a vrátí jeho index"""
+        data = pad_to_4(bytes(data))
+        view = {
+            "buffer": 0,
+            "byteOffset": self._length,
+            "byteLength": len(data),
+        }
+        if byte_stride:
+            view["byteStride"] = byte_stride
+        if target:
+            view["target"] = target
+        self._chunks.append(data)
+        self._length += len(data)
+        self.gltf["bufferViews"].append(view)
+        return len(self.gltf["bufferViews"]) - 1
+
+    def add_accessor(self, array, target=None, with_bounds=False, normalized=False):
+        """
+        Přidá NumPy pole (N,) nebo (N, k) jako accessor s vlastním bufferView.
+        Atributy vrcholů, jejichž prvek nemá délku dělitelnou 4 (int16 VEC3,
+        int8 VEC3), se doplní nulami a bufferView dostane byteStride.
+        """
+        array = np.ascontiguousarray(array)
+        stride = None
+        if target == ARRAY_BUFFER and array.ndim == 2 and array.strides[0] % 4:
+            stride = array.strides[0] + (4 - array.strides[0] % 4)
+            padded = np.zeros((len(array), stride // array.itemsize), dtype=array.dtype)
+            padded[:, :array.shape[1]] = array
+            data = padded.tobytes()
+        else:
+            data = array.tobytes()
+        view = self.add_buffer_view(data, target, stride)
+        return self.add_view_accessor(view, array, with_bounds=with_bounds, normalized=normalized)
+
+    def add_interleaved(self, attributes, target=ARRAY_BUFFER, with_bounds=(), normalized=()):
+        """
+        Prokládaný bufferView pro slovník název -> pole (N, k) se stejným N:
+        každý vrchol má všechny atributy za sebou, každý zarovnaný na 4 bajty,
+        a bufferView nese byteStride. with_bounds/normalized jsou názvy
+        atributů. Vrací slovník název -> index accessoru.
+        """
+        arrays = {name: np.ascontiguousarray(a) for name, a in attributes.items()}
+        count = len(next(iter(arrays.values())))
+        offsets = {}
+        stride = 0
+        for name, array in arrays.items():
+            offsets[name] = stride
+            size = array.itemsize * (1 if array.ndim == 1 else array.shape[1])
+            stride += size + (4 - size % 4) % 4
+
+        data = np.zeros((count, stride), dtype=np.uint8)
+        for name, array in arrays.items():
+            raw = array.view(np.uint8).reshape(count, -1)
+            data[:, offsets[name]:offsets[name] + raw.shape[1]] = raw
+        view = self.add_buffer_view(data.tobytes(), target, stride)
+        return {name: self.add_view_accessor(view, array, offsets[name], with_bounds=name in with_bounds,
+                                             normalized=name in normalized)
+                for name, array in arrays.items()}
+
+    def add_image(self, data, mime_type):
+        """Vloží obrázek (JPEG/PNG) do bufferu a vrátí index textury"""
+        view = self.add_buffer_view(data)
+        images = self.gltf.setdefault("images", [])
+        images.append({"bufferView": view, "mimeType": mime_type})
+        textures = self.gltf.setdefault("textures", [])
+        textures.append({"source": len(images) - 1})
+        return len(textures) - 1
+
+    def add_view_accessor(self, view, array, byte_offset=0, with_bounds=False, normalized=False):
+        """Přidá accessor nad existujícím bufferView (např. prokládaným)"""
+        width = 1 if array.ndim == 1 else array.shape[1]
+        accessor = {
+            "bufferView": view,
+            "byteOffset": byte_offset,
+            "componentType": COMPONENT_TYPES[array.dtype],
+            "count": len(array),
+            "type": ACCESSOR_TYPES[width],
+        }
+        if normalized:
+            accessor["normalized"] = True
+        if with_bounds and len(array):
+            accessor["min"] = np.atleast_1d(array.min(axis=0)).tolist()
+            accessor["max"] = np.atleast_1d(array.max(axis=0)).tolist()
+        self.gltf["accessors"].append(accessor)
+        return len(self.gltf["accessors"]) - 1
+
+    def add_material(self, material):
+        self.gltf["materials"].append(material)
+        return len(self.gltf["materials"]) - 1
+
+    def add_mesh(self, primitives, name=None):
+        mesh = {"primitives": primitives}
+        if name:
+            mesh["name"] = name
+        self.gltf["meshes"].append(mesh)
+        return len(self.gltf["meshes"]) - 1
+
+    def add_node(self, node, root=False):
+        self.gltf["nodes"].append(node)
+        index = len(self.gltf["nodes"]) - 1
+        if root:
+            self.gltf["scenes"][0]["nodes"].append(index)
+        return index
+
+    def use_extension(self, name, required=False):
+        used = self.gltf.setdefault("extensionsUsed", [])
+        if name not in used:
+            used.append(name)
+        if required:
+            req = self.gltf.setdefault("extensionsRequired", [])
+            if name not in req:
+                req.append(name)
+
+    def build(self):
+        """Vrátí (gltf JSON, binární buffer)"""
+        buffer_data = b''.join(self._chunks)
+        self.gltf["buffers"] = [{"byteLength": len(buffer_data)}]
+        # Prázdné kolekce glTF nepovoluje
+        for key in ("materials", "meshes", "accessors", "bufferViews"):
+            if not self.gltf[key]:
+                del self.gltf[key]
+        return self.gltf, buffer_data
@@ -0,0 +1,347 @@
+"""
+Vektorové operace nad trojúhelníkovými sítěmi (NumPy).
+
+Sítě jsou dvojice vertices (N, 3) float32 a faces (M, 3) celočíselné.
+"""
+
+import hashlib
+
+import numpy as np
+
+
+def valid_faces_mask(faces, vertex_count):
+    """Maska trojúhelníků, jejichž všechny indexy jsou v rozsahu"""
+    faces = np.asarray(faces)
+    if len(faces) == 0:
+        return np.zeros(0, dtype=bool)
+    return ((faces >= 0) & (faces < vertex_count)).all(axis=1)
+
+
+def face_normals(vertices, faces, unit=True):
+    """Normály trojúhelníků (dávkový vektorový součin), volitelně jednotkové"""
+    tri = vertices[faces]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    if unit:
+        normals = _normalize(normals)
+    return normals
+
+
+def _normalize(vectors):
+    length = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, length, out=np.zeros_like(vectors), where=length > 0)
+
+
+def _scatter_add(index, values, size):
+    """Součet řádků values podle index do pole (size, 3) přes bincount"""
+    return np.stack([np.bincount(index, weights=values[:, c], minlength=size)
+                     for c in range(values.shape[1])], axis=1)
+
+
+def vertex_normals(vertices, faces):
+    """Hladké normály vrcholů: průměr jednotkových normál sousedních trojúhelníků"""
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    fn = face_normals(vertices, faces)
+    normals = _scatter_add(faces.ravel(), np.repeat(fn, 3, axis=0), len(vertices))
+    return _normalize(normals).astype(np.float32)
+
+
+def crease_normals(vertices, faces, crease_angle):
+    """
+    Normály s ohledem na creaseAngle (VRML): v rohu trojúhelníku se průměrují
+    jen normály sousedních trojúhelníků, které od něj svírají úhel menší
+    nebo rovný crease_angle. Vrcholy s více různými normálami se rozdělí.
+
+    Vrací (vertices, faces, normals, source) - source mapuje nové vrcholy
+    na původní indexy.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    n_corners = faces.size
+    fn = face_normals(vertices, faces)
+
+    corner_vertex = faces.ravel()
+    corner_face = np.repeat(np.arange(len(faces)), 3)
+
+    # Rohy seřazené podle vrcholu; každý roh se spáruje se všemi rohy téhož vrcholu
+    order = np.argsort(corner_vertex, kind='stable')
+    sorted_vertex = corner_vertex[order]
+    counts = np.bincount(sorted_vertex, minlength=len(vertices))
+    starts = np.cumsum(counts) - counts
+
+    size = counts[sorted_vertex]
+    pair_first = np.cumsum(size) - size
+    p = np.repeat(np.arange(n_corners), size)
+    q = np.arange(int(size.sum())) - np.repeat(pair_first, size) + np.repeat(starts[sorted_vertex], size)
+
+    face_a = corner_face[order[p]]
+    face_b = corner_face[order[q]]
+    cos_limit = np.cos(crease_angle) - 1e-6
+    smooth = np.einsum('ij,ij->i', fn[face_a], fn[face_b]) >= cos_limit
+
+    sorted_normals = _scatter_add(p[smooth], fn[face_b[smooth]], n_corners)
+    corner_normals = np.empty_like(sorted_normals)
+    corner_normals[order] = sorted_normals
+    corner_normals = _normalize(corner_normals)
+
+    # Rozdělení vrcholů podle (původní vrchol, kvantovaná normála);
+    # normála se zabalí do jednoho int64 (3 x 15 bitů) a třídí se lexsortem
+    q = np.round(corner_normals * 1e4).astype(np.int64) + 16384
+    packed = (q[:, 0] << 30) | (q[:, 1] << 15) | q[:, 2]
+    srt = np.lexsort((packed, corner_vertex))
+    is_new = np.ones(n_corners, dtype=bool)
+    is_new[1:] = (np.diff(corner_vertex[srt]) != 0) | (np.diff(packed[srt]) != 0)
+
+    inverse = np.empty(n_corners, dtype=np.int64)
+    inverse[srt] = np.cumsum(is_new) - 1
+    first = srt[is_new]
+    source = corner_vertex[first]
+
+    return (vertices[source].astype(np.float32),
+            inverse.reshape(-1, 3),
+            corner_normals[first].astype(np.float32),
+            source)
+
+
+def weld_vertices(vertices, faces, attributes=(), tolerance=1e-6, attribute_tolerance=1e-4):
+    """
+    Sloučí duplicitní vrcholy. Klíčem je kvantovaná pozice a kvantované
+    atributy (normály, UV), takže ostré hrany s rozdílnými normálami zůstanou.
+    Vrací (vertices, faces, attributes).
+    """
+    vertices = np.asarray(vertices, dtype=np.float32)
+    if len(vertices) == 0:
+        return vertices, np.asarray(faces), tuple(attributes)
+
+    keys = [np.round(vertices / tolerance).astype(np.int64)]
+    keys += [np.round(np.asarray(a).reshape(len(vertices), -1) / attribute_tolerance).astype(np.int64)
+             for a in attributes]
+    keys = np.ascontiguousarray(np.concatenate(keys, axis=1))
+
+    _, first, remap = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    remap = remap.ravel()
+    return (vertices[first], remap[np.asarray(faces, dtype=np.int64)],
+            tuple(np.asarray(a)[first] for a in attributes))
+
+
+def drop_degenerate(faces, vertices=None, area_epsilon=0.0):
+    """
+    Odstraní degenerované trojúhelníky: opakovaný index a volitelně
+    (pokud jsou zadány vrcholy) nulová plocha.
+    """
+    faces = np.asarray(faces)
+    keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    if vertices is not None and len(faces):
+        area2 = np.linalg.norm(face_normals(np.asarray(vertices, dtype=np.float64), faces, unit=False), axis=1)
+        keep &= area2 > area_epsilon
+    return faces[keep]
+
+
+def compact_vertices(vertices, faces, *attributes):
+    """Odstraní nepoužité vrcholy; atributy (normály, UV) se přeindexují stejně"""
+    used = np.zeros(len(vertices), dtype=bool)
+    used[np.asarray(faces).ravel()] = True
+    if used.all():
+        return (vertices, faces) + attributes
+    new_index = np.cumsum(used) - 1
+    return ((vertices[used], new_index[faces]) +
+            tuple(a[used] for a in attributes))
+
+
+def index_dtype(vertex_count):
+    """Nejmenší typ indexů (uint8/uint16/uint32) pro daný počet vrcholů"""
+    if vertex_count <= 0xFF:
+        return np.uint8
+    if vertex_count <= 0xFFFF:
+        return np.uint16
+    return np.uint32
+
+
+def split_by_vertex_limit(faces, limit=0xFFFF):
+    """
+    Rozdělí trojúhelníky do dávek, z nichž každá používá nejvýše limit
+    vrcholů. Vrací seznam (faces s lokálními indexy, source indexy vrcholů).
+    """
+    faces = np.asarray(faces, dtype=np.int64)
+    parts = []
+    start = 0
+    while start < len(faces):
+        # Dávka max. limit // 3 trojúhelníků má jistě nejvýše limit vrcholů;
+        # pak se rozšiřuje, dokud se vejde
+        end = min(len(faces), start + max(1, limit // 3))
+        step = max(1, limit // 3)
+        while end < len(faces):
+            candidate = min(len(faces), end + step)
+            if len(np.unique(faces[start:candidate])) > limit:
+                if step == 1:
+                    break
+                step //= 2
+                continue
+            end = candidate
+        chunk = faces[start:end]
+        source, local = np.unique(chunk, return_inverse=True)
+        parts.append((local.reshape(-1, 3), source))
+        start = end
+    return parts
+
+
+def quantization_grid(vertices):
+    """
+    Mřížka pro 16bitovou kvantizaci pozic: (offset, scale) se stejným
+    měřítkem ve všech osách, aby dekvantizační matice nezkreslila normály.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+    extent = float((hi - lo).max())
+    scale = extent / (2 * 32767) if extent > 0 else 1.0
+    return (lo + hi) / 2, scale
+
+
+def quantize_positions(vertices, grid):
+    """Pozice do int16 podle mřížky z quantization_grid"""
+    offset, scale = grid
+    q = np.round((np.asarray(vertices, dtype=np.float64) - offset) / scale)
+    return np.clip(q, -32767, 32767).astype(np.int16)
+
+
+def dequantize_matrix(grid):
+    """Matice 4x4, která vrátí int16 pozice do původních souřadnic"""
+    offset, scale = grid
+    m = np.eye(4) * scale
+    m[:3, 3] = offset
+    m[3, 3] = 1.0
+    return m
+
+
+def quantize_normals(normals):
+    """Jednotkové normály do normalizovaných int8"""
+    return np.clip(np.round(np.asarray(normals, dtype=np.float64) * 127), -127, 127).astype(np.int8)
+
+
+def optimize_vertex_cache(faces, vertex_count, cache_size=16):
+    """
+    Přeřadí trojúhelníky pro lepší využití cache vrcholů (Tipsify,
+    Sander et al. 2007): vějíře kolem vrcholu, další vrchol se volí
+    z právě použitých podle toho, zda je ještě v cache.
+    """
+    faces = np.asarray(faces, dtype=np.int64)
+    if len(faces) == 0:
+        return faces
+
+    corner_vertex = faces.ravel()
+    counts = np.bincount(corner_vertex, minlength=vertex_count)
+    starts = np.concatenate([[0], np.cumsum(counts)]).tolist()
+    adjacency = (np.argsort(corner_vertex, kind='stable') // 3).tolist()
+    tri = faces.tolist()
+    live = counts.tolist()
+    cache_time = [0] * vertex_count
+    emitted = [False] * len(tri)
+
+    order = []
+    dead_end = []
+    stamp = cache_size + 1
+    cursor = 0
+    fan = int(corner_vertex[0])
+
+    while fan >= 0:
+        candidates = []
+        for t in adjacency[starts[fan]:starts[fan + 1]]:
+            if emitted[t]:
+                continue
+            emitted[t] = True
+            order.append(t)
+            for v in tri[t]:
+                dead_end.append(v)
+                candidates.append(v)
+                live[v] -= 1
+                if stamp - cache_time[v] > cache_size:
+                    cache_time[v] = stamp
+                    stamp += 1
+
+        # Nejlepší kandidát: vrchol, který v cache vydrží ještě celý vějíř
+        fan = -1
+        best = -1
+        for v in candidates:
+            if live[v] > 0:
+                priority = 0
+                if stamp - cache_time[v] + 2 * live[v] <= cache_size:
+                    priority = stamp - cache_time[v]
+                if priority > best:
+                    best = priority
+                    fan = v
+
+        if fan < 0:
+            # Slepá ulička: naposledy použité vrcholy, pak první nevyčerpaný
+            while dead_end:
+                v = dead_end.pop()
+                if live[v] > 0:
+                    fan = v
+                    break
+            while fan < 0 and cursor < vertex_count:
+                if live[cursor] > 0:
+                    fan = cursor
+                cursor += 1
+
+    return faces[order]
+
+
+def reorder_vertices(faces, vertex_count):
+    """
+    Přečísluje vrcholy v pořadí prvního použití (lokalita načítání).
+    Vrací (faces, order) - order[i] je původní index nového vrcholu i.
+    """
+    flat = np.asarray(faces, dtype=np.int64).ravel()
+    _, first = np.unique(flat, return_index=True)
+    order = flat[np.sort(first)]
+    remap = np.full(vertex_count, -1, dtype=np.int64)
+    remap[order] = np.arange(len(order))
+    return remap[flat].reshape(-1, 3), order
+
+
+def cache_miss_ratio(faces, cache_size=16):
+    """ACMR - průměrný počet výpadků FIFO cache vrcholů na trojúhelník"""
+    flat = np.asarray(faces).ravel().tolist()
+    if not flat:
+        return 0.0
+    cache = []
+    cached = set()
+    misses = 0
+    for v in flat:
+        if v in cached:
+            continue
+        misses += 1
+        cache.append(v)
+        cached.add(v)
+        if len(cache) > cache_size:
+            cached.discard(cache.pop(0))
+    return misses / (len(flat) // 3)
+
+
+def canonical_mesh_hash(vertices, faces, tolerance=1e-5):
+    """
+    Hash geometrie nezávislý na pořadí vrcholů a trojúhelníků: vrcholy se
+    kvantují na mřížku tolerance a seřadí, trojúhelníky se přečíslují,
+    otočí tak, aby začínaly nejmenším indexem (zachová orientaci), a seřadí.
+    Stejný tvar uložený v různých GeoID (jiné DEF názvy, formátování,
+    rozpad na Transform uzly) dá stejný hash.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    if len(vertices) == 0 or len(faces) == 0:
+        return None
+
+    q = np.round(vertices / tolerance).astype(np.int64)
+    # Shodné kvantované vrcholy splynou
+    unique, remap = np.unique(q, axis=0, return_inverse=True)
+    f = remap.ravel()[faces]
+    f = f[(f[:, 0] != f[:, 1]) & (f[:, 1] != f[:, 2]) & (f[:, 0] != f[:, 2])]
+
+    # Rotace trojúhelníku na nejmenší index napřed
+    shift = np.argmin(f, axis=1)
+    f = f[np.arange(len(f))[:, None], (shift[:, None] + np.arange(3)) % 3]
+    f = f[np.lexsort(f.T[::-1])]
+
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(unique).tobytes())
+    h.update(np.ascontiguousarray(f).tobytes())
+    return h.hexdigest()
@@ -0,0 +1,121 @@
+"""
+Předpočítaná data pro umísťování skříněk.
+
+Z geometrie modelu (lokální souřadnice, metry, Y nahoru) se jednou při
+exportu spočítá vše, co placement systém ve frontendu jinak zjišťuje za
+běhu: těsný AABB, půdorys (konvexní obal průmětu do roviny XZ), stěnu
+AABB, která přiléhá ke zdi, a pojmenované body pro přichytávání. Šířka
+modelu leží v ose X a hloubka v ose Z, takže zeď je na -z nebo +z.
+Přetahování a kontrola kolizí jsou pak jen vyhledání v katalogu.
+"""
+
+import numpy as np
+
+from mesh_ops import face_normals
+
+# Stěny AABB kolmé na hloubku: název -> (osa, strana)
+WALL_FACES = {'-z': (2, -1), '+z': (2, 1)}
+# Bez geometrie na žádné stěně: frontend staví skříňku zády na z = min
+DEFAULT_WALL_FACE = '-z'
+# Zaokrouhlení souřadnic v katalogu (0,01 mm)
+DECIMALS = 5
+
+
+def _rounded(values):
+    return np.round(np.asarray(values, dtype=np.float64), DECIMALS).tolist()
+
+
+def footprint_polygon(vertices):
+    """Konvexní obal průmětu vrcholů do XZ proti směru hodinových ručiček (monotone chain)"""
+    points = np.unique(np.round(np.asarray(vertices, dtype=np.float64)[:, [0, 2]], DECIMALS + 1), axis=0)
+    if len(points) < 3:
+        return points
+
+    def turn(o, a, b):
+        # Skalární 2D vektorový součin (np.cross pro 2D vektory je zastaralý)
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    def half(pts):
+        hull = []
+        for p in pts:
+            while len(hull) >= 2 and turn(hull[-2], hull[-1], p) <= 0:
+                hull.pop()
+            hull.append(p)
+        return hull[:-1]
+
+    return np.array(half(points) + half(points[::-1]))
+
+
+def wall_face(vertices, faces, lo, hi, tolerance=1e-3):
+    """
+    Stěna AABB (-z/+z) s větší plochou trojúhelníků, které v ní leží
+    (záda skříňky). Vrací (název stěny, pokrytí 0..1).
+    """
+    if faces is None or not len(faces):
+        return DEFAULT_WALL_FACE, 0.0
+    tri = vertices[faces]
+    area = np.linalg.norm(face_normals(vertices, faces, unit=False), axis=1) / 2
+    size = hi - lo
+
+    best, best_coverage = DEFAULT_WALL_FACE, 0.0
+    for name, (axis, side) in WALL_FACES.items():
+        plane = hi[axis] if side > 0 else lo[axis]
+        on_plane = (np.abs(tri[:, :, axis] - plane) <= tolerance).all(axis=1)
+        face_area = size[0] * size[1]
+        coverage = float(area[on_plane].sum() / face_area) if face_area > 0 else 0.0
+        if coverage > best_coverage + 1e-9:
+            best, best_coverage = name, coverage
+    return best, min(best_coverage, 1.0)
+
+
+def snap_anchors(lo, hi, face):
+    """
+    Pojmenované body pro přichytávání: rohy půdorysu u zdi (back*) a vpředu
+    (front*), horní rohy u zdi (top*) a střed půdorysu. Levá/pravá platí při
+    pohledu na čelo skříňky (směrem ke zdi).
+    """
+    axis, side = WALL_FACES[face]
+    forward = np.zeros(3)
+    forward[axis] = side
+    right = np.cross(forward, [0.0, 1.0, 0.0])
+    center = (lo + hi) / 2
+    half = (hi - lo) / 2
+
+    def point(depth, lateral, height):
+        p = center + forward * half * depth + right * half * lateral
+        p[1] = hi[1] if height else lo[1]
+        return p
+
+    anchors = {
+        'backLeft': point(1, -1, False),
+        'backRight': point(1, 1, False),
+        'frontLeft': point(-1, -1, False),
+        'frontRight': point(-1, 1, False),
+        'topLeft': point(1, -1, True),
+        'topRight': point(1, 1, True),
+        'center': point(0, 0, False),
+    }
+    return {name: _rounded(p) for name, p in anchors.items()}
+
+
+def placement_metadata(vertices, faces=None, tolerance=1e-3):
+    """
+    Metadata pro umístění modelu: {'aabb': {'min', 'max'}, 'size', 'footprint',
+    'wall': {'face', 'coverage'}, 'anchors'}. Prázdná geometrie vrací None.
+    """
+    if vertices is None:
+        return None
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    if not len(vertices):
+        return None
+    if faces is not None:
+        faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+    face, coverage = wall_face(vertices, faces, lo, hi, tolerance)
+    return {
+        'aabb': {'min': _rounded(lo), 'max': _rounded(hi)},
+        'size': _rounded(hi - lo),
+        'footprint': _rounded(footprint_polygon(vertices)),
+        'wall': {'face': face, 'coverage': round(coverage, 3)},
+        'anchors': snap_anchors(lo, hi, face),
+    }
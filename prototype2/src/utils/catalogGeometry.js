@@ -0,0 +1,57 @@
+import * as THREE from 'three'
+
+/**
+ * Geometrie katalogu z binarniho sidecaru (catalog.bin, viz geometry_pack.py)
+ * Zaznam v catalog.models obsahuje jen offsety, pocty a bounding box -
+ * typed-array pohledy se vytvori nad jednim ArrayBufferem bez kopirovani
+ */
+
+const INDEX_ARRAYS = { uint16: Uint16Array, uint32: Uint32Array }
+
+/**
+ * Nacte catalog.bin jako ArrayBuffer (url z catalog.geometry.url)
+ */
+export async function loadCatalogGeometry(url) {
+  const response = await fetch(url)
+  if (!response.ok) {
+    throw new Error(`Nelze nacist geometrii katalogu (${response.status})`)
+  }
+  return response.arrayBuffer()
+}
+
+/**
+ * Pohledy na vrcholy a indexy jednoho modelu
+ */
+export function modelArrays(buffer, model) {
+  return {
+    positions: new Float32Array(buffer, model.vertexOffset, model.vertexCount * 3),
+    indices: new INDEX_ARRAYS[model.indexType](buffer, model.indexOffset, model.indexCount)
+  }
+}
+
+/**
+ * THREE.BufferGeometry nad pohledy modelu (bounding box ze zaznamu, bez pruchodu vrcholu)
+ */
+export function createModelGeometry(buffer, model) {
+  const { positions, indices } = modelArrays(buffer, model)
+  const geometry = new THREE.BufferGeometry()
+  geometry.setAttribute('position', new THREE.BufferAttribute(positions, 3))
+  geometry.setIndex(new THREE.BufferAttribute(indices, 1))
+  if (model.min && model.max) {
+    geometry.boundingBox = new THREE.Box3(
+      new THREE.Vector3(...model.min),
+      new THREE.Vector3(...model.max)
+    )
+  }
+  geometry.computeVertexNormals()
+  return geometry
+}
+
+/**
+ * Predpocitana data pro umistovani (placement.py): aabb, size, footprint,
+ * wall { face, coverage } a anchors - pro zadanou sirku nebo vychozi model
+ */
+export function modelPlacement(models, cabinet, widthMm) {
+  const key = (widthMm != null && cabinet.width_models?.[String(widthMm)]) || cabinet.model_key
+  return models?.[key]?.placement ?? null
+}
@@ -0,0 +1,91 @@
+import { loadCatalogGeometry } from './catalogGeometry'
+
+/**
+ * CatalogLoader - postupne nacitani rozdeleneho katalogu (catalog_shards.py)
+ * Nejdriv maly index.json, shardy znacky/skupiny a geometrie az pri pouziti.
+ * Shardy maji hash v nazvu, takze je prohlizec muze cachovat natrvalo.
+ */
+export class CatalogLoader {
+  constructor(baseUrl = '/catalog/') {
+    this.baseUrl = baseUrl
+    this.indexPromise = null
+    this.shards = new Map()  // url -> Promise shardu
+    this.geometry = new Map()  // url -> Promise ArrayBufferu
+  }
+
+  async fetchJson(url) {
+    const response = await fetch(url)
+    if (!response.ok) {
+      throw new Error(`Nelze nacist ${url} (${response.status})`)
+    }
+    return response.json()
+  }
+
+  /**
+   * Korenovy index: znacky, skupiny, pocty a URL shardu
+   */
+  index() {
+    if (!this.indexPromise) {
+      this.indexPromise = this.fetchJson(`${this.baseUrl}index.json`)
+    }
+    return this.indexPromise
+  }
+
+  async findBrand(brand) {
+    const index = await this.index()
+    const entry = index.brands.find(b => b.id === brand || b.name === brand)
+    if (!entry) {
+      throw new Error(`Znacka ${brand} neni v katalogu`)
+    }
+    return entry
+  }
+
+  loadShard(url) {
+    if (!this.shards.has(url)) {
+      this.shards.set(url, this.fetchJson(url))
+    }
+    return this.shards.get(url)
+  }
+
+  loadGeometry(url) {
+    if (!this.geometry.has(url)) {
+      this.geometry.set(url, loadCatalogGeometry(url))
+    }
+    return this.geometry.get(url)
+  }
+
+  /**
+   * Nacte jednu skupinu znacky - { cabinets, models }
+   */
+  async loadGroup(brand, groupName) {
+    const entry = await this.findBrand(brand)
+    const group = entry.groups.find(g => g.name === groupName)
+    if (!group) {
+      throw new Error(`Skupina ${groupName} neni ve znacce ${entry.name}`)
+    }
+    const shard = await this.loadShard(group.url)
+    return { cabinets: shard.cabinets, models: shard.models }
+  }
+
+  /**
+   * Nacte celou znacku ve tvaru { brands, cabinets, models } pro setCatalog
+   * withGeometry: nacte i binarni geometrii znacky (catalog.geometryBuffer)
+   */
+  async loadBrand(brand, { withGeometry = false } = {}) {
+    const entry = await this.findBrand(brand)
+    const shards = await Promise.all(entry.groups.map(g => this.loadShard(g.url)))
+
+    const { groups, count, geometry, ...brandInfo } = entry
+    const catalog = {
+      brands: [brandInfo],
+      cabinets: shards.flatMap(s => s.cabinets),
+      models: Object.assign({}, ...shards.map(s => s.models))
+    }
+    if (withGeometry) {
+      catalog.geometryBuffer = await this.loadGeometry(geometry.url)
+    }
+    return catalog
+  }
+}
+
+export const catalogLoader = new CatalogLoader()
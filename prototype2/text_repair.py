@@ -0,0 +1,108 @@
+"""
+Kompilovaná oprava textů z databáze.
+
+Seznam pravidel (old, new) aplikovaných postupně přes str.replace se
+jednou přeloží na několik vrstev. Ve vrstvě jsou jen pravidla, která se
+navzájem neovlivní - jejich vzory se nepřekrývají a výstup dřívějšího
+pravidla nemůže vytvořit výskyt pozdějšího - takže jeden průchod regexem
+s alternací všech vzorů vrstvy dá stejný výsledek jako postupné nahrazování.
+"""
+
+import re
+
+
+def _overlaps(a, b):
+    """True, pokud se a a b mohou v nějakém textu překrývat (alespoň jedním znakem)"""
+    for shift in range(-len(b) + 1, len(a)):
+        start = max(0, shift)
+        end = min(len(a), shift + len(b))
+        if a[start:end] == b[start - shift:end - shift]:
+            return True
+    return False
+
+
+def _conflicts(earlier, later):
+    """Mohou se dvě pravidla (v tomto pořadí) ovlivnit?"""
+    old_a, new_a = earlier
+    old_b, _ = later
+    # Překryv vzorů: postupně vyhraje dřívější pravidlo, v alternaci to nejlevější
+    if _overlaps(old_a, old_b):
+        return True
+    # Výstup dřívějšího pravidla (i se sousedním textem) může tvořit pozdější vzor
+    if new_a and _overlaps(new_a, old_b):
+        return True
+    # Smazání spojí sousední znaky
+    return not new_a and len(old_b) > 1
+
+
+def trie_pattern(words):
+    """
+    Regex pro alternaci řetězců složený podle prefixového stromu,
+    např. ['skY', 'skYn', 'spot'] -> 's(?:kY(?:n)?|pot)'. Modul re nemá
+    Aho-Corasick, ale se sdílenými prefixy zkouší každou pozici jen jednou.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = True
+
+    def build(node):
+        end = '' in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            return ('(?:' + body + ')?') if len(branches) == 1 else body + '?'
+        return body
+
+    return build(trie)
+
+
+class TextRepairEngine:
+    """Postupná náhrada pravidel zkompilovaná do vrstev s jedním regexem"""
+
+    def __init__(self, rules):
+        self.layers = []
+        layer = []
+        for old, new in rules:
+            if not old or old == new:
+                continue
+            if any(_conflicts(rule, (old, new)) for rule in layer):
+                self.layers.append(layer)
+                layer = []
+            layer.append((old, new))
+        if layer:
+            self.layers.append(layer)
+
+        self._compiled = []
+        for layer in self.layers:
+            mapping = dict(layer)
+            if all(len(old) == 1 for old in mapping):
+                # Jen jednotlivé znaky - str.translate je rychlejší než regex
+                self._compiled.append((None, str.maketrans(mapping)))
+                continue
+            # Vzory ve vrstvě se nepřekrývají (žádný není prefixem jiného),
+            # takže prefixový strom nemění, který vzor se najde
+            pattern = re.compile(trie_pattern(mapping))
+            self._compiled.append((pattern, mapping))
+
+        # Když v textu není žádný vzor, žádná vrstva nic nezmění (nemá z čeho
+        # vytvořit vzor další vrstvy) - jeden průchod stačí na čisté texty
+        olds = {old for layer in self.layers for old, _ in layer}
+        self._any = re.compile(trie_pattern(olds)) if olds else None
+
+    def __call__(self, text):
+        if self._any is None or not self._any.search(text):
+            return text
+        for pattern, mapping in self._compiled:
+            if pattern is None:
+                text = text.translate(mapping)
+            else:
+                text = pattern.sub(lambda m: mapping[m.group()], text)
+        return text
+
+    def __len__(self):
+        return sum(len(layer) for layer in self.layers)
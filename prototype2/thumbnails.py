@@ -0,0 +1,367 @@
+"""
+Náhledy skříněk pro katalog (offline, jen CPU)
+==============================================
+Izometrický pohled na síť vykreslený vektorovým z-bufferem v NumPy:
+barycentrické souřadnice a hloubka jsou lineární funkce pixelu, takže se
+pro každý trojúhelník vyhodnotí nad jeho obdélníkem (velké trojúhelníky
+po jednom, malé hromadně) a pro každý pixel vyhraje nejbližší hloubka. Stínování je Lambertovo (oboustranné) s jedním světlem, hrany se
+vyhladí supersamplingem. PNG se kóduje přes zlib, WebP přes Pillow (volitelně).
+
+Náhledy se ukládají do cache pod hashem geometrie a parametrů vykreslení,
+takže stejná síť (i pod více klíči modelu) se vykreslí jen jednou a při
+dalším běhu se nevykresluje vůbec. thumbnails.json mapuje klíč modelu na
+soubor náhledu.
+
+Spuštění:
+    python thumbnails.py --catalog src/data/catalog.json --output public/thumbnails
+    python thumbnails.py --vrml ../export/vrml --output public/thumbnails --format webp
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+from mesh_ops import face_normals
+from placement import placement_metadata
+
+# Zvyš při změně vzhledu náhledů - zneplatní cache
+RENDER_VERSION = 1
+INDEX_NAME = "thumbnails.json"
+FORMATS = ('png', 'webp')
+
+DEFAULT_SIZE = 128
+SUPERSAMPLE = 2
+MARGIN = 0.06
+# Nejvíce dvojic (trojúhelník, pixel) zpracovaných najednou - omezuje paměť
+MAX_FRAGMENTS = 2_000_000
+# Trojúhelníky s větším obdélníkem (v pixelech) se kreslí jednotlivě
+LARGE_TRIANGLE = 1024
+
+BASE_COLOR = np.array([0.84, 0.76, 0.64])
+AMBIENT = 0.35
+# Izometrie: kamera zepředu-zprava-shora, světlo trochu vlevo nad ní
+VIEW_DIRECTION = np.array([1.0, 1.0, -1.0]) / np.sqrt(3.0)
+LIGHT_DIRECTION = np.array([0.4, 1.0, -0.7]) / np.linalg.norm([0.4, 1.0, -0.7])
+
+_CACHED_FILE = re.compile(r'^[0-9a-f]{16}\.(png|webp)$')
+
+
+def view_basis(front_sign=-1):
+    """
+    Ortonormální báze kamery (right, up, forward). front_sign je strana osy Z,
+    na které je čelo skříňky (-1 = z min), kamera se dívá na čelo.
+    """
+    eye = VIEW_DIRECTION * np.array([1.0, 1.0, -front_sign])
+    forward = -eye
+    right = np.cross(forward, [0.0, 1.0, 0.0])
+    right /= np.linalg.norm(right)
+    up = np.cross(right, forward)
+    return right, up, forward
+
+
+def _project(vertices, size, front_sign):
+    """Vrcholy -> (x, y) v pixelech (y dolů) a hloubka; síť se vejde do obrázku"""
+    right, up, forward = view_basis(front_sign)
+    screen = np.column_stack([vertices @ right, vertices @ up])
+    depth = vertices @ forward
+    lo, hi = screen.min(axis=0), screen.max(axis=0)
+    extent = max(float((hi - lo).max()), 1e-9)
+    scale = size * (1 - 2 * MARGIN) / extent
+    center = (lo + hi) / 2
+    x = (screen[:, 0] - center[0]) * scale + size / 2
+    y = (center[1] - screen[:, 1]) * scale + size / 2
+    return np.column_stack([x, y]), depth
+
+
+def _shade(vertices, faces, front_sign):
+    """Barva RGB každého trojúhelníku (oboustranný Lambert)"""
+    light = LIGHT_DIRECTION * np.array([1.0, 1.0, -front_sign])
+    lambert = np.abs(face_normals(vertices, faces) @ light)
+    return BASE_COLOR[None, :] * (AMBIENT + (1 - AMBIENT) * lambert)[:, None]
+
+
+def _edge_coefficients(points, depth, faces):
+    """
+    Barycentrické souřadnice w0, w1 a hloubka jako lineární funkce pixelu:
+    hodnota = A * x + B * y + C. Vrací (F, 3, 3) [w0, w1, z] x [A, B, C]
+    a masku nedegenerovaných trojúhelníků.
+    """
+    a, b, c = points[faces[:, 0]], points[faces[:, 1]], points[faces[:, 2]]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+    valid = np.abs(area) > 1e-12
+    # Znaménko plochy normalizuje orientaci -> oboustranné trojúhelníky
+    inv = np.divide(1.0, area, out=np.zeros_like(area), where=valid)
+    w0 = np.column_stack([b[:, 1] - c[:, 1], c[:, 0] - b[:, 0], b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0]]) * inv[:, None]
+    w1 = np.column_stack([c[:, 1] - a[:, 1], a[:, 0] - c[:, 0], c[:, 0] * a[:, 1] - c[:, 1] * a[:, 0]]) * inv[:, None]
+    zs = depth[faces]
+    z = w0 * (zs[:, 0] - zs[:, 2])[:, None] + w1 * (zs[:, 1] - zs[:, 2])[:, None]
+    z[:, 2] += zs[:, 2]
+    return np.stack([w0, w1, z], axis=1), valid
+
+
+def rasterize(points, depth, faces, size):
+    """
+    Z-buffer: vrací (index trojúhelníku na pixel nebo -1) jako pole (size, size).
+    Velké trojúhelníky se kreslí po jednom nad svým obdélníkem (bez indexace
+    fragmentů), malé hromadně po dávkách do MAX_FRAGMENTS fragmentů.
+    """
+    zbuffer = np.full((size, size), np.inf)
+    owner = np.full((size, size), -1, dtype=np.int64)
+
+    coef, valid = _edge_coefficients(points, depth, faces)
+    tri = points[faces]
+    lo = np.clip(np.floor(tri.min(axis=1)).astype(np.int64), 0, size - 1)
+    hi = np.clip(np.ceil(tri.max(axis=1)).astype(np.int64), 0, size - 1)
+    counts = np.where(valid, (hi[:, 0] - lo[:, 0] + 1) * (hi[:, 1] - lo[:, 1] + 1), 0)
+
+    def inside(w0, w1):
+        return (w0 >= -1e-9) & (w1 >= -1e-9) & (w0 + w1 <= 1 + 1e-9)
+
+    for t in np.flatnonzero(counts > LARGE_TRIANGLE):
+        (x0, y0), (x1, y1) = lo[t], hi[t]
+        x = np.arange(x0, x1 + 1) + 0.5
+        y = np.arange(y0, y1 + 1)[:, None] + 0.5
+        w0, w1, z = (k[0] * x + k[1] * y + k[2] for k in coef[t])
+        zb = zbuffer[y0:y1 + 1, x0:x1 + 1]
+        closer = inside(w0, w1) & (z < zb)
+        zb[closer] = z[closer]
+        owner[y0:y1 + 1, x0:x1 + 1][closer] = t
+
+    small = np.flatnonzero((counts > 0) & (counts <= LARGE_TRIANGLE))
+    zflat, oflat = zbuffer.reshape(-1), owner.reshape(-1)
+    # Průběžný součet fragmentů se spočítá jednou, dávky se hledají od posunu
+    total = np.cumsum(counts[small])
+    start = 0
+    while start < len(small):
+        # Dávka s nejvýše MAX_FRAGMENTS fragmenty
+        done = total[start - 1] if start else 0
+        end = max(start + 1, int(np.searchsorted(total, done + MAX_FRAGMENTS, side='right')))
+        index = small[start:end]
+        n = counts[index]
+        t = np.repeat(index, n)
+        offset = np.arange(n.sum()) - np.repeat(np.cumsum(n) - n, n)
+        width = hi[t, 0] - lo[t, 0] + 1
+        px = lo[t, 0] + offset % width
+        py = lo[t, 1] + offset // width
+        k = coef[t]
+        cx, cy = px + 0.5, py + 0.5
+        w0 = k[:, 0, 0] * cx + k[:, 0, 1] * cy + k[:, 0, 2]
+        w1 = k[:, 1, 0] * cx + k[:, 1, 1] * cy + k[:, 1, 2]
+        keep = inside(w0, w1)
+        t, k, pixel = t[keep], k[keep], (py * size + px)[keep]
+        z = k[:, 2, 0] * cx[keep] + k[:, 2, 1] * cy[keep] + k[:, 2, 2]
+
+        # Nejbližší hloubka na pixel (ufunc.at bez řazení), vlastníkem je fragment s touto hloubkou
+        np.minimum.at(zflat, pixel, z)
+        nearest = z == zflat[pixel]
+        oflat[pixel[nearest]] = t[nearest]
+        start = end
+
+    return owner
+
+
+def render_mesh(vertices, faces, size=DEFAULT_SIZE, supersample=SUPERSAMPLE):
+    """Izometrický náhled sítě jako RGBA uint8 (size, size, 4), pozadí průhledné"""
+    vertices = np.asarray(vertices, dtype=np.float64).reshape(-1, 3)
+    faces = np.asarray(faces, dtype=np.int64).reshape(-1, 3)
+    image = np.zeros((size, size, 4), dtype=np.uint8)
+    if not len(faces):
+        return image
+
+    # Čelo je na straně osy Z odvrácené od zdi (placement.wall_face)
+    wall = placement_metadata(vertices, faces)['wall']['face']
+    front_sign = 1 if wall == '-z' else -1
+
+    full = size * supersample
+    points, depth = _project(vertices, full, front_sign)
+    owner = rasterize(points, depth, faces, full)
+    colors = _shade(vertices, faces, front_sign)
+
+    rgba = np.zeros((full, full, 4))
+    covered = owner >= 0
+    rgba[covered, :3] = colors[owner[covered]]
+    rgba[covered, 3] = 1.0
+    # Supersampling: průměr bloků; barva vážená krytím, aby okraj neztmavl
+    blocks = rgba.reshape(size, supersample, size, supersample, 4).mean(axis=(1, 3))
+    alpha = blocks[..., 3:]
+    color = np.divide(blocks[..., :3], alpha, out=np.zeros_like(blocks[..., :3]), where=alpha > 0)
+    image[..., :3] = np.round(np.clip(color, 0, 1) * 255)
+    image[..., 3] = np.round(alpha[..., 0] * 255)
+    return image
+
+
+def encode_png(rgba):
+    """RGBA uint8 -> PNG bajty (zlib, bez závislostí)"""
+    height, width, _ = rgba.shape
+    # Každý řádek začíná typem filtru 0 (None)
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, -1)], axis=1)
+
+    def chunk(tag, data):
+        return struct.pack('>I', len(data)) + tag + data + struct.pack('>I', zlib.crc32(tag + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+            chunk(b'IDAT', zlib.compress(raw.tobytes(), 9)) + chunk(b'IEND', b''))
+
+
+def encode_image(rgba, fmt):
+    if fmt == 'png':
+        return encode_png(rgba)
+    if Image is None:
+        raise RuntimeError("Formát webp vyžaduje Pillow (pip install pillow)")
+    from io import BytesIO
+    buffer = BytesIO()
+    Image.fromarray(rgba, 'RGBA').save(buffer, 'WEBP', quality=85, method=6)
+    return buffer.getvalue()
+
+
+def geometry_hash(vertices, faces, size, fmt):
+    """Klíč cache: geometrie (float32/uint32) + parametry vykreslení"""
+    h = hashlib.sha256(f"{RENDER_VERSION}:{size}:{SUPERSAMPLE}:{fmt}".encode())
+    h.update(np.ascontiguousarray(vertices, dtype=np.float32).tobytes())
+    h.update(np.ascontiguousarray(faces, dtype=np.uint32).tobytes())
+    return h.hexdigest()[:16]
+
+
+def _render_file(vertices, faces, path, size, fmt):
+    """Pracovní proces: vykreslí a zapíše jeden náhled"""
+    data = encode_image(render_mesh(vertices, faces, size), fmt)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def render_thumbnails(meshes, output_dir, size=DEFAULT_SIZE, fmt='png', workers=None, base_url=''):
+    """
+    Náhledy pro slovník klíč modelu -> (vertices, faces) do output_dir.
+    Vykreslí se jen geometrie, jejichž soubor v cache chybí; nepoužité
+    soubory cache se smažou. Zapíše thumbnails.json a vrací statistiku.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Neznámý formát náhledu: {fmt}")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    index = {}
+    todo = {}
+    for key, (vertices, faces) in meshes.items():
+        name = f"{geometry_hash(vertices, faces, size, fmt)}.{fmt}"
+        index[str(key)] = base_url + name
+        if name not in todo and not (output_dir / name).exists():
+            todo[name] = (vertices, faces)
+
+    workers = workers or os.cpu_count() or 1
+    jobs = [(v, f, str(output_dir / name), size, fmt) for name, (v, f) in todo.items()]
+    if workers == 1 or len(jobs) <= 1:
+        sizes = [_render_file(*job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            sizes = list(pool.map(_render_file, *zip(*jobs), chunksize=max(1, len(jobs) // (workers * 4))))
+
+    live = {url[len(base_url):] for url in index.values()}
+    removed = 0
+    for path in output_dir.iterdir():
+        if _CACHED_FILE.match(path.name) and path.name not in live:
+            path.unlink()
+            removed += 1
+
+    with open(output_dir / INDEX_NAME, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'), ensure_ascii=False, sort_keys=True)
+
+    return {
+        'models': len(index),
+        'unique': len(live),
+        'rendered': len(jobs),
+        'cached': len(live) - len(jobs),
+        'removed': removed,
+        'bytes': sum(sizes),
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def catalog_meshes(catalog_path):
+    """Parametrické sítě (cabinet_mesh) pro všechny šířky skříněk z catalog.json"""
+    from cabinet_geometry import variant_meshes
+
+    with open(catalog_path, 'r', encoding='utf-8') as f:
+        catalog = json.load(f)
+    keys = {}
+    for cab in catalog['cabinets']:
+        for w in [cab['width']] + cab.get('widths', []):
+            params = (cab['type'], w, cab['height'], cab['depth'])
+            keys[f"{params[0]}_{w}_{params[2]}_{params[3]}"] = params
+    meshes = variant_meshes(list(keys.values()))
+    return {key: (meshes[p]['vertices'], meshes[p]['indices']) for key, p in keys.items()}
+
+
+def vrml_meshes(vrml_dir):
+    """Sítě ve světových souřadnicích z .wrl souborů (stejná geometrie jako GLB)"""
+    from vrml_parser import parse_vrml, VrmlSyntaxError
+    from vrml_scene import build_scene
+    from convert_vrml_to_gltf import model_name
+
+    meshes = {}
+    for path in sorted(Path(vrml_dir).glob('*.wrl')):
+        try:
+            vertices, faces = build_scene(parse_vrml(path)).flatten()
+        except VrmlSyntaxError as e:
+            print(f"  {path.name}: {e}")
+            continue
+        except Exception as e:
+            # Jeden neobvyklý soubor nesmí zastavit celý běh
+            print(f"  {path.name}: VRML nelze zpracovat ({type(e).__name__}: {e})")
+            continue
+        if vertices is not None:
+            meshes[model_name(path)] = (vertices, faces)
+    return meshes
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent
+
+    parser = argparse.ArgumentParser(description="Izometrické náhledy modelů (NumPy z-buffer)")
+    parser.add_argument('--catalog', type=Path, default=None, help="catalog.json - parametrické skříňky")
+    parser.add_argument('--vrml', type=Path, default=None, help="adresář s .wrl modely")
+    parser.add_argument('--output', type=Path, default=base_dir / "public" / "thumbnails",
+                        help="výstupní adresář (cache náhledů + thumbnails.json)")
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help="strana náhledu v pixelech")
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--workers', type=int, default=None, help="počet procesů (výchozí: počet jader)")
+    parser.add_argument('--base-url', default='/thumbnails/', help="předpona URL v thumbnails.json")
+    args = parser.parse_args()
+
+    meshes = {}
+    if args.catalog:
+        meshes.update(catalog_meshes(args.catalog))
+    if args.vrml:
+        meshes.update(vrml_meshes(args.vrml))
+    if not meshes:
+        print("Zadej --catalog nebo --vrml")
+        sys.exit(1)
+
+    stats = render_thumbnails(meshes, args.output, args.size, args.format, args.workers, args.base_url)
+    print(f"Modelů: {stats['models']}, unikátních náhledů: {stats['unique']}"
+          f" (vykresleno {stats['rendered']}, z cache {stats['cached']}, smazáno {stats['removed']})")
+    print(f"{stats['seconds']:.2f} s, {stats['bytes']} B -> {args.output / INDEX_NAME}")
+
+
+if __name__ == '__main__':
+    main()
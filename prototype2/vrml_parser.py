@@ -0,0 +1,538 @@
+"""
+Inkrementální parser VRML97 (VRML V2.0 utf8).
+
+Soubor se čte po blocích (ze souboru, z paměti nebo z dekomprimovaného
+zlib proudu Grafika). Struktura scény se tokenizuje, ale číselná pole
+(`point [...]`, `coordIndex [...]`, ...) se dekódují najednou přímo do
+NumPy polí bez mezikroku přes Python seznamy.
+
+Soubor zadaný cestou se namapuje do paměti (mmap) a tokenizer pracuje
+přímo nad ním - bez čtení po blocích, dekódování celého textu a kopií.
+Na text se převádí jen slova a řetězce (DEF jména, typy uzlů, url)
+kódováním zjištěným z ne-ASCII bajtů; komentáře se jen přeskakují.
+"""
+
+import mmap
+import os
+import re
+import zlib
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 20
+
+# Bílé znaky, čárky a komentáře se ve VRML přeskakují
+_SKIP = re.compile(rb'(?:[\s,]+|#[^\n\r]*)*')
+_TOKEN = re.compile(rb'''
+    (?P<punct>[{}\[\]])
+  | (?P<string>"(?:[^"\\]|\\.)*")
+  | (?P<word>[^\s,{}\[\]"\#]+)
+    ''', re.X | re.S)
+_COMMENT = re.compile(rb'#[^\n\r]*')
+_NUMBER_START = frozenset(b'0123456789+-.')
+_NUMBER_START_CHARS = frozenset('0123456789+-.')
+
+# Kódování textu, který není platné UTF-8 (české exporty z Windows)
+FALLBACK_ENCODING = 'cp1250'
+
+PUNCT, STRING, WORD = 'punct', 'string', 'word'
+
+
+class VrmlSyntaxError(ValueError):
+    """Chyba syntaxe ve VRML souboru"""
+
+
+class VrmlNode:
+    """Uzel scény: typ, volitelné DEF jméno a pole (název -> hodnota)"""
+
+    __slots__ = ('type', 'name', 'fields')
+
+    def __init__(self, node_type, name=None):
+        self.type = node_type
+        self.name = name
+        self.fields = {}
+
+    def get(self, field, default=None):
+        return self.fields.get(field, default)
+
+    def __repr__(self):
+        name = f" DEF {self.name}" if self.name else ''
+        return f"<VrmlNode {self.type}{name}>"
+
+
+def _is_number(word):
+    return word[0] in _NUMBER_START_CHARS
+
+
+def _iter_file_chunks(f, chunk_size):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_zlib_chunks(data, header_size=4, chunk_size=CHUNK_SIZE):
+    """Dekomprimuje zlib blob (např. GeoObjekt.Grafika) po blocích"""
+    d = zlib.decompressobj()
+    view = memoryview(data)[header_size:]
+    for start in range(0, len(view), chunk_size):
+        out = d.decompress(view[start:start + chunk_size])
+        if out:
+            yield out
+    tail = d.flush()
+    if tail:
+        yield tail
+
+
+def detect_encoding(data, fallback=FALLBACK_ENCODING):
+    """
+    Kódování VRML dat: 'utf-8', pokud jsou všechny ne-ASCII sekvence platné
+    UTF-8 (i čisté ASCII), jinak fallback. Dekódují se jen ne-ASCII úseky.
+    """
+    # Pohled bez kopie (i nad mmap); čisté ASCII pozná jediné maximum
+    view = np.frombuffer(data, dtype=np.uint8)
+    if not len(view) or view.max() < 0x80:
+        return 'utf-8'
+    high = np.flatnonzero(view >= 0x80)
+    breaks = np.flatnonzero(np.diff(high) != 1)
+    starts = high[np.r_[0, breaks + 1]]
+    ends = high[np.r_[breaks, len(high) - 1]] + 1
+    try:
+        b' '.join(bytes(data[start:end]) for start, end in zip(starts, ends)).decode('utf-8')
+    except UnicodeDecodeError:
+        return fallback
+    return 'utf-8'
+
+
+def _iter_source_chunks(source, chunk_size):
+    """Převede zdroj (text, bajty, mmap, soubor, iterátor bloků) na bloky bajtů"""
+    if isinstance(source, str):
+        yield source.encode('utf-8')
+    elif isinstance(source, (bytes, mmap.mmap)):
+        # Celý buffer jako jeden blok - tokenizer nad ním pracuje bez kopie
+        yield source
+    elif isinstance(source, (bytearray, memoryview)):
+        yield bytes(source)
+    elif hasattr(source, 'read'):
+        yield from _iter_file_chunks(source, chunk_size)
+    else:
+        yield from source
+
+
+class VrmlTokenizer:
+    """Tokenizer nad proudem bloků bajtů (slova a řetězce dekóduje encoding)"""
+
+    def __init__(self, chunks, encoding='utf-8'):
+        self._chunks = iter(chunks)
+        self.buf = b''
+        self.pos = 0
+        self.eof = False
+        self.encoding = encoding
+        self._peeked = None
+
+    def _fill(self):
+        """Načte další blok; zpracovaná část bufferu se zahodí"""
+        if self.eof:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                if self.pos >= len(self.buf) and isinstance(chunk, (bytes, mmap.mmap)):
+                    # Nic nezbývá - blok (i celý namapovaný soubor) se použije bez kopie
+                    self.buf = chunk
+                else:
+                    self.buf = self.buf[self.pos:] + bytes(chunk)
+                self.pos = 0
+                return True
+        self.eof = True
+        return False
+
+    def next(self):
+        """Vrátí další token (druh, hodnota) nebo None na konci souboru"""
+        if self._peeked is not None:
+            tok, self._peeked = self._peeked, None
+            return tok
+
+        while True:
+            # Komentář nebo token na konci bufferu může být useknutý - nejdřív dočti
+            start = _SKIP.match(self.buf, self.pos).end()
+            m = _TOKEN.match(self.buf, start) if start < len(self.buf) else None
+            if m and (m.end() < len(self.buf) or self.eof):
+                self.pos = m.end()
+                kind = m.lastgroup
+                value = m.group(kind)
+                if kind == STRING:
+                    return STRING, _unescape(value[1:-1], self.encoding)
+                if kind == WORD:
+                    return WORD, value.decode(self.encoding, errors='replace')
+                return PUNCT, value.decode('ascii')
+            if not self._fill():
+                if m:
+                    # Poslední token končí přesně na konci dat - eof je už nastaven
+                    continue
+                if _SKIP.match(self.buf, self.pos).end() == len(self.buf):
+                    return None
+                raise VrmlSyntaxError(f"Neplatný token na pozici {self.pos}")
+
+    def peek(self):
+        if self._peeked is None:
+            self._peeked = self.next()
+        return self._peeked
+
+    def peek_byte(self):
+        """Vrátí první významný bajt bez spotřebování tokenu"""
+        if self._peeked is not None:
+            raise VrmlSyntaxError("peek_byte po peek() není podporován")
+        while True:
+            end = _SKIP.match(self.buf, self.pos).end()
+            if end < len(self.buf):
+                self.pos = end
+                return self.buf[end]
+            if not self._fill():
+                self.pos = end
+                return None
+
+    def read_array_bytes(self):
+        """
+        Vrátí surové bajty až po uzavírací ']' (ta se spotřebuje).
+        ']' uvnitř komentáře '#' pole neukončí.
+        """
+        # Pozice hledání je relativní k self.pos - _fill posouvá buffer
+        scan = 0
+        while True:
+            start = self.pos + scan
+            end = self.buf.find(b']', start)
+            comment = self.buf.find(b'#', start, end if end >= 0 else len(self.buf))
+            if comment >= 0:
+                line = _COMMENT.match(self.buf, comment)
+                if line.end() < len(self.buf):
+                    scan = line.end() - self.pos
+                    continue
+                # Komentář může pokračovat v dalším bloku
+                scan = comment - self.pos
+            elif end >= 0:
+                break
+            else:
+                scan = len(self.buf) - self.pos
+            if not self._fill():
+                raise VrmlSyntaxError("Neukončené pole '['")
+        data = self.buf[self.pos:end]
+        self.pos = end + 1
+        return data
+
+    def read_number_array(self, dtype):
+        """Dekóduje číselné pole až po ']' přímo do NumPy pole"""
+        data = self.read_array_bytes()
+        if b'#' in data:
+            data = _COMMENT.sub(b' ', data)
+        try:
+            # np.fromstring bere jen bytes; bez čárek se další kopie nedělá
+            if b',' in data:
+                data = data.replace(b',', b' ')
+            return np.fromstring(data, dtype=dtype, sep=' ')
+        except ValueError as e:
+            raise VrmlSyntaxError(f"Neplatné číselné pole: {e}") from None
+
+
+def _unescape(raw, encoding='utf-8'):
+    text = raw.decode(encoding, errors='replace')
+    if '\\' in text:
+        text = re.sub(r'\\(.)', r'\1', text)
+    return text
+
+
+class VrmlParser:
+    """Rekurzivní parser scény VRML97 nad VrmlTokenizer"""
+
+    def __init__(self, tokenizer):
+        self.tok = tokenizer
+        self.defs = {}
+
+    def parse(self):
+        """Vrátí seznam kořenových uzlů scény"""
+        nodes = []
+        while True:
+            tok = self.tok.peek()
+            if tok is None:
+                return nodes
+            node = self._statement()
+            if node is not None:
+                nodes.append(node)
+
+    def _expect(self, kind, value=None):
+        tok = self.tok.next()
+        if tok is None or tok[0] != kind or (value is not None and tok[1] != value):
+            raise VrmlSyntaxError(f"Očekáváno {value or kind}, nalezeno {tok}")
+        return tok[1]
+
+    def _statement(self):
+        """Uzel, DEF/USE nebo ROUTE/PROTO (ty se přeskakují)"""
+        kind, word = self.tok.next()
+        if kind != WORD:
+            raise VrmlSyntaxError(f"Očekáván uzel, nalezeno {word!r}")
+        if word == 'ROUTE':
+            self.tok.next()
+            self._expect(WORD, 'TO')
+            self.tok.next()
+            return None
+        if word == 'PROTO':
+            self.tok.next()
+            self._skip_block('[', ']')
+            self._skip_block('{', '}')
+            return None
+        if word == 'EXTERNPROTO':
+            self.tok.next()
+            self._skip_block('[', ']')
+            self._value_list_or_string()
+            return None
+        return self._node(word)
+
+    def _node(self, word):
+        if word == 'USE':
+            name = self._expect(WORD)
+            if name not in self.defs:
+                raise VrmlSyntaxError(f"USE neznámého uzlu {name!r}")
+            return self.defs[name]
+        if word == 'NULL':
+            return None
+
+        name = None
+        if word == 'DEF':
+            name = self._expect(WORD)
+            word = self._expect(WORD)
+
+        node = VrmlNode(word, name)
+        if name is not None:
+            self.defs[name] = node
+
+        self._expect(PUNCT, '{')
+        self._fields(node)
+        return node
+
+    def _fields(self, node):
+        while True:
+            kind, word = self.tok.peek() or (None, None)
+            if kind == WORD and word in ('ROUTE', 'PROTO', 'EXTERNPROTO'):
+                self._statement()
+                continue
+
+            self.tok.next()
+            if kind == PUNCT and word == '}':
+                return
+            if kind != WORD:
+                raise VrmlSyntaxError(f"Neočekávaný token {word!r} v uzlu {node.type}")
+
+            if word in ('eventIn', 'eventOut'):
+                self.tok.next()
+                self.tok.next()
+                continue
+            if word in ('field', 'exposedField'):
+                self.tok.next()
+                word = self._expect(WORD)
+
+            # IS propojení uvnitř PROTO těl
+            nxt = self.tok.peek()
+            if nxt and nxt == (WORD, 'IS'):
+                self.tok.next()
+                self.tok.next()
+                continue
+
+            node.fields[word] = self._value(word)
+
+    def _value(self, field):
+        kind, word = self.tok.peek()
+        if kind == PUNCT and word == '[':
+            self.tok.next()
+            return self._array(field)
+        if kind == STRING:
+            self.tok.next()
+            return word
+        if kind == PUNCT:
+            raise VrmlSyntaxError(f"Neočekávaný token {word!r} v poli {field}")
+
+        if word == 'TRUE' or word == 'FALSE':
+            self.tok.next()
+            return word == 'TRUE'
+        if _is_number(word):
+            return self._numbers()
+
+        self.tok.next()
+        return self._node(word)
+
+    def _numbers(self):
+        """SF hodnoty (SFFloat, SFVec3f, SFRotation, ...) jako float nebo pole"""
+        values = []
+        while True:
+            tok = self.tok.peek()
+            if tok is None or tok[0] != WORD or not _is_number(tok[1]):
+                break
+            self.tok.next()
+            try:
+                values.append(float(tok[1]))
+            except ValueError:
+                values.append(float(int(tok[1], 16)))
+        if len(values) == 1:
+            return values[0]
+        return np.array(values, dtype=np.float64)
+
+    def _array(self, field):
+        first = self.tok.peek_byte()
+        if first is not None and first in _NUMBER_START:
+            dtype = np.int32 if field.endswith('Index') else np.float32
+            return self.tok.read_number_array(dtype)
+
+        items = []
+        while True:
+            kind, word = self.tok.peek() or (None, None)
+            if kind is None:
+                raise VrmlSyntaxError("Neukončené pole '['")
+            if kind == PUNCT and word == ']':
+                self.tok.next()
+                return items
+            if kind == STRING:
+                self.tok.next()
+                items.append(word)
+            elif word in ('ROUTE', 'PROTO', 'EXTERNPROTO'):
+                self._statement()
+            else:
+                value = self._value(field)
+                if value is not None:
+                    items.append(value)
+
+    def _skip_block(self, open_char, close_char):
+        self._expect(PUNCT, open_char)
+        depth = 1
+        while depth:
+            tok = self.tok.next()
+            if tok is None:
+                raise VrmlSyntaxError(f"Neukončený blok '{open_char}'")
+            if tok[0] == PUNCT:
+                if tok[1] == open_char:
+                    depth += 1
+                elif tok[1] == close_char:
+                    depth -= 1
+
+    def _value_list_or_string(self):
+        kind, word = self.tok.peek()
+        if kind == PUNCT and word == '[':
+            self._skip_block('[', ']')
+        else:
+            self.tok.next()
+
+
+def parse_vrml(source, chunk_size=CHUNK_SIZE, encoding=None):
+    """
+    Naparsuje VRML scénu a vrátí seznam kořenových uzlů.
+
+    source: text (str), bajty, otevřený binární soubor, cesta (Path)
+            nebo iterátor bloků bajtů (např. iter_zlib_chunks)
+    encoding: kódování slov a řetězců; None = detect_encoding pro bajty
+              a soubor zadaný cestou, UTF-8 pro proudy
+    """
+    if hasattr(source, '__fspath__'):
+        return parse_vrml_file(source, encoding)
+    if encoding is None:
+        encoding = detect_encoding(source) if isinstance(source, (bytes, mmap.mmap)) else 'utf-8'
+    tokenizer = VrmlTokenizer(_iter_source_chunks(source, chunk_size), encoding)
+    return VrmlParser(tokenizer).parse()
+
+
+def parse_vrml_file(path, encoding=None):
+    """Naparsuje soubor jedním namapováním do paměti (mmap) bez dekódování celého textu"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if encoding is None:
+                encoding = detect_encoding(data)
+            return VrmlParser(VrmlTokenizer([data], encoding)).parse()
+
+
+def parse_vrml_blob(grafika, header_size=4):
+    """Naparsuje zlib komprimovaný blob z GeoObjekt bez dekomprese celého bloku najednou"""
+    return parse_vrml(iter_zlib_chunks(grafika, header_size))
+
+
+def iter_nodes(nodes, node_type=None):
+    """Projde scénu do hloubky; každý uzel (i sdílený přes USE) vrátí jednou"""
+    seen = set()
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if node_type is None or node.type == node_type:
+            yield node
+        children = []
+        for value in node.fields.values():
+            if isinstance(value, VrmlNode):
+                children.append(value)
+            elif isinstance(value, list):
+                children.extend(v for v in value if isinstance(v, VrmlNode))
+        stack.extend(reversed(children))
+
+
+def triangulate(coord_index):
+    """
+    Fan triangulace polygonů oddělených -1 (coordIndex) do pole (M, 3).
+    Polygony s méně než 3 vrcholy se zahodí.
+    """
+    idx = np.asarray(coord_index, dtype=np.int64)
+    if len(idx) == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    if idx[-1] != -1:
+        idx = np.append(idx, -1)
+
+    ends = np.flatnonzero(idx == -1)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    n_tris = np.maximum(ends - starts - 2, 0)
+    total = int(n_tris.sum())
+    if total == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+
+    face_start = np.repeat(starts, n_tris)
+    # k = 1 .. n-2 pro každý polygon
+    first_tri = np.cumsum(n_tris) - n_tris
+    k = np.arange(total) - np.repeat(first_tri, n_tris) + 1
+
+    tris = np.empty((total, 3), dtype=np.int64)
+    tris[:, 0] = idx[face_start]
+    tris[:, 1] = idx[face_start + k]
+    tris[:, 2] = idx[face_start + k + 1]
+    return tris
+
+
+def face_set_geometry(face_set):
+    """Vrátí (vertices (N, 3) float32, faces (M, 3)) pro IndexedFaceSet"""
+    coord = face_set.get('coord')
+    points = coord.get('point') if isinstance(coord, VrmlNode) else None
+    if points is None or len(points) < 3:
+        return None, None
+    vertices = np.asarray(points, dtype=np.float32)[:len(points) // 3 * 3].reshape(-1, 3)
+    faces = triangulate(face_set.get('coordIndex', ()))
+    return vertices, faces
+
+
+def extract_geometry(nodes):
+    """
+    Spojí všechny IndexedFaceSet ve scéně do jedné sítě (bez transformací).
+    Vrací (vertices (N, 3) float32, faces (M, 3) uint32) nebo (None, None).
+    """
+    all_vertices = []
+    all_faces = []
+    offset = 0
+    for face_set in iter_nodes(nodes, 'IndexedFaceSet'):
+        vertices, faces = face_set_geometry(face_set)
+        if vertices is None:
+            continue
+        # Indexy mimo rozsah by po posunu ukazovaly do vrcholů další sítě
+        faces = faces[((faces >= 0) & (faces < len(vertices))).all(axis=1)]
+        all_vertices.append(vertices)
+        all_faces.append(faces + offset)
+        offset += len(vertices)
+
+    if not all_vertices:
+        return None, None
+    return (np.concatenate(all_vertices).astype(np.float32),
+            np.concatenate(all_faces).astype(np.uint32))
@@ -0,0 +1,366 @@
+"""
+Scéna VRML: transformace a sdílená geometrie.
+
+Z uzlů z vrml_parser sestaví seznam sítí (jedna na každý IndexedFaceSet,
+i když je použit vícekrát přes DEF/USE) a seznam instancí (jedna na každý
+výskyt Shape) se světovou maticí 4x4. Lokální matice všech Transform uzlů
+se počítají najednou vektorově, vrcholy se transformují po dávkách.
+
+Síť nese materiál svého Shape (Material, ImageTexture) a texturové
+souřadnice; texCoordIndex se rozbalí na vrcholy s vlastním UV.
+"""
+
+import numpy as np
+
+from mesh_ops import valid_faces_mask
+from vrml_parser import iter_nodes, face_set_geometry, triangulate
+
+# Výchozí hodnoty VRML97 Material
+DEFAULT_DIFFUSE = (0.8, 0.8, 0.8)
+DEFAULT_SHININESS = 0.2
+
+# Uzly, které jen seskupují potomky v poli children
+GROUPING_NODES = ('Transform', 'Group', 'Anchor', 'Billboard', 'Collision')
+
+
+class SceneMesh:
+    """Geometrie jednoho IndexedFaceSet v lokálních souřadnicích"""
+
+    def __init__(self, name, vertices, faces, face_set, appearance=None, uvs=None, material=None):
+        self.name = name
+        self.vertices = vertices
+        self.faces = faces
+        # IndexedFaceSet nebo slovník s creaseAngle/solid (spojené sítě)
+        self.face_set = face_set
+        self.appearance = appearance
+        self.uvs = uvs
+        self.material = material
+
+    @property
+    def crease_angle(self):
+        return float(self.face_set.get('creaseAngle', 0.0))
+
+    @property
+    def solid(self):
+        return bool(self.face_set.get('solid', True))
+
+
+class SceneInstance:
+    """Výskyt sítě ve scéně se světovou transformací"""
+
+    def __init__(self, mesh_index, matrix, name=None):
+        self.mesh_index = mesh_index
+        self.matrix = matrix
+        self.name = name
+
+
+class VrmlScene:
+    """Sítě a jejich instance"""
+
+    def __init__(self):
+        self.meshes = []
+        self.instances = []
+
+    def __bool__(self):
+        return bool(self.instances)
+
+    @property
+    def vertex_count(self):
+        return sum(len(self.meshes[i.mesh_index].vertices) for i in self.instances)
+
+    @property
+    def face_count(self):
+        return sum(len(self.meshes[i.mesh_index].faces) for i in self.instances)
+
+    def flatten(self):
+        """
+        Spojí všechny instance do jedné sítě ve světových souřadnicích.
+        Vrací (vertices (N, 3) float32, faces (M, 3) uint32) nebo (None, None).
+        """
+        by_mesh = {}
+        for inst in self.instances:
+            by_mesh.setdefault(inst.mesh_index, []).append(inst.matrix)
+
+        all_vertices = []
+        all_faces = []
+        offset = 0
+        for mesh_index, matrices in by_mesh.items():
+            mesh = self.meshes[mesh_index]
+            matrices = np.stack(matrices)
+            world = transform_points(matrices, mesh.vertices)
+            mirrored = np.linalg.det(matrices[:, :3, :3]) < 0
+            n = len(mesh.vertices)
+            for k in range(len(matrices)):
+                all_vertices.append(world[k])
+                # Zrcadlení obrátí orientaci trojúhelníků
+                part = mesh.faces[:, [0, 2, 1]] if mirrored[k] else mesh.faces
+                all_faces.append(part + offset + k * n)
+            offset += len(matrices) * n
+
+        if not all_vertices:
+            return None, None
+        return (np.concatenate(all_vertices).astype(np.float32),
+                np.concatenate(all_faces).astype(np.uint32))
+
+    def batch_by_material(self):
+        """
+        Nová scéna s jednou sítí na materiál: instance se stejným materiálem
+        se spojí ve světových souřadnicích do jedné sítě s jednotkovou maticí.
+        Sítě použité vícekrát (DEF/USE) se nespojují - zůstanou sdílené,
+        každá instance se svou maticí, jako bez dávkování. Části bez UV
+        dostanou (0, 0), pokud je má některá jiná.
+        """
+        uses = np.bincount([inst.mesh_index for inst in self.instances], minlength=len(self.meshes))
+        groups = {}
+        shared = {}
+        for inst in self.instances:
+            mesh = self.meshes[inst.mesh_index]
+            if uses[inst.mesh_index] > 1:
+                shared.setdefault(inst.mesh_index, []).append(inst)
+            else:
+                groups.setdefault(material_key(mesh.material), []).append(inst)
+
+        batched = VrmlScene()
+        for instances in groups.values():
+            meshes = [self.meshes[inst.mesh_index] for inst in instances]
+            vertices, faces, uvs = [], [], []
+            offset = 0
+            for inst, mesh in zip(instances, meshes):
+                vertices.append(transform_points(inst.matrix[None], mesh.vertices)[0])
+                part = mesh.faces
+                # Zrcadlení obrátí orientaci trojúhelníků
+                if np.linalg.det(inst.matrix[:3, :3]) < 0:
+                    part = part[:, [0, 2, 1]]
+                faces.append(part + offset)
+                offset += len(mesh.vertices)
+                uvs.append(mesh.uvs if mesh.uvs is not None else np.zeros((len(mesh.vertices), 2), np.float32))
+
+            has_uvs = any(mesh.uvs is not None for mesh in meshes)
+            face_set = {'creaseAngle': min(mesh.crease_angle for mesh in meshes),
+                        'solid': all(mesh.solid for mesh in meshes)}
+            name = meshes[0].name if len({mesh.name for mesh in meshes}) == 1 else f"material{len(batched.meshes)}"
+            batched.meshes.append(SceneMesh(name, np.concatenate(vertices).astype(np.float32),
+                                            np.concatenate(faces), face_set, meshes[0].appearance,
+                                            np.concatenate(uvs) if has_uvs else None, meshes[0].material))
+            batched.instances.append(SceneInstance(len(batched.meshes) - 1, np.eye(4), name))
+
+        for mesh_index, instances in shared.items():
+            batched.meshes.append(self.meshes[mesh_index])
+            batched.instances.extend(SceneInstance(len(batched.meshes) - 1, inst.matrix, inst.name)
+                                     for inst in instances)
+        return batched
+
+
+def shape_material(appearance):
+    """
+    Materiál Shape jako slovník {'diffuseColor', 'transparency', 'shininess',
+    'texture'} s výchozími hodnotami VRML97, nebo None bez Appearance.
+    """
+    if appearance is None:
+        return None
+    material = appearance.get('material')
+    texture = appearance.get('texture')
+    if material is None and texture is None:
+        return None
+
+    def field(name, default):
+        value = material.get(name) if material is not None else None
+        return default if value is None else value
+
+    url = None
+    if texture is not None and texture.type == 'ImageTexture':
+        url = texture.get('url')
+        if isinstance(url, (list, tuple)):
+            url = url[0] if url else None
+    return {
+        'diffuseColor': tuple(round(float(c), 4) for c in np.ravel(field('diffuseColor', DEFAULT_DIFFUSE))[:3]),
+        'transparency': round(float(field('transparency', 0.0)), 4),
+        'shininess': round(float(field('shininess', DEFAULT_SHININESS)), 4),
+        'texture': url or None,
+    }
+
+
+def material_key(material):
+    """Hashovatelný klíč materiálu (None = výchozí materiál)"""
+    return None if material is None else tuple(sorted(material.items()))
+
+
+def expand_texcoords(face_set, vertices, faces):
+    """
+    Texturové souřadnice IndexedFaceSet. S texCoordIndex má každý roh vlastní
+    UV, takže se vrcholy rozdělí podle dvojice (coord, texCoord); bez něj se
+    UV indexují přes coordIndex. Vrací (vertices, faces, uvs (N, 2) nebo None).
+    """
+    tex_coord = face_set.get('texCoord')
+    points = tex_coord.get('point') if tex_coord is not None else None
+    if points is None or len(points) < 2:
+        return vertices, faces, None
+    points = np.asarray(points, dtype=np.float32)[:len(points) // 2 * 2].reshape(-1, 2)
+
+    tex_index = face_set.get('texCoordIndex')
+    if tex_index is None or len(tex_index) == 0:
+        if len(points) < len(vertices):
+            return vertices, faces, None
+        return vertices, faces, points[:len(vertices)]
+
+    tex_faces = triangulate(tex_index)
+    if tex_faces.shape != faces.shape:
+        return vertices, faces, None
+    keep = valid_faces_mask(faces, len(vertices)) & valid_faces_mask(tex_faces, len(points))
+    faces, tex_faces = faces[keep], tex_faces[keep]
+
+    pairs = np.stack([faces.ravel(), tex_faces.ravel()], axis=1)
+    unique, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    return vertices[unique[:, 0]], inverse.reshape(-1, 3), points[unique[:, 1]]
+
+
+def _field_array(nodes, field, default):
+    """Hodnoty pole všech uzlů jako (K, len(default)) pole"""
+    out = np.tile(np.asarray(default, dtype=np.float64), (len(nodes), 1))
+    for k, node in enumerate(nodes):
+        value = node.get(field)
+        if value is not None:
+            out[k] = value
+    return out
+
+
+def rotation_matrices(rotations):
+    """Rodriguesův vzorec pro (K, 4) pole [osa_x, osa_y, osa_z, úhel] -> (K, 3, 3)"""
+    axis = rotations[:, :3]
+    angle = rotations[:, 3]
+    length = np.linalg.norm(axis, axis=1)
+    # Nulová osa znamená žádnou rotaci
+    safe = np.where(length > 0, length, 1.0)
+    axis = axis / safe[:, None]
+    angle = np.where(length > 0, angle, 0.0)
+
+    x, y, z = axis[:, 0], axis[:, 1], axis[:, 2]
+    c, s = np.cos(angle), np.sin(angle)
+    t = 1.0 - c
+
+    r = np.empty((len(rotations), 3, 3))
+    r[:, 0, 0] = t * x * x + c
+    r[:, 0, 1] = t * x * y - s * z
+    r[:, 0, 2] = t * x * z + s * y
+    r[:, 1, 0] = t * x * y + s * z
+    r[:, 1, 1] = t * y * y + c
+    r[:, 1, 2] = t * y * z - s * x
+    r[:, 2, 0] = t * x * z - s * y
+    r[:, 2, 1] = t * y * z + s * x
+    r[:, 2, 2] = t * z * z + c
+    return r
+
+
+def transform_matrices(transforms):
+    """
+    Lokální matice VRML Transform uzlů najednou:
+    M = T * C * R * SR * S * SR^-1 * C^-1
+    """
+    k = len(transforms)
+    translation = _field_array(transforms, 'translation', (0, 0, 0))
+    center = _field_array(transforms, 'center', (0, 0, 0))
+    scale = _field_array(transforms, 'scale', (1, 1, 1))
+    rotation = rotation_matrices(_field_array(transforms, 'rotation', (0, 0, 1, 0)))
+    scale_orient = rotation_matrices(_field_array(transforms, 'scaleOrientation', (0, 0, 1, 0)))
+
+    # SR * S * SR^T (SR je ortonormální)
+    scaled = np.einsum('kij,kj,klj->kil', scale_orient, scale, scale_orient)
+    linear = rotation @ scaled
+
+    m = np.zeros((k, 4, 4))
+    m[:, :3, :3] = linear
+    # Posun: T + C - linear * C
+    m[:, :3, 3] = translation + center - np.einsum('kij,kj->ki', linear, center)
+    m[:, 3, 3] = 1.0
+    return m
+
+
+def transform_points(matrices, points):
+    """Aplikuje (K, 4, 4) matice na (N, 3) body -> (K, N, 3)"""
+    points = np.asarray(points, dtype=np.float64)
+    return np.einsum('kij,nj->kni', matrices[:, :3, :3], points) + matrices[:, None, :3, 3]
+
+
+def _node_list(value):
+    """Hodnota MFNode jako seznam uzlů (jediný uzel smí být zapsán bez [])"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def build_scene(nodes):
+    """Sestaví VrmlScene z kořenových uzlů vrml_parser.parse_vrml"""
+    transforms = list(iter_nodes(nodes, 'Transform'))
+    local = {}
+    if transforms:
+        for node, matrix in zip(transforms, transform_matrices(transforms)):
+            local[id(node)] = matrix
+
+    scene = VrmlScene()
+    mesh_by_geometry = {}
+
+    def add_shape(shape, world, parent_name):
+        geometry = shape.get('geometry')
+        if geometry is None or geometry.type != 'IndexedFaceSet':
+            return
+
+        # Stejná geometrie s jiným vzhledem je jiná síť (jiný materiál)
+        key = (id(geometry), id(shape.get('appearance')))
+        mesh_index = mesh_by_geometry.get(key)
+        if mesh_index is None:
+            vertices, faces = face_set_geometry(geometry)
+            if vertices is None:
+                return
+            # Indexy mimo rozsah se vyřadí hned, před spojením s jinými Shape
+            faces = faces[valid_faces_mask(faces, len(vertices))]
+            if len(faces) == 0:
+                return
+            vertices, faces, uvs = expand_texcoords(geometry, vertices, faces)
+            if len(faces) == 0:
+                return
+            if not geometry.get('ccw', True):
+                faces = faces[:, [0, 2, 1]]
+            name = shape.name or geometry.name or parent_name
+            appearance = shape.get('appearance')
+            mesh_index = len(scene.meshes)
+            scene.meshes.append(SceneMesh(name, vertices, faces, geometry, appearance, uvs,
+                                          shape_material(appearance)))
+            mesh_by_geometry[key] = mesh_index
+
+        scene.instances.append(SceneInstance(mesh_index, world, parent_name))
+
+    def walk(node, world, parent_name, path):
+        # Ochrana proti cyklům přes USE
+        if id(node) in path:
+            return
+        path = path | {id(node)}
+
+        if node.type == 'Shape':
+            add_shape(node, world, parent_name)
+            return
+
+        if node.type == 'Transform':
+            world = world @ local[id(node)]
+
+        if node.type in GROUPING_NODES:
+            children = _node_list(node.get('children'))
+        elif node.type == 'LOD':
+            # Pouze nejpodrobnější úroveň
+            children = _node_list(node.get('level'))[:1]
+        elif node.type == 'Switch':
+            choice = int(node.get('whichChoice', -1))
+            choices = _node_list(node.get('choice'))
+            children = [choices[choice]] if 0 <= choice < len(choices) else []
+        else:
+            return
+
+        name = node.name or parent_name
+        for child in children:
+            walk(child, world, name, path)
+
+    identity = np.eye(4)
+    for node in nodes:
+        walk(node, identity, node.name, frozenset())
+    return scene
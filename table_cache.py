@@ -0,0 +1,132 @@
+"""
+Perzistentná cache rozparsovaných Access tabuliek
+=================================================
+Každá tabuľka sa po prvom parse_table uloží ako stĺpcový .npz súbor
+(jedno NumPy pole na stĺpec) do adresára <databáza>.cache vedľa MDB.
+Cache je viazaná na veľkosť, mtime a SHA-256 obsah MDB súboru, takže po zmene
+iba v kóde sa pri ďalšom behu Access databáza vôbec neotvára.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+CACHE_VERSION = 1
+MANIFEST_NAME = 'manifest.json'
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Vráti SHA-256 obsahu súboru (číta po blokoch)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def column_to_array(values):
+    """Prevedie stĺpec na NumPy pole, číselné typy ukladá natívne"""
+    types = {type(v) for v in values}
+    if types == {bool}:
+        return np.array(values, dtype=np.bool_)
+    if types == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    if types == {float}:
+        return np.array(values, dtype=np.float64)
+
+    # Texty, bajty, None a zmiešané typy ostávajú Python objektmi
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+class CachedAccessParser:
+    """Náhrada AccessParser, ktorá číta tabuľky z cache na disku"""
+
+    def __init__(self, db_path, cache_dir=None):
+        self.db_path = db_path
+        self.cache_dir = cache_dir or f"{db_path}.cache"
+        self._parser = None
+        self._valid = None
+
+    @property
+    def parser(self):
+        """AccessParser sa vytvorí až keď niektorá tabuľka nie je v cache"""
+        if self._parser is None:
+            from access_parser import AccessParser
+            self._parser = AccessParser(self.db_path)
+        return self._parser
+
+    def parse_table(self, table_name):
+        """Vráti tabuľku ako slovník stĺpec -> zoznam hodnôt"""
+        self._ensure_valid()
+
+        path = self._table_path(table_name)
+        if os.path.exists(path):
+            with np.load(path, allow_pickle=True) as data:
+                return {name: data[name].tolist() for name in data.files}
+
+        table = self.parser.parse_table(table_name)
+        self._store(path, table)
+        return {name: list(values) for name, values in table.items()}
+
+    def _table_path(self, table_name):
+        return os.path.join(self.cache_dir, f"{table_name}.npz")
+
+    def _store(self, path, table):
+        """Zapíše tabuľku atomicky (najprv do dočasného súboru)"""
+        arrays = {name: column_to_array(list(values)) for name, values in table.items()}
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def _ensure_valid(self):
+        """Overí, že cache patrí k aktuálnemu MDB, inak ju vyprázdni"""
+        if self._valid:
+            return
+
+        stat = os.stat(self.db_path)
+        manifest_path = os.path.join(self.cache_dir, MANIFEST_NAME)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            try:
+                with open(manifest_path, 'r', encoding='utf-8') as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                manifest = {}
+
+        same_version = manifest.get('version') == CACHE_VERSION
+        same_stat = (manifest.get('size') == stat.st_size and
+                     manifest.get('mtime_ns') == stat.st_mtime_ns)
+
+        if not (same_version and same_stat):
+            # Veľkosť alebo mtime sa zmenili - rozhodne obsah
+            digest = file_sha256(self.db_path)
+            if not (same_version and manifest.get('size') == stat.st_size and
+                    manifest.get('sha256') == digest):
+                self._clear()
+            manifest = {
+                'version': CACHE_VERSION,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': digest,
+            }
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+
+        self._valid = True
+
+    def _clear(self):
+        """Zmaže všetky uložené tabuľky"""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.npz') or name.endswith('.tmp'):
+                os.remove(os.path.join(self.cache_dir, name))
@@ -0,0 +1,84 @@
+"""
+Regrese: inkrementální dávka s duplicitním obsahem (convert_batch)
+=================================================================
+Duplicita má v manifestu výstup svého vzoru. Po změně vzoru se z ní stane
+samostatný model a musí dostat vlastní GLB, ne být přeskočena jako
+"beze změny".
+
+Spuštění:
+    python -m pytest tests
+"""
+
+import json
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(BASE_DIR / 'prototype2'))
+
+from convert_vrml_to_gltf import ALIASES_NAME, PLACEMENT_NAME, convert_batch
+
+BOX = """#VRML V2.0 utf8
+Shape {
+  geometry IndexedFaceSet {
+    coord Coordinate { point [ 0 0 0, %(s)s 0 0, %(s)s %(s)s 0, 0 %(s)s 0 ] }
+    coordIndex [ 0, 1, 2, -1, 0, 2, 3, -1 ]
+  }
+}
+"""
+
+
+def write_model(path, size):
+    path.write_text(BOX % {'s': size}, encoding='utf-8')
+
+
+def test_former_duplicate_converted_after_canonical_changes(tmp_path):
+    source_dir = tmp_path / 'vrml'
+    output_dir = tmp_path / 'gltf'
+    source_dir.mkdir()
+    a, b = source_dir / 'A.wrl', source_dir / 'B.wrl'
+    write_model(a, 1)
+    write_model(b, 1)
+
+    convert_batch([a, b], output_dir, workers=1)
+    assert json.loads((output_dir / ALIASES_NAME).read_text(encoding='utf-8')) == {'B': 'A'}
+    assert not (output_dir / 'B.glb').exists()
+
+    # Změní se jen vzor; B zůstává stejné, ale už není duplicitou
+    write_model(a, 2)
+    convert_batch([a, b], output_dir, workers=1)
+
+    assert json.loads((output_dir / ALIASES_NAME).read_text(encoding='utf-8')) == {}
+    assert (output_dir / 'A.glb').exists()
+    assert (output_dir / 'B.glb').exists()
+    placement = json.loads((output_dir / PLACEMENT_NAME).read_text(encoding='utf-8'))
+    assert set(placement) == {'A', 'B'}
+
+    # Třetí běh už nic nepřevádí
+    convert_batch([a, b], output_dir, workers=1)
+    assert (output_dir / 'B.glb').exists()
+
+
+def test_stale_outputs_removed(tmp_path):
+    source_dir = tmp_path / 'vrml'
+    output_dir = tmp_path / 'gltf'
+    source_dir.mkdir()
+    a, b = source_dir / 'A.wrl', source_dir / 'B.wrl'
+    write_model(a, 1)
+    write_model(b, 2)
+
+    convert_batch([a, b], output_dir, workers=1, compress=True)
+    assert (output_dir / 'B.glb').exists() and (output_dir / 'B.glb.gz').exists()
+
+    # B má teď stejný obsah jako A - je jen alias, jeho GLB je zastaralé
+    write_model(b, 1)
+    convert_batch([a, b], output_dir, workers=1, compress=True)
+    assert json.loads((output_dir / ALIASES_NAME).read_text(encoding='utf-8')) == {'B': 'A'}
+    assert not (output_dir / 'B.glb').exists()
+    assert not (output_dir / 'B.glb.gz').exists()
+    assert (output_dir / 'A.glb.gz').exists()
+
+    # Bez komprese nezůstanou .glb.gz z dřívějšího běhu
+    convert_batch([a, b], output_dir, workers=1)
+    assert (output_dir / 'A.glb').exists()
+    assert not (output_dir / 'A.glb.gz').exists()